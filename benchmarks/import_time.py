@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# Copyright 2021-2024 Ping Data Intelligence
+
+"""Measure how long the package and the command line tools take to import, to catch startup regressions.
+
+Each target is imported in a fresh interpreter `--runs` times; the median wall time is reported, minus the cost
+of starting a bare interpreter.  With `--max-ms`, exits non-zero if any command line tool goes over budget, so it
+can run in CI:
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --max-ms 150
+    python benchmarks/import_time.py --show-modules pingintel_api.sovfixerapi_cmd
+"""
+
+import statistics
+import subprocess
+import sys
+import time
+
+import click
+
+CLI_MODULES = [
+    "pingintel_api.sovfixerapi_cmd",
+    "pingintel_api.pingvisionapi_cmd",
+    "pingintel_api.pingdataapi_cmd",
+    "pingintel_api.pingmapsapi_cmd",
+]
+LIBRARY_MODULES = [
+    "pingintel_api",
+    "pingintel_api.pingdata.pingdata_api_client",
+    "pingintel_api.pingvision.pingvision_api_client",
+]
+
+
+def time_import(code: str, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def slowest_modules(module: str, count: int = 15) -> list[tuple[int, str]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], check=True, capture_output=True, text=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        rows.append((int(cumulative), name.rstrip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+@click.command()
+@click.option("--runs", default=7, show_default=True, help="Interpreter launches per target.")
+@click.option("--max-ms", type=float, help="Fail if importing a command line tool takes longer than this.")
+@click.option("--show-modules", metavar="MODULE", help="Also list the slowest imports under MODULE.")
+def main(runs, max_ms, show_modules):
+    baseline = time_import("pass", runs)
+    click.echo(f"bare interpreter: {baseline:.1f} ms (subtracted below)")
+
+    over_budget = []
+    for module in CLI_MODULES + LIBRARY_MODULES:
+        elapsed = time_import(f"import {module}", runs) - baseline
+        flag = ""
+        if max_ms is not None and module in CLI_MODULES and elapsed > max_ms:
+            over_budget.append(module)
+            flag = "  OVER BUDGET"
+        click.echo(f"{module:<50} {elapsed:>7.1f} ms{flag}")
+
+    if show_modules:
+        click.echo(f"\nslowest imports under {show_modules} (cumulative us):")
+        for cumulative, name in slowest_modules(show_modules):
+            click.echo(f"{cumulative:>10} {name}")
+
+    if over_budget:
+        raise click.ClickException(f"{len(over_budget)} command line tool(s) over the {max_ms:g} ms budget.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# Copyright 2021-2024 Ping Data Intelligence
+
+"""Compare the JSON codecs available to the API clients on payloads shaped like our bulk paths:
+a bulk_enhance_async_start request body and a get_policy_locations response, at a few sizes.
+
+    python benchmarks/json_codec.py
+    python benchmarks/json_codec.py --sizes 1000,100000 --repeat 3
+
+Install orjson and/or msgspec to compare them against the stdlib.
+"""
+
+import random
+import timeit
+
+import click
+
+from pingintel_api.json_codec import CODECS, get_json_codec
+
+OCCUPANCIES = ["301", "302", "311", "315", "321", "338"]
+FLOOD_ZONES = ["A", "AE", "AH", "VE", "X", "X500", None]
+
+
+def make_enhance_request(n: int) -> dict:
+    rng = random.Random(n)
+    locations = [
+        {
+            "id": str(i),
+            "address": f"{rng.randint(1, 9999)} Main St",
+            "city": rng.choice(["Houston", "Miami", "Tampa", "New Orleans"]),
+            "state": rng.choice(["TX", "FL", "LA"]),
+            "latitude": rng.uniform(25, 31),
+            "longitude": rng.uniform(-98, -80),
+            "occupancy__desc_ping": "Commercial",
+        }
+        for i in range(n)
+    ]
+    return {"locations": locations, "sources": ["GG", "PH"], "include_raw_response": False, "check_cache": True}
+
+
+def make_locations_response(n: int) -> dict:
+    rng = random.Random(n)
+    results = [
+        {
+            "id": i,
+            "latitude": rng.uniform(25, 31),
+            "longitude": rng.uniform(-98, -80),
+            "tiv": rng.uniform(1e5, 5e7),
+            "limits__total_limit": rng.randint(1, 100) * 250_000,
+            "const__bldg_year_built": rng.randint(1900, 2023),
+            "occupancy__code_air": rng.choice(OCCUPANCIES),
+            "fema_flood_zone": rng.choice(FLOOD_ZONES),
+            "wind_tier": str(rng.randint(1, 3)),
+        }
+        for i in range(n)
+    ]
+    return {"results": results, "cursor_id": None, "total_count": n, "returned_count": n}
+
+
+def best_of(fn, repeat: int) -> float:
+    return min(timeit.repeat(fn, number=1, repeat=repeat))
+
+
+@click.command()
+@click.option("--sizes", default="100,10000,100000", help="Comma-separated record counts.")
+@click.option("--repeat", default=5, show_default=True)
+def main(sizes, repeat):
+    # the stdlib first: it is the baseline for the speedup column.
+    names = ["json"] + [name for name, (_, is_available) in CODECS.items() if name != "json" and is_available()]
+    codecs = [get_json_codec(name) for name in names]
+    click.echo(f"Codecs: {', '.join(codec.name for codec in codecs)}")
+    click.echo(f"{'payload':<22} {'records':>8} {'MB':>7} {'codec':<8} {'dumps ms':>9} {'loads ms':>9} {'vs json':>8}")
+
+    for n in [int(size) for size in sizes.split(",")]:
+        for label, payload in (
+            ("enhance request", make_enhance_request(n)),
+            ("locations response", make_locations_response(n)),
+        ):
+            encoded = get_json_codec("json").dumps(payload)
+            baseline = None
+            for codec in codecs:
+                dumps = best_of(lambda: codec.dumps(payload), repeat)
+                loads = best_of(lambda: codec.loads(encoded), repeat)
+                if baseline is None:
+                    baseline = dumps + loads
+                click.echo(
+                    f"{label:<22} {n:>8} {len(encoded) / 1e6:>7.2f} {codec.name:<8} "
+                    f"{dumps * 1000:>9.2f} {loads * 1000:>9.2f} {baseline / (dumps + loads):>7.1f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -57,6 +57,7 @@ def get_team_members(team_uuid: str):
 def cli(ctx, environment):
     global api_client
     api_client = PingVisionAPIClient(environment=environment)
+    api_client.use_metadata_cache(path=SCRIPT_DIR / f".pingvision_metadata_{environment}.json")
     ctx.ensure_object(dict)
     ctx.obj["environment"] = environment
 
@@ -257,16 +258,19 @@ def write_excel_assignment_queue(
 @click.option("--team-name", required=True, help="The team ID to view the assignment queue for.")
 @click.option("--limit", type=int, default=None, help="Maximum number of items to return.")
 @click.option("--auto-open", is_flag=True, default=False, help="Automatically open the output Excel file.")
-def view(ctx, company_name, team_name, limit, auto_open):
+@click.option(
+    "--replica",
+    type=click.Path(dir_okay=False, path_type=pathlib.Path),
+    help="Keep a local SQLite replica of the team's submissions here and build the queue from it.",
+)
+def view(ctx, company_name, team_name, limit, auto_open, replica):
     """View the current assignment queue for a team."""
     team = get_team_uuid(company_name, team_name)
     team_uuid = team["team_uuid"]
     division_uuid = team["division_uuid"]
 
-    statuses = get_statuses(
-        division_uuid=division_uuid,
-        status_names=["Received", "Initializing", "Waiting for Scrubbing", "Waiting for Peer Review"],
-    )
+    status_names = ["Received", "Initializing", "Waiting for Scrubbing", "Waiting for Peer Review"]
+    statuses = get_statuses(division_uuid=division_uuid, status_names=status_names)
     status_uuids = [status["uuid"] for status in statuses]
     excel_output_filename = "assignment_queue.xlsx"
 
@@ -274,16 +278,26 @@ def view(ctx, company_name, team_name, limit, auto_open):
     has_remaining = True
     cursor_id = None
     while has_remaining:
-        queue = api_client.list_submission_activity(
-            team_uuid=team_uuid,
-            sort_by="created_time",
-            sort_order="desc",
-            page_size=200,
-            workflow_status_uuid=status_uuids,
-            cursor_id=cursor_id,
-        )
-        has_remaining = queue["has_remaining"]
-        cursor_id = queue["cursor_id"]
+        if replica:
+            with api_client.submission_replica(replica, team=team_uuid) as submission_replica:
+                submission_replica.sync()
+                queue = {
+                    "results": submission_replica.query(
+                        workflow_status_names=status_names, team_uuid=team_uuid, order_by="created_time DESC"
+                    )
+                }
+            has_remaining = False
+        else:
+            queue = api_client.list_submission_activity(
+                team_uuid=team_uuid,
+                sort_by="created_time",
+                sort_order="desc",
+                page_size=200,
+                workflow_status_uuid=status_uuids,
+                cursor_id=cursor_id,
+            )
+            has_remaining = queue["has_remaining"]
+            cursor_id = queue["cursor_id"]
 
         for submission in queue.get("results", []):
             pingid = submission["id"]
@@ -1,6 +1,39 @@
-from .pingvision.pingvision_api_client import PingVisionAPIClient
-from .sov_fixer.sov_fixer_api_client import SOVFixerAPIClient
-from .sov_fixer.types import INCOMPLETE_STATUSES, SOV_RESULT_STATUS, SOV_STATUS
-from .pingmaps.pingmaps_api_client import PingMapsAPIClient
-from .url_signature_factory import UrlSignatureFactory
-from .pingdata.pingdata_api_client import PingDataAPIClient
+from typing import TYPE_CHECKING
+
+# The clients are imported on first use (PEP 562), so that importing a light submodule -- or starting one of the
+# command line tools -- doesn't pay for requests and every client module up front.
+_LAZY_ATTRIBUTES = {
+    "PingVisionAPIClient": "pingintel_api.pingvision.pingvision_api_client",
+    "SOVFixerAPIClient": "pingintel_api.sov_fixer.sov_fixer_api_client",
+    "INCOMPLETE_STATUSES": "pingintel_api.sov_fixer.types",
+    "SOV_RESULT_STATUS": "pingintel_api.sov_fixer.types",
+    "SOV_STATUS": "pingintel_api.sov_fixer.types",
+    "PingMapsAPIClient": "pingintel_api.pingmaps.pingmaps_api_client",
+    "UrlSignatureFactory": "pingintel_api.url_signature_factory",
+    "PingDataAPIClient": "pingintel_api.pingdata.pingdata_api_client",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+if TYPE_CHECKING:
+    from .pingvision.pingvision_api_client import PingVisionAPIClient
+    from .sov_fixer.sov_fixer_api_client import SOVFixerAPIClient
+    from .sov_fixer.types import INCOMPLETE_STATUSES, SOV_RESULT_STATUS, SOV_STATUS
+    from .pingmaps.pingmaps_api_client import PingMapsAPIClient
+    from .url_signature_factory import UrlSignatureFactory
+    from .pingdata.pingdata_api_client import PingDataAPIClient
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
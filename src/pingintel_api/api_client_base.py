@@ -1,7 +1,9 @@
 import configparser
+import copy
 import logging
 import os
 import pathlib
+import urllib.parse
 from typing import IO, Collection, overload
 
 import click
@@ -9,7 +11,11 @@ import requests
 import requests
 from requests.adapters import HTTPAdapter, Retry
 
-from .utils import is_fileobj, censor
+from .cache import SingleFlight, TTLCache
+from .json_codec import JSONCodec, get_json_codec
+from .json_stream import JSONArrayStream
+from .structs import to_struct
+from .utils import is_fileobj, censor, raise_for_status, token_fingerprint
 
 from pingintel_api.__about__ import __version__
 
@@ -110,22 +116,120 @@ class APIClientBase:
         self.auth_token = auth_token
         self.environment = environment if api_url is None else None
         self.session = self._create_session()
+        self.json_codec: JSONCodec = get_json_codec()
+        self.struct_decoding = False
+        self.struct_strict = False
+        self._single_flight = SingleFlight()
 
     def get(self, url, **kwargs):
         self.logger.debug(f"GET {url}")
         return self.session.get(url, **kwargs)
 
+    def decode_json(self, response: requests.Response, as_type=None):
+        """Like response.json(), but decoded with this client's JSON codec (orjson or msgspec when installed).
+
+        If struct decoding is on (see use_structs) and `as_type` -- the TypedDict the method is documented to
+        return -- is given, the result is validated and converted to slotted structs."""
+        response_data = self.json_codec.loads(response.content)
+        if as_type is not None and self.struct_decoding:
+            return to_struct(response_data, as_type, strict=self.struct_strict)
+        return response_data
+
+    def use_structs(self, enabled: bool = True, strict: bool = False):
+        """Return typed responses as slotted Struct objects generated from the TypedDicts in the `types` modules,
+        instead of plain dicts.  Structs take about half the memory, support attribute access
+        (`response.results[0].workflow_status_name`) as well as the dict interface, and are validated against
+        the TypedDict while decoding, raising structs.SchemaMismatchError on a missing field or a value of the
+        wrong type.  With `strict`, fields the TypedDict doesn't declare are a mismatch too.
+
+        Applies to the methods with a TypedDict return type; the others keep returning dicts, as do responses
+        trimmed with a `fields` parameter, which can't match the full TypedDict."""
+        self.struct_decoding = enabled
+        self.struct_strict = strict
+
+    def get_json_cached(self, url, params: dict | None = None, cache: TTLCache | None = None):
+        """GET `url` and return the decoded JSON, serving it from `cache` while fresh.
+
+        Once an entry is stale it is revalidated with If-None-Match/If-Modified-Since when the server sent an ETag
+        or Last-Modified, so unchanged data costs a 304 rather than a full response.  Identical requests made
+        concurrently from several threads are coalesced into one.  Each call returns its own copy, so callers may
+        modify the result without affecting the cache.  Entries are keyed by a fingerprint of the auth token as
+        well as the URL, so a cache shared between users (e.g. persisted to one file) never serves one user's
+        data to another."""
+        if cache is None:
+            response = self.get(url, params=params)
+            raise_for_status(response)
+            return self.decode_json(response)
+
+        params = {key: value for key, value in (params or {}).items() if value is not None}
+        query = urllib.parse.urlencode(sorted(params.items()), doseq=True)
+        key = f"{token_fingerprint(self.auth_token)}:{url}?{query}"
+        entry = cache.get_entry(key)
+        if entry is not None and cache.is_fresh(entry):
+            self.logger.debug(f"Cache hit for {key}")
+            value = entry["value"]
+        else:
+            value = self._single_flight.do(key, lambda: self._get_json_revalidate(url, params, cache, key))
+        return copy.deepcopy(value)
+
+    def get_json_stream(
+        self, url, params: dict | None = None, key: str | None = "results", chunk_size: int = 64 * 1024
+    ) -> JSONArrayStream:
+        """GET `url` and parse the response incrementally, yielding the items of its `key` array as they arrive
+        instead of decoding the whole body first.  The other top-level fields are in the stream's `envelope`
+        once iteration is finished; see JSONArrayStream."""
+        response = self.get(url, params=params, stream=True)
+        raise_for_status(response)
+
+        def chunks():
+            with response:
+                yield from response.iter_content(chunk_size=chunk_size)
+
+        return JSONArrayStream(chunks(), key=key)
+
+    def _get_json_revalidate(self, url, params: dict, cache: TTLCache, key: str):
+        entry = cache.get_entry(key)
+        if entry is not None and cache.is_fresh(entry):
+            # another thread refreshed it while we were waiting to start.
+            return entry["value"]
+
+        headers = {}
+        if entry is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        response = self.get(url, params=params, headers=headers)
+        if response.status_code == 304 and entry is not None:
+            self.logger.debug(f"Cache revalidated for {key}")
+            cache.touch(key)
+            return entry["value"]
+        raise_for_status(response)
+
+        response_data = self.decode_json(response)
+        cache.set(key, response_data, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        return response_data
+
     def post(self, url, **kwargs):
         self.logger.debug(f"POST {url}")
         if "data" in kwargs:
             self.logger.debug(f"POST data: {kwargs['data']}")
-        return self.session.post(url, **kwargs)
+        return self.session.post(url, **self._encode_json_body(kwargs))
 
     def patch(self, url, **kwargs):
         self.logger.debug(f"PATCH {url}")
         if "data" in kwargs:
             self.logger.debug(f"PATCH data: {kwargs['data']}")
-        return self.session.patch(url, **kwargs)
+        return self.session.patch(url, **self._encode_json_body(kwargs))
+
+    def _encode_json_body(self, kwargs: dict) -> dict:
+        """Encode a `json=` body with this client's JSON codec instead of letting requests use the stdlib."""
+        if kwargs.get("json") is None:
+            return kwargs
+        kwargs = dict(kwargs)
+        kwargs["data"] = self.json_codec.dumps(kwargs.pop("json"))
+        kwargs["headers"] = {"Content-Type": "application/json", **(kwargs.get("headers") or {})}
+        return kwargs
 
     def _create_session(self):
         session = requests.Session()
@@ -148,6 +252,17 @@ class APIClientBase:
 
         return session
 
+    def ensure_connection_pool_size(self, size: int):
+        """Make sure `size` threads can share this client's session without discarding pooled connections.
+
+        requests' default adapter keeps at most 10 connections per host, so concurrent batch helpers call this
+        before fanning out."""
+        adapter = self.session.get_adapter("https://")
+        if getattr(adapter, "_pool_maxsize", 0) >= size:
+            return
+        self.logger.debug(f"Growing connection pool to {size}.")
+        self.session.mount("https://", HTTPAdapter(max_retries=adapter.max_retries, pool_maxsize=size))
+
     def get_api_url_by_environment(self, environment: str) -> str:
         if self.include_legacy_dashes:
             if environment == "prod":
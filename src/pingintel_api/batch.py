@@ -0,0 +1,152 @@
+# Copyright 2021-2024 Ping Data Intelligence
+
+import json
+import logging
+import os
+import pathlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from timeit import default_timer as timer
+from typing import Any, Callable, Hashable, Mapping
+
+logger = logging.getLogger(__name__)
+
+
+class BatchManifest:
+    """Append-only JSONL log of batch job progress, one JSON object per line.
+
+    Entries are keyed by `key_field`; when a key appears more than once the last line wins, so a job can be
+    recorded as "started" and later rewritten as "done" or "error".  Re-opening an existing manifest restores
+    those entries, which is what lets a crashed batch resume where it left off.
+    """
+
+    def __init__(self, path: str | pathlib.Path | None, key_field: str = "path"):
+        self.path = path
+        self.key_field = key_field
+        self.entries: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        with open(self.path, "r", encoding="utf-8") as fd:
+            for lineno, line in enumerate(fd, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # a crash mid-write can leave a truncated final line.
+                    logger.warning(f"Ignoring unreadable line {lineno} of manifest {self.path}.")
+                    continue
+                self.entries[str(entry[self.key_field])] = entry
+        logger.info(f"Loaded {len(self.entries)} entries from manifest {self.path}.")
+
+    def get(self, key) -> dict | None:
+        return self.entries.get(str(key))
+
+    def is_done(self, key) -> bool:
+        entry = self.get(key)
+        return bool(entry) and entry.get("state") == "done"
+
+    def write(self, entry: dict):
+        key = str(entry[self.key_field])
+        with self._lock:
+            self.entries[key] = entry
+            if not self.path:
+                return
+            with open(self.path, "a", encoding="utf-8") as fd:
+                fd.write(json.dumps(entry, default=str) + "\n")
+                fd.flush()
+                os.fsync(fd.fileno())
+
+
+class RateLimiter:
+    """Thread-safe limit of `rate` calls per second, shared by all threads that call acquire()."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_time = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+class BatchStats:
+    """Thread-safe counters and throughput for a batch run."""
+
+    def __init__(self, total: int, label: str = "items"):
+        self.total = total
+        self.label = label
+        self.succeeded = 0
+        self.failed = 0
+        self.errored = 0
+        self.skipped = 0
+        self._start_time = timer()
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self) -> int:
+        return self.succeeded + self.failed + self.errored + self.skipped
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return timer() - self._start_time
+
+    def record(self, outcome: str):
+        """Record one finished item.  `outcome` is one of "succeeded", "failed", "errored", "skipped"."""
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+            processed = self.finished - self.skipped
+            elapsed = self.elapsed_seconds
+            per_minute = processed / elapsed * 60.0 if elapsed else 0.0
+            logger.info(
+                f"[{self.finished}/{self.total}] {self.succeeded} succeeded, {self.failed} failed, "
+                f"{self.errored} errored, {self.skipped} skipped ({per_minute:.1f} {self.label}/min)."
+            )
+
+    def summary(self) -> dict:
+        elapsed = self.elapsed_seconds
+        processed = self.finished - self.skipped
+        return {
+            "total": self.total,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "errored": self.errored,
+            "skipped": self.skipped,
+            "elapsed_seconds": round(elapsed, 3),
+            "per_minute": round(processed / elapsed * 60.0, 3) if elapsed else 0.0,
+        }
+
+
+def fan_out(
+    fn: Callable[..., Any], calls: Mapping[Hashable, tuple], concurrency: int = 8, name: str = "fan_out"
+) -> tuple[dict, dict[Hashable, str]]:
+    """Call `fn(*args)` for every `key: args` in `calls` on up to `concurrency` threads.
+
+    Returns `(results, errors)`, both keyed like `calls`.  A failed call is recorded in `errors` as its message
+    rather than aborting the others."""
+    results = {}
+    errors = {}
+    if not calls:
+        return results, errors
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=name) as executor:
+        futures = {executor.submit(fn, *args): key for key, args in calls.items()}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                logger.warning(f"{name}: {key} failed: {e}")
+                errors[key] = str(e)
+    return results, errors
@@ -0,0 +1,195 @@
+# Copyright 2021-2024 Ping Data Intelligence
+
+import atexit
+import json
+import logging
+import os
+import pathlib
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import timedelta
+from typing import Any, Callable, Hashable, TypedDict
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCacheEntry(TypedDict):
+    value: Any
+    expires_at: float
+    etag: str | None
+    last_modified: str | None
+
+
+class TTLCache:
+    """Thread-safe cache whose entries go stale `ttl` after they were stored, optionally persisted to a JSON file.
+
+    Stale entries are kept, along with the ETag/Last-Modified they were fetched with, so a caller can revalidate
+    them with a conditional request and `touch()` them on a 304 instead of downloading the data again.  See
+    APIClientBase.get_json_cached().  At most `max_entries` are kept: beyond that, stale entries are dropped
+    first, then the least recently used.
+
+    With `path`, the cache is written back at most once every `save_interval` seconds (and at exit, or on
+    flush()), rather than on every change.  Values must be JSON-serializable then.
+
+    get() and get_entry() return the stored objects themselves, not copies.
+    """
+
+    def __init__(
+        self,
+        ttl: timedelta | float = timedelta(minutes=10),
+        path: str | pathlib.Path | None = None,
+        max_entries: int | None = 1024,
+        save_interval: float = 5.0,
+    ):
+        self.ttl = ttl.total_seconds() if isinstance(ttl, timedelta) else float(ttl)
+        self.path = pathlib.Path(path).expanduser() if path else None
+        self.max_entries = max_entries
+        self.save_interval = save_interval
+        self.entries: OrderedDict[str, TTLCacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._saved_at = 0.0
+        if self.path:
+            if self.path.exists():
+                try:
+                    with open(self.path, "r", encoding="utf-8") as fd:
+                        self.entries = OrderedDict(json.load(fd))
+                except (OSError, json.JSONDecodeError) as e:
+                    logger.warning(f"Ignoring unreadable cache {self.path}: {e}")
+                self._evict()
+            atexit.register(_flush_at_exit, weakref.ref(self))
+
+    def __contains__(self, key: str):
+        return self.get_entry(key) is not None
+
+    def __len__(self):
+        with self._lock:
+            return len(self.entries)
+
+    def get_entry(self, key: str) -> TTLCacheEntry | None:
+        """Return the entry for `key` even if it is stale."""
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    @staticmethod
+    def is_fresh(entry: TTLCacheEntry) -> bool:
+        return entry["expires_at"] > time.time()
+
+    def get(self, key: str, default=None):
+        """Return the value for `key` if it is fresh, else `default`."""
+        entry = self.get_entry(key)
+        if entry is None or not self.is_fresh(entry):
+            return default
+        return entry["value"]
+
+    def set(self, key: str, value, etag: str | None = None, last_modified: str | None = None) -> TTLCacheEntry:
+        entry: TTLCacheEntry = {
+            "value": value,
+            "expires_at": time.time() + self.ttl,
+            "etag": etag,
+            "last_modified": last_modified,
+        }
+        with self._lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            self._evict()
+            self._changed()
+        return entry
+
+    def touch(self, key: str) -> TTLCacheEntry | None:
+        """Mark a stale entry as fresh again, e.g. after the server answered 304 Not Modified."""
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                entry["expires_at"] = time.time() + self.ttl
+                self.entries.move_to_end(key)
+                self._changed()
+            return entry
+
+    def invalidate(self, key: str | None = None):
+        """Forget `key`, or every entry if no key is given."""
+        with self._lock:
+            if key is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(key, None)
+            self._changed(save_now=True)
+
+    def flush(self):
+        """Write pending changes to `path` now."""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def _evict(self):
+        if self.max_entries is None or len(self.entries) <= self.max_entries:
+            return
+        now = time.time()
+        for key in [key for key, entry in self.entries.items() if entry["expires_at"] <= now]:
+            del self.entries[key]
+            if len(self.entries) <= self.max_entries:
+                return
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def _changed(self, save_now: bool = False):
+        if not self.path:
+            return
+        self._dirty = True
+        if save_now or time.monotonic() - self._saved_at >= self.save_interval:
+            self._save()
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as fd:
+            json.dump(self.entries, fd)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+        self._saved_at = time.monotonic()
+
+
+def _flush_at_exit(cache_ref: "weakref.ref[TTLCache]"):
+    cache = cache_ref()
+    if cache is not None:
+        try:
+            cache.flush()
+        except OSError as e:
+            logger.warning(f"Couldn't save cache {cache.path}: {e}")
+
+
+class SingleFlight:
+    """Coalesces identical concurrent calls: while `do(key, fn)` is running for a key, other threads calling
+    `do()` with the same key wait for it and get the same result (or exception) instead of calling `fn` again."""
+
+    def __init__(self):
+        self._calls: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]):
+        with self._lock:
+            future = self._calls.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = self._calls[key] = Future()
+        if not is_leader:
+            logger.debug(f"Joining in-flight request for {key}")
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
@@ -0,0 +1,290 @@
+# Copyright 2021-2024 Ping Data Intelligence
+
+import math
+import sys
+from array import array
+from typing import Any, Iterable, Iterator, Mapping
+
+INT64_MIN = -(2**63)
+INT64_MAX = 2**63 - 1
+
+
+class _Column:
+    """One column of a ColumnarRecords.  `kind` is the storage in use:
+
+    * "float": array('d'), None stored as NaN (so NaN and None read back the same).
+    * "int": array('q') plus an array('b') validity mask.
+    * "bool": array('b'), -1 for None.
+    * "str": interned -- array('i') of codes into `categories`, -1 for None.
+    * "object": a plain list, used once values of different kinds have been seen.
+
+    The first non-None value picks the kind; a later value that doesn't fit converts the column to "object".
+    """
+
+    def __init__(self, length: int = 0):
+        self.kind = None
+        self.nulls = length  # values appended before the kind is known (all None)
+        self.data = None
+        self.valid = None
+        self.categories: list[str] = []
+        self.codes: dict[str, int] = {}
+
+    def __len__(self):
+        return self.nulls if self.kind is None else len(self.data)
+
+    def append(self, value):
+        if value is None:
+            self._append_none()
+            return
+        if self.kind is None:
+            self._start(value)
+        kind = self.kind
+        if kind == "float" and isinstance(value, (float, int)) and not isinstance(value, bool):
+            self.data.append(value)
+        elif kind == "int" and type(value) is int and INT64_MIN <= value <= INT64_MAX:
+            self.data.append(value)
+            self.valid.append(1)
+        elif kind == "bool" and isinstance(value, bool):
+            self.data.append(value)
+        elif kind == "str" and isinstance(value, str):
+            code = self.codes.get(value)
+            if code is None:
+                code = self.codes[value] = len(self.categories)
+                self.categories.append(sys.intern(value))
+            self.data.append(code)
+        elif kind == "object":
+            self.data.append(value)
+        elif kind == "int" and isinstance(value, float):
+            self._convert("float")
+            self.data.append(value)
+        else:
+            self._convert("object")
+            self.data.append(value)
+
+    def _append_none(self):
+        if self.kind is None:
+            self.nulls += 1
+        elif self.kind == "float":
+            self.data.append(math.nan)
+        elif self.kind == "int":
+            self.data.append(0)
+            self.valid.append(0)
+        elif self.kind in ("bool", "str"):
+            self.data.append(-1)
+        else:
+            self.data.append(None)
+
+    def _start(self, value):
+        if isinstance(value, bool):
+            kind = "bool"
+        elif type(value) is int and INT64_MIN <= value <= INT64_MAX:
+            kind = "int"
+        elif isinstance(value, float):
+            kind = "float"
+        elif isinstance(value, str):
+            kind = "str"
+        else:
+            kind = "object"
+        self._init(kind, [None] * self.nulls)
+
+    def _init(self, kind: str, values: list):
+        self.kind = kind
+        self.valid = None
+        self.categories = []
+        self.codes = {}
+        if kind == "float":
+            self.data = array("d")
+        elif kind == "int":
+            self.data = array("q")
+            self.valid = array("b")
+        elif kind == "bool":
+            self.data = array("b")
+        elif kind == "str":
+            self.data = array("i")
+        else:
+            self.data = []
+        for value in values:
+            self.append(value)
+
+    def _convert(self, kind: str):
+        self._init(kind, self.values())
+
+    def get(self, i: int):
+        kind = self.kind
+        if kind is None:
+            return None
+        value = self.data[i]
+        if kind == "float":
+            return None if math.isnan(value) else value
+        if kind == "int":
+            return value if self.valid[i] else None
+        if kind == "bool":
+            return None if value < 0 else bool(value)
+        if kind == "str":
+            return None if value < 0 else self.categories[value]
+        return value
+
+    def values(self) -> list:
+        return [self.get(i) for i in range(len(self))] if self.kind else [None] * self.nulls
+
+    @property
+    def nbytes(self) -> int:
+        if self.kind is None:
+            return 0
+        if self.kind == "object":
+            return sys.getsizeof(self.data)
+        size = self.data.itemsize * len(self.data)
+        if self.valid is not None:
+            size += len(self.valid)
+        if self.kind == "str":
+            size += sum(sys.getsizeof(category) for category in self.categories)
+        return size
+
+
+class ColumnarRecords:
+    """Compact, column-oriented container for large sets of flat records (e.g. PingMaps locations or PingData
+    enhance results).
+
+    Records are consumed one at a time (so it can be built straight from an iterator over a streamed response)
+    and each field is stored in a typed `array` -- 8 bytes per float or int, 1 per bool -- instead of a dict per
+    record.  Strings are interned: each distinct value (occupancy codes, flood zones, ...) is stored once and rows
+    hold a small integer code.  Columns can appear partway through; earlier rows read back as None.
+
+        locations = ColumnarRecords.from_records(client.get_policy_locations_tiled(sovid)["results"])
+        df = locations.to_pandas()   # numeric columns share memory; strings become Categoricals
+
+    to_numpy/to_pandas/to_arrow need numpy, pandas and pyarrow respectively.  By default they wrap the container's
+    buffers without copying, which freezes it: an `array` can't grow while NumPy holds a view of it, so append()
+    and extend() raise BufferError from then on.  Pass `copy=True` to export copies and keep the container
+    appendable.
+    """
+
+    def __init__(self, columns: Iterable[str] | None = None):
+        self._columns: dict[str, _Column] = {}
+        self._length = 0
+        self.frozen = False
+        for name in columns or ():
+            self._columns[name] = _Column()
+
+    @classmethod
+    def from_records(cls, records: Iterable[Mapping[str, Any]], columns: Iterable[str] | None = None):
+        """Build from `records`.  If `columns` is given, only those fields are kept."""
+        self = cls(columns)
+        self.extend(records, only_known_columns=columns is not None)
+        return self
+
+    def append(self, record: Mapping[str, Any], only_known_columns: bool = False):
+        if self.frozen:
+            raise BufferError("ColumnarRecords can't grow after exporting its buffers; export with copy=True instead.")
+        columns = self._columns
+        for name, value in record.items():
+            column = columns.get(name)
+            if column is None:
+                if only_known_columns:
+                    continue
+                column = columns[name] = _Column(self._length)
+            column.append(value)
+        self._length += 1
+        for column in columns.values():
+            if len(column) < self._length:
+                column._append_none()
+
+    def extend(self, records: Iterable[Mapping[str, Any]], only_known_columns: bool = False):
+        for record in records:
+            self.append(record, only_known_columns)
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def columns(self) -> list[str]:
+        return list(self._columns)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self._columns.values())
+
+    def column(self, name: str) -> list:
+        return self._columns[name].values()
+
+    def __getitem__(self, i: int) -> dict:
+        if i < 0:
+            i += self._length
+        if not 0 <= i < self._length:
+            raise IndexError(i)
+        return {name: column.get(i) for name, column in self._columns.items()}
+
+    def __iter__(self) -> Iterator[dict]:
+        for i in range(self._length):
+            yield self[i]
+
+    def _buffer(self, data: array, dtype, copy: bool):
+        import numpy as np
+
+        values = np.frombuffer(data, dtype=dtype)
+        if copy:
+            return values.copy()
+        self.frozen = True
+        return values
+
+    def to_numpy(self, name: str, copy: bool = False):
+        """The column as a NumPy array.  Float and int columns without nulls share memory with the container unless
+        `copy`; others are converted (ints/bools with nulls become float with NaN, strings become object arrays)."""
+        import numpy as np
+
+        column = self._columns[name]
+        if column.kind == "float":
+            return self._buffer(column.data, np.float64, copy)
+        if column.kind == "int":
+            values = self._buffer(column.data, np.int64, copy)
+            valid = np.frombuffer(column.valid, dtype=np.int8).astype(bool)
+            return values if valid.all() else np.where(valid, values, np.nan)
+        if column.kind == "bool":
+            values = np.array(column.data, dtype=np.int8)
+            return values.astype(bool) if (values >= 0).all() else np.where(values >= 0, values, np.nan)
+        result = np.empty(self._length, dtype=object)
+        result[:] = column.values()
+        return result
+
+    def to_pandas(self, copy: bool = False):
+        """A pandas DataFrame.  Numeric columns wrap the container's buffers where possible (unless `copy`), string
+        columns become Categoricals built from the interned codes, and ints with nulls use the nullable Int64
+        dtype."""
+        import numpy as np
+        import pandas as pd
+
+        data = {}
+        for name, column in self._columns.items():
+            if column.kind == "str":
+                codes = self._buffer(column.data, np.int32, copy)
+                data[name] = pd.Categorical.from_codes(codes, categories=column.categories)
+            elif column.kind == "int":
+                values = self._buffer(column.data, np.int64, copy)
+                mask = np.frombuffer(column.valid, dtype=np.int8) == 0
+                data[name] = pd.arrays.IntegerArray(values, mask) if mask.any() else values
+            else:
+                data[name] = self.to_numpy(name, copy)
+        return pd.DataFrame(data, copy=False) if data else pd.DataFrame(index=range(self._length))
+
+    def to_arrow(self, copy: bool = False):
+        """A pyarrow Table.  Numeric buffers are wrapped without copying unless `copy`; string columns become
+        dictionary arrays over the interned categories."""
+        import numpy as np
+        import pyarrow as pa
+
+        arrays = {}
+        for name, column in self._columns.items():
+            if column.kind == "float":
+                values = self.to_numpy(name, copy)
+                arrays[name] = pa.array(values, mask=np.isnan(values)) if np.isnan(values).any() else pa.array(values)
+            elif column.kind == "int":
+                values = self._buffer(column.data, np.int64, copy)
+                mask = np.frombuffer(column.valid, dtype=np.int8) == 0
+                arrays[name] = pa.array(values, mask=mask) if mask.any() else pa.array(values)
+            elif column.kind == "str":
+                codes = self._buffer(column.data, np.int32, copy)
+                indices = pa.array(codes, mask=codes < 0)
+                arrays[name] = pa.DictionaryArray.from_arrays(indices, pa.array(column.categories, type=pa.string()))
+            else:
+                arrays[name] = pa.array(column.values())
+        return pa.table(arrays)
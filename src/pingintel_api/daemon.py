@@ -0,0 +1,335 @@
+#!/usr/bin/env python
+
+# Copyright 2021-2024 Ping Data Intelligence
+
+"""
+pingintel-daemon
+
+Long-lived local server that runs sovfixerapi/pingvisionapi/pingdataapi/pingmapsapi commands on behalf of the
+command line tools, so that scripts invoking them many times don't pay for imports, reading ~/.pingintel.ini
+and a new TLS connection on every call:
+
+    pingintel-daemon serve &
+    export PINGINTEL_DAEMON_SOCKET=$XDG_RUNTIME_DIR/pingintel-daemon.sock
+    pingdataapi enhance -a "1 Main St, Houston TX"    # forwarded to the daemon
+
+Commands run one at a time, in the caller's working directory and with the caller's environment variables, so
+auth tokens (`*_AUTH_TOKEN*`, ~/.pingintel.ini) and PINGINTEL_JSON_CODEC resolve exactly as they would have
+locally.  The API clients -- and their open connections -- are kept between commands, one per api url, resolved
+auth token and JSON codec.
+"""
+
+import contextlib
+import importlib
+import io
+import json
+import logging
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+import traceback
+
+import click
+
+from pingintel_api.daemon_client import TOOLS, default_socket_path, send_request
+from pingintel_api.utils import set_verbosity
+
+logger = logging.getLogger(__name__)
+
+
+class ClientRegistry:
+    """API clients kept across commands, one per client class, api url, auth token and JSON codec."""
+
+    def __init__(self):
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def get(self, client_cls, **kwargs):
+        # construct the client every time, so its auth token and codec are resolved from the current command's
+        # environment, then hand back the kept one if it resolved to the same thing.
+        candidate = client_cls(**kwargs)
+        key = (client_cls, candidate.api_url, candidate.auth_token, type(candidate.json_codec))
+        with self._lock:
+            client = self._clients.setdefault(key, candidate)
+        if client is candidate:
+            logger.info(f"Created {client_cls.__name__} for {client.api_url}")
+        else:
+            candidate.session.close()
+        return client
+
+    def describe(self) -> list[str]:
+        with self._lock:
+            return [f"{client.__class__.__name__} {client.api_url}" for client in self._clients.values()]
+
+
+class _MessageStream(io.TextIOBase):
+    """Text stream that sends everything written to it to the forwarding CLI as `{"stream": ..., "data": ...}`."""
+
+    def __init__(self, wfile, name: str, lock: threading.Lock):
+        self.wfile = wfile
+        self.name = name
+        self.lock = lock
+        self.disconnected = False
+
+    def writable(self):
+        return True
+
+    def isatty(self):
+        return False
+
+    def write(self, data: str) -> int:
+        if not isinstance(data, str):
+            # like any text stream; click probes with write(b"") to tell text streams from binary ones.
+            raise TypeError(f"write() argument must be str, not {type(data).__name__}")
+        if data and not self.disconnected:
+            message = json.dumps({"stream": self.name, "data": data}).encode("utf-8") + b"\n"
+            try:
+                with self.lock:
+                    self.wfile.write(message)
+                    self.wfile.flush()
+            except OSError:
+                # the caller went away; let the command finish anyway.
+                self.disconnected = True
+        return len(data)
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, daemon: "CLIDaemon"):
+        self.cli_daemon = daemon
+        super().__init__(socket_path, _RequestHandler)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+        except ValueError:
+            return
+        daemon: CLIDaemon = self.server.cli_daemon
+        command = request.get("command")
+        if command == "run":
+            daemon.run_command(request, self.wfile)
+        elif command == "status":
+            self._reply({"exit_code": 0, "status": daemon.status()})
+        elif command == "stop":
+            self._reply({"exit_code": 0})
+            threading.Thread(target=self.server.shutdown).start()
+        else:
+            self._reply({"exit_code": 2, "error": f"Unknown command {command!r}."})
+
+    def _reply(self, message: dict):
+        self.wfile.write(json.dumps(message).encode("utf-8") + b"\n")
+
+
+class CLIDaemon:
+    """Serves forwarded command line invocations on a Unix socket; see the module docstring."""
+
+    def __init__(self, socket_path: str, idle_timeout: float | None = None):
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self.clients = ClientRegistry()
+        self.started_at = time.time()
+        self.last_activity = time.monotonic()
+        self.commands_run = 0
+        self._run_lock = threading.Lock()
+        self._server = None
+
+    def serve_forever(self):
+        self._remove_stale_socket()
+        # warm up: import every tool and its client now rather than on the first command.
+        for module_name in TOOLS.values():
+            importlib.import_module(module_name)
+        import pingintel_api
+
+        for name in ("PingDataAPIClient", "PingMapsAPIClient", "PingVisionAPIClient", "SOVFixerAPIClient"):
+            getattr(pingintel_api, name)
+
+        old_umask = os.umask(0o077)  # the daemon holds auth tokens: only this user may connect.
+        try:
+            self._server = _Server(self.socket_path, self)
+        finally:
+            os.umask(old_umask)
+        if self.idle_timeout:
+            threading.Thread(target=self._watch_idle, daemon=True).start()
+
+        logger.info(f"pingintel-daemon listening on {self.socket_path}")
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.socket_path)
+            logger.info("pingintel-daemon stopped.")
+
+    def run_command(self, request: dict, wfile):
+        tool = request.get("tool")
+        if tool not in TOOLS:
+            wfile.write(json.dumps({"exit_code": 2, "error": f"Unknown tool {tool!r}."}).encode("utf-8") + b"\n")
+            return
+        cli = importlib.import_module(TOOLS[tool]).cli
+        write_lock = threading.Lock()
+        stdout = _MessageStream(wfile, "stdout", write_lock)
+        stderr = _MessageStream(wfile, "stderr", write_lock)
+
+        with self._run_lock:
+            self.last_activity = time.monotonic()
+            root_logger = logging.getLogger()
+            handlers, level = root_logger.handlers[:], root_logger.level
+            cwd = os.getcwd()
+            try:
+                with (
+                    contextlib.redirect_stdout(stdout),
+                    contextlib.redirect_stderr(stderr),
+                    _redirect_stdin(io.StringIO()),
+                    _caller_environ(request.get("env")),
+                ):
+                    try:
+                        os.chdir(request.get("cwd") or cwd)
+                    except OSError as e:
+                        click.echo(f"Can't run in {request.get('cwd')}: {e}", err=True)
+                        exit_code = 1
+                    else:
+                        exit_code = self._invoke(cli, tool, request.get("args") or [])
+            finally:
+                os.chdir(cwd)
+                # the command's set_verbosity() pointed logging at this caller's stderr.
+                root_logger.handlers, root_logger.level = handlers, level
+                self.commands_run += 1
+                self.last_activity = time.monotonic()
+
+        if not stdout.disconnected:
+            with contextlib.suppress(OSError), write_lock:
+                wfile.write(json.dumps({"exit_code": exit_code}).encode("utf-8") + b"\n")
+
+    def _invoke(self, cli: click.Group, tool: str, args: list[str]) -> int:
+        try:
+            cli.main(args=args, prog_name=tool, standalone_mode=False, obj={"clients": self.clients})
+            return 0
+        except click.exceptions.Exit as e:
+            return e.exit_code
+        except click.ClickException as e:
+            e.show()
+            return e.exit_code
+        except click.exceptions.Abort:
+            click.echo("Aborted!", err=True)
+            return 1
+        except SystemExit as e:
+            return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except Exception:
+            traceback.print_exc()
+            return 1
+
+    def status(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "socket": self.socket_path,
+            "uptime_seconds": round(time.time() - self.started_at),
+            "commands_run": self.commands_run,
+            "clients": self.clients.describe(),
+        }
+
+    def _remove_stale_socket(self):
+        if not os.path.exists(self.socket_path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except ConnectionRefusedError:
+            os.unlink(self.socket_path)
+        else:
+            raise click.ClickException(f"A pingintel-daemon is already listening on {self.socket_path}.")
+        finally:
+            probe.close()
+
+    def _watch_idle(self):
+        while True:
+            time.sleep(min(self.idle_timeout, 5))
+            if self._run_lock.locked():
+                continue
+            if time.monotonic() - self.last_activity > self.idle_timeout:
+                logger.info(f"Idle for {self.idle_timeout:g}s, shutting down.")
+                self._server.shutdown()
+                return
+
+
+@contextlib.contextmanager
+def _redirect_stdin(stream):
+    old_stdin, sys.stdin = sys.stdin, stream
+    try:
+        yield
+    finally:
+        sys.stdin = old_stdin
+
+
+@contextlib.contextmanager
+def _caller_environ(environ: dict | None):
+    if environ is None:
+        yield
+        return
+    old_environ = dict(os.environ)
+    os.environ.clear()
+    os.environ.update(environ)
+    try:
+        yield
+    finally:
+        os.environ.clear()
+        os.environ.update(old_environ)
+
+
+socket_option = click.option(
+    "--socket",
+    "socket_path",
+    default=default_socket_path,
+    show_default="$PINGINTEL_DAEMON_SOCKET or $XDG_RUNTIME_DIR/pingintel-daemon.sock",
+    help="Unix socket to listen or connect on.",
+)
+
+
+@click.group()
+def cli():
+    pass
+
+
+@cli.command()
+@socket_option
+@click.option("--idle-timeout", type=float, help="Exit after this many seconds without a command.")
+@click.option(
+    "-v", "--verbose", count=True, help="Can be used multiple times. -v for INFO, -vv for DEBUG, -vvv for very DEBUG."
+)
+def serve(socket_path, idle_timeout, verbose):
+    """Run the daemon in the foreground."""
+    set_verbosity(verbose)
+    CLIDaemon(socket_path, idle_timeout=idle_timeout).serve_forever()
+
+
+@cli.command()
+@socket_option
+def status(socket_path):
+    """Show whether a daemon is running, and what it holds."""
+    result = send_request(socket_path, {"command": "status"})
+    if result is None:
+        raise click.ClickException(f"No pingintel-daemon is listening on {socket_path}.")
+    for key, value in result["status"].items():
+        click.echo(f"{key}: {value}")
+
+
+@cli.command()
+@socket_option
+def stop(socket_path):
+    """Stop a running daemon."""
+    if send_request(socket_path, {"command": "stop"}) is None:
+        raise click.ClickException(f"No pingintel-daemon is listening on {socket_path}.")
+    click.echo("Stopped.")
+
+
+def main():
+    cli()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# Copyright 2021-2024 Ping Data Intelligence
+
+"""Entry points of the command line tools.
+
+If PINGINTEL_DAEMON_SOCKET is set and a `pingintel-daemon` is listening on it, the command is forwarded -- along
+with the working directory and environment variables -- to the daemon, which runs it with already-imported modules
+and warm API clients, and its output and exit status are relayed back.  Otherwise (or if the daemon isn't running) the command runs in this process as usual.
+
+This module is imported on every invocation, so it must stay cheap: stdlib only, and nothing is imported from
+the rest of the package unless the command runs locally.
+"""
+
+import importlib
+import json
+import os
+import socket
+import sys
+
+SOCKET_ENV_VAR = "PINGINTEL_DAEMON_SOCKET"
+
+TOOLS = {
+    "sovfixerapi": "pingintel_api.sovfixerapi_cmd",
+    "pingvisionapi": "pingintel_api.pingvisionapi_cmd",
+    "pingdataapi": "pingintel_api.pingdataapi_cmd",
+    "pingmapsapi": "pingintel_api.pingmapsapi_cmd",
+}
+
+
+def default_socket_path() -> str:
+    path = os.environ.get(SOCKET_ENV_VAR)
+    if path:
+        return os.path.expanduser(path)
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or os.path.expanduser("~")
+    return os.path.join(runtime_dir, "pingintel-daemon.sock")
+
+
+def send_request(socket_path: str, request: dict, on_message=None) -> dict | None:
+    """Send `request` to the daemon at `socket_path`, calling `on_message` with each message it sends back until
+    the final one (which has an `exit_code`), and return that.  None if no daemon is listening."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        sock.close()
+        return None
+
+    with sock, sock.makefile("rb") as reader:
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        for line in reader:
+            message = json.loads(line)
+            if "exit_code" in message:
+                return message
+            if on_message is not None:
+                on_message(message)
+    # the daemon went away mid-command.
+    return {"exit_code": 1, "error": "Lost connection to pingintel-daemon."}
+
+
+def forward(tool: str, args: list[str], socket_path: str) -> int | None:
+    """Run `tool args` on the daemon, relaying its output.  Returns the exit code, or None if the command has to
+    run locally."""
+    if "-" in args:
+        # reads stdin, which can't be forwarded.
+        return None
+
+    def relay(message):
+        stream = sys.stderr if message.get("stream") == "stderr" else sys.stdout
+        stream.write(message.get("data", ""))
+        stream.flush()
+
+    request = {"command": "run", "tool": tool, "args": args, "cwd": os.getcwd(), "env": dict(os.environ)}
+    result = send_request(socket_path, request, relay)
+    if result is None:
+        return None
+    if result.get("error"):
+        sys.stderr.write(result["error"] + "\n")
+    return result["exit_code"]
+
+
+def run(tool: str):
+    socket_path = os.environ.get(SOCKET_ENV_VAR)
+    if socket_path:
+        exit_code = forward(tool, sys.argv[1:], os.path.expanduser(socket_path))
+        if exit_code is not None:
+            sys.exit(exit_code)
+    importlib.import_module(TOOLS[tool]).main()
+
+
+def sovfixerapi():
+    run("sovfixerapi")
+
+
+def pingvisionapi():
+    run("pingvisionapi")
+
+
+def pingdataapi():
+    run("pingdataapi")
+
+
+def pingmapsapi():
+    run("pingmapsapi")
@@ -0,0 +1,82 @@
+# Copyright 2021-2024 Ping Data Intelligence
+
+import json
+import os
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+class JSONCodec:
+    """Encodes request bodies and decodes response bodies for the API clients, using the stdlib json module.
+
+    Subclasses use faster optional backends; get_json_codec() picks the best one installed.  All of them raise
+    json.JSONDecodeError for invalid input."""
+
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    def loads(self, data: bytes | str) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    name = "orjson"
+
+    def dumps(self, obj: Any) -> bytes:
+        # OPT_NON_STR_KEYS: stringify int/enum keys like the stdlib does.
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, data: bytes | str) -> Any:
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError.
+        return orjson.loads(data)
+
+
+class MsgspecCodec(JSONCodec):
+    name = "msgspec"
+
+    def __init__(self):
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+    def loads(self, data: bytes | str) -> Any:
+        try:
+            return self._decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise json.JSONDecodeError(str(e), data if isinstance(data, str) else "", 0) from e
+
+
+CODECS = {
+    "orjson": (OrjsonCodec, lambda: orjson is not None),
+    "msgspec": (MsgspecCodec, lambda: msgspec is not None),
+    "json": (JSONCodec, lambda: True),
+}
+
+
+def get_json_codec(name: str | None = None) -> JSONCodec:
+    """Return the codec called `name`, or if not given, the one named by the PINGINTEL_JSON_CODEC environment
+    variable, else the fastest installed (orjson, then msgspec, then the stdlib)."""
+    name = name or os.environ.get("PINGINTEL_JSON_CODEC")
+    if name:
+        if name not in CODECS:
+            raise ValueError(f"Unknown JSON codec {name!r}, expected one of {', '.join(CODECS)}.")
+        codec_class, is_available = CODECS[name]
+        if not is_available():
+            raise ImportError(f"JSON codec {name!r} is not installed. Install it with `pip install {name}`.")
+        return codec_class()
+    for codec_class, is_available in CODECS.values():
+        if is_available():
+            return codec_class()
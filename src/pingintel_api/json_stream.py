@@ -0,0 +1,125 @@
+# Copyright 2021-2024 Ping Data Intelligence
+
+import codecs
+import json
+import re
+from typing import Any, Iterable, Iterator
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+VALUE_TERMINATORS = frozenset(",:]} \t\n\r")
+
+
+class JSONArrayStream:
+    """Incrementally parses a JSON document arriving in chunks and yields the items of one array in it as soon as
+    each item has been received, e.g. the `results` of a list response:
+
+        response = session.get(url, stream=True)
+        stream = JSONArrayStream(response.iter_content(chunk_size=65536))
+        for record in stream:
+            ...
+        stream.envelope   # the other top-level fields, e.g. {"cursor_id": ..., "has_remaining": ...}
+
+    `key` names the array within a top-level object; with key=None the document itself must be an array.  Only
+    one item (plus the current network chunk) is held in memory at a time.  Items are decoded with the stdlib
+    json decoder, so they come out exactly as response.json() would produce them.
+
+    Top-level fields are added to `envelope` as they are parsed, so fields that come after the array are only
+    available once iteration is finished.
+    """
+
+    def __init__(self, chunks: Iterable[bytes | str], key: str | None = "results"):
+        self.key = key
+        self.envelope: dict[str, Any] = {}
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._done = False
+        self._started = False
+
+    def __iter__(self) -> Iterator[Any]:
+        if self._started:
+            raise RuntimeError("A JSONArrayStream can only be iterated once.")
+        self._started = True
+
+        if self._expect("{[" if self.key is None else "{") == "[":
+            yield from self._items()
+            self._expect_end()
+            return
+
+        if self._peek() == "}":
+            self._pos += 1
+        else:
+            while True:
+                name = self._value()
+                self._expect(":")
+                if name == self.key:
+                    self._expect("[")
+                    yield from self._items()
+                else:
+                    self.envelope[name] = self._value()
+                if self._expect(",}") == "}":
+                    break
+        self._expect_end()
+
+    def _items(self) -> Iterator[Any]:
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self._value()
+            if self._expect(",]") == "]":
+                return
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the buffer (dropping what has been consumed).  False at end of input."""
+        if self._done:
+            return False
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            text = self._text_decoder.decode(b"", final=True)
+            self._done = True
+        else:
+            text = self._text_decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        self._buf = self._buf[self._pos :] + text
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str | None:
+        while True:
+            self._pos = WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return None
+
+    def _expect(self, chars: str) -> str:
+        char = self._peek()
+        if char is None or char not in chars:
+            expected = " or ".join(repr(c) for c in chars)
+            raise json.JSONDecodeError(f"Expecting {expected}", self._buf, self._pos)
+        self._pos += 1
+        return char
+
+    def _expect_end(self):
+        if self._peek() is not None:
+            raise json.JSONDecodeError("Extra data", self._buf, self._pos)
+
+    def _value(self) -> Any:
+        if self._peek() is None:
+            raise json.JSONDecodeError("Expecting value", self._buf, self._pos)
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                # most likely the value isn't complete yet.
+                if not self._fill():
+                    raise
+                continue
+            # a number is only complete once something other than a digit, ".", "e" or sign follows it; it
+            # may continue in the next chunk.
+            if (end < len(self._buf) and self._buf[end] in VALUE_TERMINATORS) or not self._fill():
+                self._pos = end
+                return value
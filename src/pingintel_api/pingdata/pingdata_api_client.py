@@ -2,13 +2,12 @@
 
 # Copyright 2021-2024 Ping Data Intelligence
 
-import json
 import gzip
 import logging
 import os
 import pprint
 import time
-from typing import Unpack
+from typing import Iterator, Unpack
 
 from pingintel_api.api_client_base import APIClientBase
 from pingintel_api.pingdata import types as t
@@ -91,7 +90,7 @@ class PingDataAPIClient(APIClientBase):
         response = self.get(url, params=data)
 
         raise_for_status(response)
-        response_data = response.json()
+        response_data = self.decode_json(response, t.EnhanceResponse)
         return response_data
 
     def bulk_enhance(
@@ -226,7 +225,7 @@ class PingDataAPIClient(APIClientBase):
                                 fd.write(chunk)
 
                     if verbose:
-                        pprint.pprint(response.json())
+                        pprint.pprint(self.decode_json(response))
                     self.logger.info(f"  - Downloaded {output_description} output: {output_path}.")
             return {"success": True, "id": request_id, "output_files": output_files}
         else:
@@ -260,7 +259,7 @@ class PingDataAPIClient(APIClientBase):
         #     pprint.pprint(data)
 
         additional_headers = {"Content-Type": "application/json"}
-        data2 = json.dumps(data).encode("utf-8")
+        data2 = self.json_codec.dumps(data)
         uncompressed_json_size = len(data2)
         if uncompressed_json_size > 50_000:
             additional_headers["Content-Encoding"] = "gzip"
@@ -281,7 +280,7 @@ class PingDataAPIClient(APIClientBase):
 
         raise_for_status(response)
 
-        response_data = response.json()
+        response_data = self.decode_json(response)
         return response_data
 
     def bulk_enhance_async_get_status_url(self, request_id):
@@ -297,7 +296,7 @@ class PingDataAPIClient(APIClientBase):
                 self.logger.warning(f"retrying get-progress: {response.status_code}: {response.text}")
                 time.sleep(0.25)
         raise_for_status(response)
-        response_data = response.json()
+        response_data = self.decode_json(response, t.BulkEnhanceResponseCheckProgress)
         return response_data
 
     def get_usage(
@@ -338,7 +337,7 @@ class PingDataAPIClient(APIClientBase):
 
         response = self.get(url, params=params)
         raise_for_status(response)
-        return response.json()
+        return self.decode_json(response, t.UsageResponse)
 
     def fetch_bulk_enhance_output(self, request_id: str, filename: str, output_path: str | None = None) -> bytes:
         """
@@ -357,3 +356,17 @@ class PingDataAPIClient(APIClientBase):
                 for chunk in response.iter_content(chunk_size=128):
                     fd.write(chunk)
         return response.content
+
+    def iter_bulk_enhance_output_records(
+        self, request_id: str, filename: str, key: str | None = None
+    ) -> Iterator[dict]:
+        """
+        Stream the records of a JSON result file from a completed bulk enhance job, yielding each one as soon as
+        it has downloaded rather than reading the whole file first.
+
+        :param request_id: The bulk enhance job ID.
+        :param filename: The output filename (from result.outputs[].filename).
+        :param key: Name of the top-level field holding the records, or None if the file is a JSON array.
+        """
+        url = self.api_url + f"/api/v1/bulk_enhance/{request_id}/output/{filename}"
+        yield from self.get_json_stream(url, key=key)
@@ -6,13 +6,14 @@ import logging
 import pprint
 import time
 from timeit import default_timer as timer
+from typing import TYPE_CHECKING
+
 import click
 
-from pingintel_api import PingDataAPIClient
+from pingintel_api.utils import make_client, set_verbosity
 
-from pingintel_api.api_client_base import AuthTokenNotFound
-from pingintel_api.pingdata.types import Location
-from pingintel_api.utils import set_verbosity
+if TYPE_CHECKING:
+    from pingintel_api.pingdata.pingdata_api_client import PingDataAPIClient
 
 logger = logging.getLogger(__name__)
 
@@ -70,12 +71,16 @@ def cli(ctx, environment, api_url, auth_token, verbose, delegate_to):
     set_verbosity(verbose)
 
 
-def get_client(ctx) -> PingDataAPIClient:
+def get_client(ctx) -> "PingDataAPIClient":
+    # imported here rather than at the top so `--help` doesn't have to load requests and the client.
+    from pingintel_api.api_client_base import AuthTokenNotFound
+    from pingintel_api.pingdata.pingdata_api_client import PingDataAPIClient
+
     environment = ctx.obj["environment"]
     auth_token = ctx.obj["auth_token"]
     api_url = ctx.obj["api_url"]
     try:
-        client = PingDataAPIClient(environment=environment, auth_token=auth_token, api_url=api_url)
+        client = make_client(ctx, PingDataAPIClient, environment=environment, auth_token=auth_token, api_url=api_url)
     except AuthTokenNotFound as e:
         click.echo(e)
         raise click.Abort()
@@ -183,6 +188,8 @@ def bulk_enhance(
     verbose: int,
 ):
     """Request data about multiple addresses using async API."""
+    from pingintel_api.pingdata.types import Location
+
     client = get_client(ctx)
 
     locations = []
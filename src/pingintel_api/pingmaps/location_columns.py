@@ -0,0 +1,105 @@
+# Copyright 2021-2024 Ping Data Intelligence
+
+import math
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# PingMapsPolicyLocationRequest filters that match a location field exactly.
+EQUALITY_FILTERS = (
+    "wind_tier",
+    "fema_flood_zone",
+    "occupancy__code_air",
+    "occupancy__code_rms",
+    "occupancy__code_atc",
+    "occupancy__desc_ping",
+    "const__code_air",
+    "const__code_rms",
+    "const__code_iso",
+)
+
+# PingMapsPolicyBreakdownRequest parameters that shape the request itself rather than filter locations: the
+# bounds and limits were already applied when the locations were fetched, and breakdown() reads the bins.
+REQUEST_PARAMS = (
+    "sovid",
+    "lat1",
+    "lat2",
+    "lng1",
+    "lng2",
+    "limit",
+    "show_points_sooner",
+    "attach",
+    "layer_limit",
+    "fields",
+    "const__bldg_year_built__bins",
+)
+
+
+class LocationColumns:
+    """Lazily-built NumPy columns over a list of location dicts, plus the get_policy_locations attribute filters.
+    Shared by LocationIndex and LocationBreakdown.
+
+    Filters accept the same keyword arguments as get_policy_locations and get_policy_breakdown, so a request's
+    kwargs can be reused as-is; parameters that don't filter locations are ignored.  As on the server, filter
+    values are matched whatever their type, e.g. occupancy__code_air="301" matches a location with 301."""
+
+    def __init__(self, locations: list[dict]):
+        if np is None:
+            raise ImportError(
+                f"{self.__class__.__name__} requires numpy. Install it with `pip install pingintel-api[analysis]`."
+            )
+        self.locations = locations
+        self._columns: dict[str, "np.ndarray"] = {}
+
+    def __len__(self):
+        return len(self.locations)
+
+    def _filter(self, indices: "np.ndarray", filters: dict) -> "np.ndarray":
+        for name, value in filters.items():
+            if value is None or name in REQUEST_PARAMS or not len(indices):
+                continue
+            if name.endswith("__gte") or name.endswith("__lte"):
+                values = self._numeric_column(name[:-5])[indices]
+                keep = values >= float(value) if name.endswith("__gte") else values <= float(value)
+            elif name in EQUALITY_FILTERS:
+                number = _to_float(value)
+                if math.isnan(number):
+                    keep = self._string_column(name)[indices] == str(value)
+                else:
+                    keep = self._numeric_column(name)[indices] == number
+            else:
+                raise ValueError(f"Unsupported filter: {name}")
+            indices = indices[keep]
+        return indices
+
+    def _column(self, field: str) -> "np.ndarray":
+        if field not in self._columns:
+            column = np.empty(len(self.locations), dtype=object)
+            column[:] = [location.get(field) for location in self.locations]
+            self._columns[field] = column
+        return self._columns[field]
+
+    def _string_column(self, field: str) -> "np.ndarray":
+        key = f"{field}#string"
+        if key not in self._columns:
+            column = np.empty(len(self.locations), dtype=object)
+            column[:] = [None if value is None else str(value) for value in self._column(field)]
+            self._columns[key] = column
+        return self._columns[key]
+
+    def _numeric_column(self, field: str) -> "np.ndarray":
+        key = f"{field}#numeric"
+        if key not in self._columns:
+            self._columns[key] = np.array(
+                [_to_float(location.get(field)) for location in self.locations], dtype=np.float64
+            )
+        return self._columns[key]
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
@@ -2,12 +2,16 @@
 
 # Copyright 2021-2024 Ping Data Intelligence
 
+import json
 import logging
 import os
+import pathlib
 import pprint
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
 from timeit import default_timer as timer
-from typing import IO, NotRequired, TypedDict, overload, Unpack
+from typing import IO, TYPE_CHECKING, Iterator, NotRequired, TypedDict, overload, Unpack
 
 import click
 import requests
@@ -15,9 +19,16 @@ import requests
 from pingintel_api.api_client_base import APIClientBase
 
 from .. import constants as c
-from ..utils import raise_for_status
+from ..cache import TTLCache
+from ..columnar import ColumnarRecords
+from ..utils import raise_for_status, token_fingerprint
 from . import types as t
 
+if TYPE_CHECKING:
+    # these need numpy, which is only imported when they are used.
+    from .breakdown import LocationBreakdown
+    from .spatial_index import LocationIndex
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,6 +38,31 @@ class PingMapsAPIClient(APIClientBase):
     auth_token_env_name = "SOVFIXER_AUTH_TOKEN"
     product = "pingmaps"
 
+    # set by use_cache().
+    settings_cache: TTLCache | None = None
+    breakdown_cache: TTLCache | None = None
+
+    def use_cache(
+        self,
+        settings_ttl: timedelta | float = timedelta(hours=1),
+        breakdown_ttl: timedelta | float = timedelta(minutes=5),
+        cache_dir: str | pathlib.Path | None = None,
+        max_breakdowns: int | None = 1024,
+    ):
+        """Cache get_settings and get_policy_breakdown responses, keyed on their normalized parameters.  Stale
+        entries are revalidated with conditional requests, and identical concurrent requests share one upstream
+        call.  At most `max_breakdowns` breakdowns (one per filter combination) are kept.  If `cache_dir` is
+        given, the caches persist there across processes, in files named by a fingerprint of the auth token so
+        that users sharing a directory never see each other's settings or breakdowns."""
+        settings_path = breakdown_path = None
+        if cache_dir:
+            cache_dir = pathlib.Path(cache_dir).expanduser()
+            fingerprint = token_fingerprint(self.auth_token)
+            settings_path = cache_dir / f"settings-{fingerprint}.json"
+            breakdown_path = cache_dir / f"policy_breakdown-{fingerprint}.json"
+        self.settings_cache = TTLCache(settings_ttl, settings_path)
+        self.breakdown_cache = TTLCache(breakdown_ttl, breakdown_path, max_entries=max_breakdowns)
+
     def get_policy_locations(
         self, **kwargs: Unpack[t.PingMapsPolicyLocationRequest]
     ) -> t.PingMapsPolicyLocationResponse:
@@ -35,15 +71,119 @@ class PingMapsAPIClient(APIClientBase):
         response = self.get(url, params=kwargs)
 
         raise_for_status(response)
-        response_data = response.json()
+        response_data = self.decode_json(response)
         return response_data
 
+    def iter_policy_locations(self, **kwargs: Unpack[t.PingMapsPolicyLocationRequest]) -> Iterator[dict]:
+        """Like get_policy_locations, but parses the response as it downloads and yields each location as soon as
+        it has arrived, so large responses never have to be held in memory at once.
+
+            locations = ColumnarRecords.from_records(client.iter_policy_locations(sovid=sovid, limit=100000))
+        """
+        url = self.api_url + "/api/v1/pli/policy"
+        yield from self.get_json_stream(url, params=kwargs)
+
+    def get_policy_locations_tiled(
+        self,
+        sovid: str,
+        *,
+        lat1: float = -90.0,
+        lat2: float = 90.0,
+        lng1: float = -180.0,
+        lng2: float = 180.0,
+        limit: int = 5000,
+        concurrency: int = 8,
+        max_depth: int = 12,
+        id_field: str = "id",
+        **filters: Unpack[t.PingMapsPolicyLocationRequest],
+    ) -> t.PingMapsTiledPolicyLocationResponse:
+        """Fetch every location of a policy inside a bounding box, however many there are.
+
+        The box is fetched as a quadtree: any tile whose response hits `limit` is split into four quadrants, which
+        are fetched in turn, until each tile's response fits under `limit` (or `max_depth` is reached).  Tiles are
+        fetched on `concurrency` threads, and the locations of all complete tiles are merged, deduplicated by
+        `id_field` (locations on a shared tile edge can come back twice).
+
+        :param lat1, lat2, lng1, lng2: Extent to cover (south, north, west, east).  Defaults to the whole world.
+        :param limit: Per-request limit; also the threshold for splitting a tile.
+        :param filters: Any other get_policy_locations parameters, applied to every tile.
+        """
+        results: dict = {}
+        truncated_tiles = []
+        tiles_fetched = 0
+
+        def fetch(bbox):
+            tile_lat1, tile_lat2, tile_lng1, tile_lng2 = bbox
+            return self.get_policy_locations(
+                sovid=sovid, lat1=tile_lat1, lat2=tile_lat2, lng1=tile_lng1, lng2=tile_lng2, limit=limit, **filters
+            )
+
+        self.ensure_connection_pool_size(concurrency)
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="get_policy_locations_tiled") as executor:
+            pending = {executor.submit(fetch, (lat1, lat2, lng1, lng2)): ((lat1, lat2, lng1, lng2), 0)}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    bbox, depth = pending.pop(future)
+                    response_data = future.result()
+                    tiles_fetched += 1
+                    locations = response_data.get("results", [])
+                    if len(locations) >= limit:
+                        if depth < max_depth:
+                            self.logger.debug(f"Tile {bbox} hit limit {limit}, splitting.")
+                            for quadrant in self._split_bbox(bbox):
+                                pending[executor.submit(fetch, quadrant)] = (quadrant, depth + 1)
+                            continue
+                        self.logger.warning(f"Tile {bbox} still hits limit {limit} at max_depth {max_depth}.")
+                        truncated_tiles.append(bbox)
+                    for location in locations:
+                        key = location.get(id_field)
+                        if key is None:
+                            key = json.dumps(location, sort_keys=True, default=str)
+                        results[key] = location
+
+        self.logger.info(f"Fetched {len(results)} locations of {sovid} in {tiles_fetched} tiles.")
+        return {"results": list(results.values()), "tiles_fetched": tiles_fetched, "truncated_tiles": truncated_tiles}
+
+    def get_policy_location_index(
+        self, sovid: str, lat_field: str = "latitude", lng_field: str = "longitude", **kwargs
+    ) -> "LocationIndex":
+        """Fetch all of a policy's locations with get_policy_locations_tiled (which takes the same keyword
+        arguments) and index them for local bbox, radius and nearest-neighbor queries.  Requires numpy."""
+        response_data = self.get_policy_locations_tiled(sovid, **kwargs)
+        from .spatial_index import LocationIndex
+
+        return LocationIndex(response_data["results"], lat_field=lat_field, lng_field=lng_field)
+
+    def get_policy_location_breakdown(self, sovid: str, tiv_field: str = "tiv", **kwargs) -> "LocationBreakdown":
+        """Fetch all of a policy's locations with get_policy_locations_tiled (which takes the same keyword
+        arguments) for local policy_breakdown-style aggregation.  Requires numpy."""
+        response_data = self.get_policy_locations_tiled(sovid, **kwargs)
+        from .breakdown import LocationBreakdown
+
+        return LocationBreakdown(response_data["results"], tiv_field=tiv_field)
+
+    def get_policy_location_columns(self, sovid: str, columns: list[str] | None = None, **kwargs) -> ColumnarRecords:
+        """Fetch all of a policy's locations with get_policy_locations_tiled (which takes the same keyword
+        arguments) into a compact ColumnarRecords, keeping only `columns` if given."""
+        response_data = self.get_policy_locations_tiled(sovid, **kwargs)
+        return ColumnarRecords.from_records(response_data.pop("results"), columns=columns)
+
+    @staticmethod
+    def _split_bbox(bbox: tuple[float, float, float, float]) -> list[tuple[float, float, float, float]]:
+        lat1, lat2, lng1, lng2 = bbox
+        lat_mid = (lat1 + lat2) / 2
+        lng_mid = (lng1 + lng2) / 2
+        return [
+            (lat1, lat_mid, lng1, lng_mid),
+            (lat1, lat_mid, lng_mid, lng2),
+            (lat_mid, lat2, lng1, lng_mid),
+            (lat_mid, lat2, lng_mid, lng2),
+        ]
+
     def get_policy_breakdown(self, **kwargs: Unpack[t.PingMapsPolicyBreakdownRequest]):
         url = self.api_url + "/api/v1/pli/policy_breakdown"
-        response = self.get(url, params=kwargs)
-        raise_for_status(response)
-        response_data = response.json()
-        return response_data
+        return self.get_json_cached(url, params=kwargs, cache=self.breakdown_cache)
 
     def get_settings(
         self,
@@ -56,7 +196,4 @@ class PingMapsAPIClient(APIClientBase):
         if delegate_to_company is not None:
             params["delegate_to_company"] = delegate_to_company
         url = self.api_url + "/api/v1/pli/settings"
-        response = self.get(url, params=params)
-        raise_for_status(response)
-        response_data = response.json()
-        return response_data
+        return self.get_json_cached(url, params=params, cache=self.settings_cache)
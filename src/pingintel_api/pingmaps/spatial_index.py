@@ -0,0 +1,102 @@
+# Copyright 2021-2024 Ping Data Intelligence
+
+import math
+from typing import Iterable, Unpack
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from . import types as t
+from .location_columns import LocationColumns, _to_float
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+class LocationIndex(LocationColumns):
+    """In-memory spatial index over fetched policy locations, for map queries without another API call.
+
+    Coordinates are held in NumPy arrays sorted by latitude, so a bounding-box query is two binary searches plus
+    a vectorized longitude test, and radius/nearest queries are vectorized haversine distances over the
+    candidates.  Every query also accepts the attribute filters of get_policy_locations (wind_tier,
+    fema_flood_zone, the occupancy/construction codes, const__bldg_year_built__gte/__lte,
+    limits__total_limit__gte/__lte), applied to the location fields of the same name.
+
+        index = client.get_policy_location_index(sovid)
+        visible = index.bbox(29.5, 30.5, -96.0, -94.5, fema_flood_zone="AE")
+        closest = index.nearest(29.76, -95.37, k=5)
+
+    Requires numpy (`pip install pingintel-api[analysis]`).
+    """
+
+    def __init__(
+        self,
+        locations: Iterable[dict],
+        lat_field: str = "latitude",
+        lng_field: str = "longitude",
+    ):
+        if np is None:
+            raise ImportError("LocationIndex requires numpy. Install it with `pip install pingintel-api[analysis]`.")
+        locations = list(locations)
+        lats = np.array([_to_float(location.get(lat_field)) for location in locations], dtype=np.float64)
+        lngs = np.array([_to_float(location.get(lng_field)) for location in locations], dtype=np.float64)
+
+        # locations without coordinates can't be found spatially.
+        order = np.argsort(lats, kind="stable")
+        order = order[~np.isnan(lats[order]) & ~np.isnan(lngs[order])]
+        super().__init__([locations[i] for i in order])
+        self.lats = lats[order]
+        self.lngs = lngs[order]
+
+    def bbox(
+        self, lat1: float, lat2: float, lng1: float, lng2: float, **filters: Unpack[t.PingMapsPolicyLocationRequest]
+    ) -> list[dict]:
+        """Locations with lat1 <= latitude <= lat2 and lng1 <= longitude <= lng2.  If lng1 > lng2 the box is
+        taken to cross the antimeridian."""
+        start, stop = self._lat_range(lat1, lat2)
+        lngs = self.lngs[start:stop]
+        if lng1 <= lng2:
+            mask = (lngs >= lng1) & (lngs <= lng2)
+        else:
+            mask = (lngs >= lng1) | (lngs <= lng2)
+        indices = np.nonzero(mask)[0] + start
+        return [self.locations[i] for i in self._filter(indices, filters)]
+
+    def within_radius(
+        self, lat: float, lng: float, radius_km: float, **filters: Unpack[t.PingMapsPolicyLocationRequest]
+    ) -> list[tuple[float, dict]]:
+        """`(distance_km, location)` for every location within `radius_km` of (lat, lng), nearest first."""
+        lat_delta = math.degrees(radius_km / EARTH_RADIUS_KM)
+        start, stop = self._lat_range(lat - lat_delta, lat + lat_delta)
+        indices = self._filter(np.arange(start, stop), filters)
+        distances = self._distances(lat, lng, indices)
+        within = distances <= radius_km
+        indices, distances = indices[within], distances[within]
+        order = np.argsort(distances, kind="stable")
+        return [(float(distances[i]), self.locations[indices[i]]) for i in order]
+
+    def nearest(
+        self, lat: float, lng: float, k: int = 10, **filters: Unpack[t.PingMapsPolicyLocationRequest]
+    ) -> list[tuple[float, dict]]:
+        """The `k` locations closest to (lat, lng), as `(distance_km, location)`, nearest first."""
+        indices = self._filter(np.arange(len(self.locations)), filters)
+        if not len(indices) or k <= 0:
+            return []
+        distances = self._distances(lat, lng, indices)
+        if k < len(distances):
+            closest = np.argpartition(distances, k - 1)[:k]
+        else:
+            closest = np.arange(len(distances))
+        closest = closest[np.argsort(distances[closest], kind="stable")]
+        return [(float(distances[i]), self.locations[indices[i]]) for i in closest]
+
+    def _lat_range(self, lat1: float, lat2: float) -> tuple[int, int]:
+        return int(np.searchsorted(self.lats, lat1, side="left")), int(np.searchsorted(self.lats, lat2, side="right"))
+
+    def _distances(self, lat: float, lng: float, indices: "np.ndarray") -> "np.ndarray":
+        lat_r = np.radians(self.lats[indices])
+        dlat = lat_r - math.radians(lat)
+        dlng = np.radians(self.lngs[indices] - lng)
+        a = np.sin(dlat / 2) ** 2 + math.cos(math.radians(lat)) * np.cos(lat_r) * np.sin(dlng / 2) ** 2
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
@@ -43,6 +43,13 @@ class PingMapsPolicyLocationRequest(TypedDict):
     layer_limit: NotRequired[int]
 
 
+class PingMapsTiledPolicyLocationResponse(TypedDict):
+    results: list[dict]
+    tiles_fetched: int
+    # tiles that still hit `limit` at max_depth; locations in them may be missing.
+    truncated_tiles: list[tuple[float, float, float, float]]
+
+
 class PingMapsPolicyBreakdownRequest(PingMapsPolicyLocationRequest):
     fields: NotRequired[list[str]]
 
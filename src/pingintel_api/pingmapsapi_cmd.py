@@ -6,13 +6,14 @@ import logging
 import pprint
 import time
 from timeit import default_timer as timer
+from typing import TYPE_CHECKING
+
 import click
 
-from pingintel_api import PingMapsAPIClient
+from pingintel_api.utils import make_client, set_verbosity
 
-from pingintel_api.api_client_base import AuthTokenNotFound
-from pingintel_api.pingdata.types import SOURCES, Location
-from pingintel_api.utils import set_verbosity
+if TYPE_CHECKING:
+    from pingintel_api.pingmaps.pingmaps_api_client import PingMapsAPIClient
 
 logger = logging.getLogger(__name__)
 
@@ -63,16 +64,16 @@ def cli(ctx, environment, api_url, auth_token, verbose):
     set_verbosity(verbose)
 
 
-def get_client(ctx) -> PingMapsAPIClient:
+def get_client(ctx) -> "PingMapsAPIClient":
+    # imported here rather than at the top so `--help` doesn't have to load requests and the client.
+    from pingintel_api.api_client_base import AuthTokenNotFound
+    from pingintel_api.pingmaps.pingmaps_api_client import PingMapsAPIClient
+
     environment = ctx.obj["environment"]
     auth_token = ctx.obj["auth_token"]
     api_url = ctx.obj["api_url"]
     try:
-        client = PingMapsAPIClient(
-            environment=environment,
-            auth_token=auth_token,
-            api_url=api_url,
-        )
+        client = make_client(ctx, PingMapsAPIClient, environment=environment, auth_token=auth_token, api_url=api_url)
     except AuthTokenNotFound as e:
         click.echo(e)
         raise click.Abort()
@@ -100,6 +101,35 @@ def settings(ctx: click.Context, delegate_to_team, delegate_to_company):
     click.echo(f"+ Finished querying with result:\n{pprint.pformat(response_data)}")
 
 
+@cli.command()
+@click.pass_context
+@click.argument("sovid")
+@click.option(
+    "-l", "--limit", type=click.IntRange(min=1), default=5000, show_default=True, help="Locations per request."
+)
+@click.option(
+    "-j",
+    "--concurrency",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help="Maximum number of tiles fetched at once.",
+)
+@click.option("-o", "--output", type=click.File("w"), default="-", help="Write the locations here as JSON.")
+def locations(ctx: click.Context, sovid, limit, concurrency, output):
+    """Fetch every location of a policy, splitting the map into tiles as needed."""
+    import json
+
+    client = get_client(ctx)
+    response_data = client.get_policy_locations_tiled(sovid, limit=limit, concurrency=concurrency)
+    json.dump(response_data["results"], output)
+    click.echo(
+        f"+ Fetched {len(response_data['results'])} locations in {response_data['tiles_fetched']} tiles.", err=True
+    )
+    if response_data["truncated_tiles"]:
+        click.echo(f"* {len(response_data['truncated_tiles'])} tiles were still truncated.", err=True)
+
+
 def main():
     cli()
 
@@ -0,0 +1,235 @@
+# Copyright 2021-2024 Ping Data Intelligence
+
+import datetime
+import json
+import logging
+import os
+import pathlib
+import queue
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING
+
+from . import types as t
+
+if TYPE_CHECKING:
+    from .pingvision_api_client import PingVisionAPIClient
+
+logger = logging.getLogger(__name__)
+
+
+class EventQueue(queue.Queue):
+    """A subscriber's queue.  Call task_done() once each event has been fully processed: the stream only
+    checkpoints past events that every subscriber has acknowledged this way."""
+
+    def __init__(self, maxsize: int = 0):
+        super().__init__(maxsize)
+        self.delivered = 0
+        self.acknowledged = 0
+
+    def task_done(self):
+        super().task_done()
+        with self.mutex:
+            self.acknowledged += 1
+
+
+class SubmissionEventStream:
+    """Follows /api/v1/submission-events continuously and fans the events out to subscribers.
+
+    A background thread calls PingVisionAPIClient.list_submission_events, following `cursor_id` from page to page.
+    Each subscriber gets its own bounded queue; when a queue is full the stream waits for it to drain (backpressure)
+    rather than dropping events.  Once every subscriber has acknowledged all the events of a page with
+    `task_done()`, the cursor after that page is written to `checkpoint_path`, so a restarted stream picks up
+    where the last one stopped: events are delivered at least once, even if the process dies with events still
+    queued.  A checkpoint written for different filters is ignored.
+
+    The poll interval adapts: it drops to `min_poll_seconds` while events are flowing, and backs off towards
+    `max_poll_seconds` while the feed is idle.
+
+        with SubmissionEventStream(client, division=division_uuid, checkpoint_path="events.cursor") as stream:
+            events = stream.subscribe()
+            while True:
+                event = events.get()
+                ...
+                events.task_done()
+    """
+
+    def __init__(
+        self,
+        client: "PingVisionAPIClient",
+        *,
+        pingid: str | None = None,
+        division: str | None = None,
+        team: str | None = None,
+        start: datetime.datetime | None = None,
+        checkpoint_path: str | pathlib.Path | None = None,
+        page_size: int = 50,
+        min_poll_seconds: float = 1.0,
+        max_poll_seconds: float = 60.0,
+        queue_size: int = 1000,
+    ):
+        if not any([pingid, division, team]):
+            raise ValueError("One or more of pingid, division, or team must be provided.")
+
+        self.client = client
+        self.filters: t.PingVisionSubmissionEventsRequest = {"pingid": pingid, "division": division, "team": team}
+        self.start_time = start
+        self.checkpoint_path = pathlib.Path(checkpoint_path) if checkpoint_path else None
+        self.page_size = page_size
+        self.min_poll_seconds = min_poll_seconds
+        self.max_poll_seconds = max_poll_seconds
+        self.queue_size = queue_size
+        self.poll_seconds = min_poll_seconds
+
+        self.cursor_id: str | None = self._load_checkpoint()
+        self.checkpointed_cursor_id = self.cursor_id
+        # cursors not yet checkpointed, with how many events each subscriber must have acknowledged first.
+        self._pending_checkpoints: deque[tuple[str, dict[EventQueue, int]]] = deque()
+        self._subscribers: list[EventQueue] = []
+        self._lock = threading.Lock()
+        self._checkpoint_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def subscribe(self, maxsize: int | None = None) -> EventQueue:
+        """Return a new queue that will receive every event from now on.  Call its task_done() after processing
+        each event, or the checkpoint never advances."""
+        events = EventQueue(maxsize=maxsize if maxsize is not None else self.queue_size)
+        with self._lock:
+            self._subscribers.append(events)
+        return events
+
+    def unsubscribe(self, events: EventQueue):
+        with self._lock:
+            self._subscribers.remove(events)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="SubmissionEventStream", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.checkpoint()
+
+    def checkpoint(self) -> str | None:
+        """Save the latest cursor whose events every subscriber has acknowledged, and return it."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        with self._checkpoint_lock:
+            cursor_id = None
+            while self._pending_checkpoints:
+                candidate, required = self._pending_checkpoints[0]
+                if any(events.acknowledged < required.get(events, 0) for events in subscribers):
+                    break
+                cursor_id = candidate
+                self._pending_checkpoints.popleft()
+            if cursor_id is not None and cursor_id != self.checkpointed_cursor_id:
+                self.checkpointed_cursor_id = cursor_id
+                self._save_checkpoint()
+            return self.checkpointed_cursor_id
+
+    def poll_once(self) -> int:
+        """Fetch and deliver pages until the feed is caught up.  Returns the number of events delivered."""
+        delivered = 0
+        while not self._stopped.is_set():
+            if not self._subscribers:
+                # nobody would receive these events; leave the cursor where it is until someone subscribes.
+                break
+            params: t.PingVisionSubmissionEventsRequest = {**self.filters, "page_size": self.page_size}
+            if self.cursor_id:
+                params["cursor_id"] = self.cursor_id
+            elif self.start_time:
+                params["start"] = self.start_time
+
+            response_data = self.client.list_submission_events(**params)
+            events = response_data.get("results", [])
+            for event in events:
+                if not self._deliver(event):
+                    return delivered
+            delivered += len(events)
+
+            next_cursor_id = response_data.get("cursor_id")
+            if next_cursor_id and next_cursor_id != self.cursor_id:
+                self.cursor_id = next_cursor_id
+                with self._lock:
+                    required = {subscriber: subscriber.delivered for subscriber in self._subscribers}
+                with self._checkpoint_lock:
+                    self._pending_checkpoints.append((next_cursor_id, required))
+            self.checkpoint()
+            if len(events) < self.page_size:
+                break
+        return delivered
+
+    def _deliver(self, event: t.PingVisionSubmissionEventResponse) -> bool:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for events in subscribers:
+            while True:
+                if self._stopped.is_set():
+                    return False
+                try:
+                    events.put(event, timeout=0.5)
+                    events.delivered += 1
+                    break
+                except queue.Full:
+                    self.checkpoint()
+                    logger.debug("Subscriber queue is full, waiting for it to drain.")
+        return True
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                delivered = self.poll_once()
+            except Exception as e:
+                logger.warning(f"Error polling submission events: {e}")
+                delivered = 0
+
+            if delivered or not self._subscribers:
+                self.poll_seconds = self.min_poll_seconds
+            else:
+                self.poll_seconds = min(self.max_poll_seconds, self.poll_seconds * 2)
+            logger.debug(f"Delivered {delivered} events, next poll in {self.poll_seconds:.1f}s.")
+            # keep the checkpoint moving while subscribers work through what was delivered.
+            deadline = time.monotonic() + self.poll_seconds
+            while not self._stopped.wait(min(self.min_poll_seconds, max(0.0, deadline - time.monotonic()))):
+                self.checkpoint()
+                if time.monotonic() >= deadline:
+                    break
+
+    def _load_checkpoint(self) -> str | None:
+        if not self.checkpoint_path or not self.checkpoint_path.exists():
+            return None
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as fd:
+                checkpoint = json.load(fd)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint {self.checkpoint_path}: {e}")
+            return None
+        if checkpoint.get("filters") != json.loads(json.dumps(self.filters, default=str)):
+            logger.warning(f"Ignoring checkpoint {self.checkpoint_path}, it was written for different filters.")
+            return None
+        cursor_id = checkpoint.get("cursor_id")
+        logger.info(f"Resuming submission events from cursor {cursor_id}.")
+        return cursor_id
+
+    def _save_checkpoint(self):
+        if not self.checkpoint_path:
+            return
+        tmp_path = self.checkpoint_path.with_name(self.checkpoint_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as fd:
+            json.dump({"cursor_id": self.checkpointed_cursor_id, "filters": self.filters}, fd, default=str)
+        os.replace(tmp_path, self.checkpoint_path)
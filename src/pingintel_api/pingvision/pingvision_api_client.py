@@ -3,6 +3,7 @@
 # Copyright 2021-2024 Ping Data Intelligence
 
 import datetime
+import json
 import urllib.parse
 
 import logging
@@ -11,15 +12,24 @@ import pathlib
 import pprint
 import time
 from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
 from timeit import default_timer as timer
 from typing import BinaryIO, Literal, TypedDict, overload, List
-from typing import BinaryIO, TypedDict, Unpack, overload
+from typing import TYPE_CHECKING, BinaryIO, Iterable, Iterator, TypedDict, Unpack, overload
 
 from pingintel_api.api_client_base import APIClientBase
 
 from .. import constants as c
-from ..utils import is_fileobj, raise_for_status
+from ..cache import TTLCache
+from ..batch import BatchManifest, BatchStats, RateLimiter, fan_out
+from ..poller import Poller, run_output_batch, run_polled_pipeline
+from ..utils import is_fileobj, is_transient_error, raise_for_status
 from . import types as t
+from .data_item_writer import DataItemWriter
+from .event_stream import SubmissionEventStream
+
+if TYPE_CHECKING:
+    from .replica import SubmissionReplica
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +40,18 @@ class PingVisionAPIClient(APIClientBase):
     auth_token_env_name = "PINGVISION_AUTH_TOKEN"
     product = "pingvision"
 
+    # set by use_metadata_cache(); caches teams, memberships and submission statuses.
+    metadata_cache: TTLCache | None = None
+
+    def use_metadata_cache(
+        self, ttl: timedelta | float = timedelta(minutes=10), path: str | pathlib.Path | None = None
+    ) -> TTLCache:
+        """Cache the slowly-changing reference data returned by list_teams, list_team_members and
+        list_submission_statuses for `ttl`, persisted to `path` if given.  Stale entries are revalidated with
+        conditional requests.  Returns the cache, e.g. to `invalidate()` it."""
+        self.metadata_cache = TTLCache(ttl, path)
+        return self.metadata_cache
+
     def create_submission(
         self,
         filepaths: list[str | pathlib.Path],
@@ -108,10 +130,144 @@ class PingVisionAPIClient(APIClientBase):
                 file[1][1].close()
         raise_for_status(response)
 
-        self.logger.info(f"Submission created: {response.json()}")
-        response_data = response.json()
+        response_data = self.decode_json(response, t.PingVisionCreateSubmissionResponse)
+        self.logger.info(f"Submission created: {response_data}")
         return response_data
 
+    def create_submissions_batch(
+        self,
+        bundles: Iterable[str | pathlib.Path | list[str | pathlib.Path]],
+        concurrency: int = 8,
+        *,
+        manifest_path: str | pathlib.Path | None = None,
+        split_directories: bool = False,
+        poll_until_ready: bool = True,
+        poll_seconds: float = 2.5,
+        timeout: timedelta | None = timedelta(minutes=30),
+        **create_kwargs,
+    ) -> t.PingVisionCreateSubmissionBatchSummary:
+        """Create many submissions at once, with at most `concurrency` uploads in flight.
+
+        Each bundle becomes one submission: a single file, a directory (all files directly inside it, e.g. an .eml
+        and its attachments), or a list of files.  With `split_directories`, a directory bundle is instead
+        expanded into one bundle per entry: each file in it becomes its own submission, and each subdirectory one
+        submission of all the files in it.  With `poll_until_ready`, one shared poller watches every new
+        submission until its workflow status is "Completed".  Progress is appended to the JSONL manifest at
+        `manifest_path`; re-running with the same manifest skips bundles that already finished and resumes polling
+        bundles that were uploaded but not yet ready, instead of creating them again.
+
+        :param bundles: The submissions to create.
+        :param concurrency: Maximum number of uploads running at once.
+        :param manifest_path: JSONL file recording the result of each bundle.  If None, nothing is persisted.
+        :param split_directories: If set, submit each entry of a directory bundle separately.
+        :param poll_until_ready: If set, wait until each submission is ready before recording it as done.
+        :param create_kwargs: Passed to create_submission (team_uuid, client_ref, insured_name, ...).
+        :return: Counts and throughput for the run.
+        """
+        manifest = BatchManifest(manifest_path, key_field="path")
+        if split_directories:
+            bundles = [entry for bundle in bundles for entry in self._split_bundle(bundle)]
+        bundles = {self._bundle_key(bundle): self._bundle_filepaths(bundle) for bundle in bundles}
+        stats = BatchStats(len(bundles), label="submissions")
+        start_times = {}
+
+        def start(key):
+            start_times[key] = timer()
+            previous_entry = manifest.get(key)
+            if previous_entry and previous_entry.get("id"):
+                self.logger.info(f"Resuming {key} as {previous_entry['id']}.")
+                return previous_entry["id"], None
+            filepaths = bundles[key]
+            if not filepaths:
+                raise ValueError(f"No files to submit in {key}")
+            response_data = self.create_submission(filepaths, **create_kwargs)
+            manifest.write(
+                {
+                    "path": key,
+                    "filepaths": filepaths,
+                    "id": response_data["id"],
+                    "url": response_data.get("url"),
+                    "state": "started",
+                }
+            )
+            return response_data["id"], response_data
+
+        def finish(key, pingid, activity):
+            entry: t.PingVisionCreateSubmissionBatchManifestEntry = {
+                **(manifest.get(key) or {"path": key, "filepaths": bundles[key]}),
+                "id": pingid,
+                "state": "done",
+                "workflow_status_name": activity.get("workflow_status_name"),
+                "elapsed_seconds": round(timer() - start_times[key], 3),
+            }
+            manifest.write(entry)
+            return "succeeded"
+
+        def error_result(key, pingid, exc):
+            self.logger.warning(f"* Error submitting {key}: {exc}")
+            manifest.write(
+                {
+                    "path": key,
+                    "filepaths": bundles[key],
+                    "id": pingid,
+                    "state": "error",
+                    "error": str(exc),
+                    "elapsed_seconds": round(timer() - start_times.get(key, timer()), 3),
+                }
+            )
+            return "errored"
+
+        def check(pingid):
+            response_data = self.list_submission_activity(pingid=pingid)
+            return response_data["results"][0] if response_data["results"] else {}
+
+        def is_done(response) -> bool:
+            # without polling, the create_submission response itself means done.
+            return not poll_until_ready or response.get("workflow_status_name") == "Completed"
+
+        pending = []
+        for key in bundles:
+            if manifest.is_done(key):
+                stats.record("skipped")
+            else:
+                pending.append(key)
+
+        self.ensure_connection_pool_size(concurrency)
+        with Poller(check, is_done, poll_seconds=poll_seconds, timeout=timeout, name="create_submissions") as poller:
+            for outcome in run_polled_pipeline(
+                pending, start, poller, finish, error_result, concurrency=concurrency, name="create_submissions"
+            ):
+                stats.record(outcome)
+
+        summary: t.PingVisionCreateSubmissionBatchSummary = {
+            **stats.summary(),
+            "manifest_path": str(manifest_path or ""),
+        }
+        self.logger.info(f"+ Finished batch: {summary}")
+        return summary
+
+    @staticmethod
+    def _bundle_key(bundle) -> str:
+        if isinstance(bundle, (list, tuple)):
+            return ",".join(str(path) for path in bundle)
+        return str(bundle)
+
+    @staticmethod
+    def _split_bundle(bundle) -> list:
+        if isinstance(bundle, (list, tuple)) or not os.path.isdir(bundle):
+            return [bundle]
+        return sorted(str(path) for path in pathlib.Path(bundle).iterdir() if not path.name.startswith("."))
+
+    @staticmethod
+    def _bundle_filepaths(bundle) -> list[str]:
+        if isinstance(bundle, (list, tuple)):
+            return [str(path) for path in bundle]
+        if os.path.isdir(bundle):
+            return sorted(
+                str(path) for path in pathlib.Path(bundle).iterdir() if path.is_file() and not path.name.startswith(".")
+            )
+        return [str(bundle)]
+
     def get_submission_detail(self, pingid: str):  # -> t.PingVisionSubmissionDetailResponse:
         """Get submission history/detail."""
         url = self.api_url + f"/api/v1/submission/{pingid}/history"
@@ -120,7 +276,7 @@ class PingVisionAPIClient(APIClientBase):
 
         raise_for_status(response)
 
-        response_data = response.json()
+        response_data = self.decode_json(response)
         return response_data
 
     def list_submission_activity(
@@ -135,9 +291,34 @@ class PingVisionAPIClient(APIClientBase):
         sort_order: Literal["asc", "desc"] = "asc",
         **filter_kwargs,
     ) -> t.PingVisionListActivityResponse:
-        """Docs: https://docs.pingintel.com/ping-vision/get-submission-data/list-recent-submission-activity"""
+        """Docs: https://docs.pingintel.com/ping-vision/get-submission-data/list-recent-submission-activity
+
+        With `fields`, each result only has the requested fields, so the results are returned as plain dicts even
+        when struct decoding is on (see use_structs)."""
         url = self.api_url + "/api/v1/submission"
 
+        kwargs = self._submission_activity_params(
+            pingid, cursor_id, prev_cursor_id, page_size, fields, search, sort_by, sort_order, **filter_kwargs
+        )
+        response = self.get(url, params=kwargs)
+
+        raise_for_status(response)
+
+        response_data = self.decode_json(response, None if fields else t.PingVisionListActivityResponse)
+        return response_data
+
+    @staticmethod
+    def _submission_activity_params(
+        pingid: str | None = None,
+        cursor_id: str | None = None,
+        prev_cursor_id: str | None = None,
+        page_size: int | None = None,
+        fields: list[str] | None = None,
+        search: str | None = None,
+        sort_by: str | None = None,
+        sort_order: Literal["asc", "desc"] = "asc",
+        **filter_kwargs,
+    ) -> dict:
         kwargs = {}
         if pingid:
             kwargs["id"] = pingid
@@ -157,13 +338,95 @@ class PingVisionAPIClient(APIClientBase):
             kwargs["sort_order"] = sort_order
 
         kwargs.update(filter_kwargs)
+        return kwargs
 
-        response = self.get(url, params=kwargs)
+    def iter_submission_activity(
+        self,
+        page_size: int = 200,
+        fields: list[str] | None = None,
+        checkpoint_path: str | pathlib.Path | None = None,
+        stream_pages: bool = False,
+        **filters,
+    ) -> Iterator[t.PingVisionListActivityDetailResponse]:
+        """Yield every submission matching `filters`, following `cursor_id` across pages.
 
-        raise_for_status(response)
+        The next page is requested in the background while the current one is being consumed, and at most two
+        pages are held in memory.  Pass `fields` to fetch only the columns you need.
 
-        response_data = response.json()
-        return response_data
+        If `checkpoint_path` is given, the cursor of the next page is saved there each time a page has been fully
+        consumed, and a later call with the same filters resumes from it (the page that was being consumed when
+        the scan stopped is yielded again).  The checkpoint is removed once the scan completes.
+
+        With `stream_pages`, each page is parsed as it downloads (see get_json_stream), so the first submissions of
+        a page are yielded before the rest has arrived and only one submission is held at a time, which suits
+        large page sizes.  Pages are then fetched one after the other, since the cursor of the next page is only
+        known once the current one has been read.
+
+        :param filters: Passed to list_submission_activity (search, sort_by, sort_order, team_uuid, ...).
+        """
+        checkpoint_path = pathlib.Path(checkpoint_path) if checkpoint_path else None
+        checkpoint_filters = json.loads(json.dumps({**filters, "fields": fields}, default=str))
+        cursor_id = self._load_activity_checkpoint(checkpoint_path, checkpoint_filters)
+
+        if stream_pages:
+            url = self.api_url + "/api/v1/submission"
+            while True:
+                params = self._submission_activity_params(
+                    cursor_id=cursor_id, page_size=page_size, fields=fields, **filters
+                )
+                page = self.get_json_stream(url, params=params)
+                yield from page
+                cursor_id = page.envelope.get("cursor_id")
+                has_remaining = bool(page.envelope.get("has_remaining") and cursor_id)
+                self._save_activity_checkpoint(checkpoint_path, checkpoint_filters, cursor_id, has_remaining)
+                if not has_remaining:
+                    return
+
+        def fetch(cursor_id):
+            return self.list_submission_activity(cursor_id=cursor_id, page_size=page_size, fields=fields, **filters)
+
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="iter_submission_activity")
+        try:
+            future = executor.submit(fetch, cursor_id)
+            while future is not None:
+                page = future.result()
+                cursor_id = page.get("cursor_id")
+                has_remaining = bool(page.get("has_remaining") and cursor_id)
+                future = executor.submit(fetch, cursor_id) if has_remaining else None
+
+                yield from page.get("results", [])
+                self._save_activity_checkpoint(checkpoint_path, checkpoint_filters, cursor_id, has_remaining)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _save_activity_checkpoint(
+        checkpoint_path: pathlib.Path | None, filters: dict, cursor_id: str | None, has_remaining: bool
+    ):
+        if not checkpoint_path:
+            return
+        if has_remaining:
+            tmp_path = checkpoint_path.with_name(checkpoint_path.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as fd:
+                json.dump({"cursor_id": cursor_id, "filters": filters}, fd)
+            os.replace(tmp_path, checkpoint_path)
+        else:
+            checkpoint_path.unlink(missing_ok=True)
+
+    def _load_activity_checkpoint(self, checkpoint_path: pathlib.Path | None, filters: dict) -> str | None:
+        if not checkpoint_path or not checkpoint_path.exists():
+            return None
+        try:
+            with open(checkpoint_path, "r", encoding="utf-8") as fd:
+                checkpoint = json.load(fd)
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.warning(f"Ignoring unreadable checkpoint {checkpoint_path}: {e}")
+            return None
+        if checkpoint.get("filters") != filters:
+            self.logger.warning(f"Ignoring checkpoint {checkpoint_path}, it was written for different filters.")
+            return None
+        self.logger.info(f"Resuming submission activity from cursor {checkpoint['cursor_id']}.")
+        return checkpoint["cursor_id"]
 
     @overload
     def download_document(self, output_path_or_stream, *, document_url: str) -> None: ...
@@ -184,24 +447,44 @@ class PingVisionAPIClient(APIClientBase):
 
         # assert url.startswith(self.api_url), f"document_url should start with {self.api_url} or / but got {url}"
 
-        response = self.get(url)
-        raise_for_status(response)
+        with self.get(url, stream=True) as response:
+            raise_for_status(response)
 
-        if is_fileobj(output_path_or_stream):
-            output_path_or_stream.write(response.content)
-        else:
-            with open(output_path_or_stream, "wb") as f:
-                f.write(response.content)
+            if is_fileobj(output_path_or_stream):
+                for chunk in response.iter_content(chunk_size=1024 * 1024):
+                    output_path_or_stream.write(chunk)
+            else:
+                with open(output_path_or_stream, "wb") as f:
+                    for chunk in response.iter_content(chunk_size=1024 * 1024):
+                        f.write(chunk)
 
     def list_submission_statuses(self, division: str) -> list[t.PingVisionListSubmissionStatusItemResponse]:
         """Docs: https://docs.pingintel.com/ping-vision/miscellaneous/list-submission-statuses"""
         url = self.api_url + f"/api/v1/submission-status"
-
-        response = self.get(url, params={"division": division})
-        raise_for_status(response)
-
-        response_data = response.json()
-        return response_data
+        return self.get_json_cached(url, params={"division": division}, cache=self.metadata_cache)
+
+    def list_submission_statuses_for_divisions(
+        self, divisions: Iterable[str], concurrency: int = 8
+    ) -> dict[str, list[t.PingVisionListSubmissionStatusItemResponse]]:
+        """Fetch the submission statuses of several divisions concurrently, one request per distinct division.
+
+        Divisions whose request failed are logged and left out of the result."""
+        calls = {division: (division,) for division in dict.fromkeys(divisions) if division}
+        self.ensure_connection_pool_size(concurrency)
+        results, _ = fan_out(self.list_submission_statuses, calls, concurrency, name="list_submission_statuses")
+        return results
+
+    def get_submission_status_uuid(self, division: str, name: str) -> str:
+        """Resolve a submission status name (case-insensitive) to its uuid within `division`.  With
+        use_metadata_cache(), repeated lookups don't hit the API."""
+        statuses = self.list_submission_statuses(division)
+        for status in statuses:
+            if status["name"].lower() == name.lower():
+                return status["uuid"]
+        raise ValueError(
+            f"Unknown submission status {name!r} for division {division}. "
+            f"Available: {', '.join(status['name'] for status in statuses)}"
+        )
 
     def change_status(self, pingid: str, workflow_status_id: int) -> t.PingVisionChangeSubmissionStatusResponse:
         """Docs: https://docs.pingintel.com/ping-vision/update-submission/change-submission-status"""
@@ -212,7 +495,7 @@ class PingVisionAPIClient(APIClientBase):
         }
         response = self.patch(url, json=data)
         raise_for_status(response)
-        response_data = response.json()
+        response_data = self.decode_json(response, t.PingVisionChangeSubmissionStatusResponse)
         return response_data
 
     def bulk_update_submission(
@@ -227,16 +510,106 @@ class PingVisionAPIClient(APIClientBase):
         }
         response = self.post(url, json=data)
         raise_for_status(response)
-        response_data = response.json()
+        response_data = self.decode_json(
+            response, t.PingVisionSubmissionBulkUpdateResponse | list[t.PingVisionSubmissionBulkUpdateItemResponse]
+        )
         return response_data
 
+    def bulk_update_submissions_chunked(
+        self,
+        pingids: list[str],
+        changes: List[t.PingVisionSubmissionBulkUpdateChangeItem],
+        chunk_size: int = 100,
+        concurrency: int = 4,
+        max_requests_per_second: float | None = 5.0,
+        max_retries: int = 2,
+    ) -> t.PingVisionSubmissionBulkUpdateReport:
+        """Apply `changes` to many submissions with bulk_update_submission, `chunk_size` pingids per request.
+
+        Chunks are sent on up to `concurrency` threads, no faster than `max_requests_per_second` overall.  Items
+        that are missing from the response, or were in a chunk whose request failed with a connection error,
+        timeout, 429 or 5xx, are retried (and only those) up to `max_retries` more times.  Items that come back
+        with an error, or whose chunk was rejected with any other status, are reported as failed without a retry,
+        since sending the same change again would fail the same way.  The per-item responses of every round are
+        merged into one report.
+
+        :param pingids: The submissions to update.
+        :param changes: The changes to apply, as for bulk_update_submission.
+        :param chunk_size: Number of pingids per request.
+        :param concurrency: Maximum number of requests in flight at once.
+        :param max_requests_per_second: Rate limit across all threads.  None for no limit.
+        :param max_retries: How many times to retry failed items.
+        """
+        rate_limiter = RateLimiter(max_requests_per_second)
+        results: dict[str, t.PingVisionSubmissionBulkUpdateItemResponse] = {}
+        failed: dict[str, str] = {}
+        requests_sent = 0
+        retried = 0
+
+        def send_chunk(chunk: list[str]) -> list[t.PingVisionSubmissionBulkUpdateItemResponse] | Exception:
+            rate_limiter.acquire()
+            try:
+                response_data = self.bulk_update_submission(chunk, changes)
+            except Exception as e:
+                if is_transient_error(e):
+                    raise
+                self.logger.warning(f"bulk_update_submission rejected {len(chunk)} submissions: {e}")
+                return e
+            return response_data if isinstance(response_data, list) else response_data["results"]
+
+        remaining = list(dict.fromkeys(pingids))
+        self.ensure_connection_pool_size(concurrency)
+        for attempt in range(max_retries + 1):
+            if not remaining:
+                break
+            if attempt:
+                retried += len(remaining)
+                self.logger.info(f"Retrying {len(remaining)} failed submissions (attempt {attempt + 1}).")
+            chunks = {i: (remaining[i : i + chunk_size],) for i in range(0, len(remaining), chunk_size)}
+            chunk_results, chunk_errors = fan_out(send_chunk, chunks, concurrency, name="bulk_update_submission")
+            requests_sent += len(chunks)
+
+            remaining = []
+            for i, (chunk,) in chunks.items():
+                if i in chunk_errors:
+                    failed.update({pingid: chunk_errors[i] for pingid in chunk})
+                    remaining.extend(chunk)
+                    continue
+                if isinstance(chunk_results[i], Exception):
+                    failed.update({pingid: str(chunk_results[i]) for pingid in chunk})
+                    continue
+                returned = {item["id"]: item for item in chunk_results[i]}
+                for pingid in chunk:
+                    item = returned.get(pingid)
+                    if item is None:
+                        failed[pingid] = "Missing from bulk update response"
+                        remaining.append(pingid)
+                        continue
+                    results[pingid] = item
+                    if item.get("error"):
+                        failed[pingid] = item["error"]
+                    else:
+                        failed.pop(pingid, None)
+
+        report: t.PingVisionSubmissionBulkUpdateReport = {
+            "results": list(results.values()),
+            "succeeded": [pingid for pingid in results if pingid not in failed],
+            "failed": failed,
+            "requests": requests_sent,
+            "retried": retried,
+        }
+        self.logger.info(
+            f"+ Bulk updated {len(report['succeeded'])} submissions, {len(failed)} failed, in {requests_sent} requests."
+        )
+        return report
+
     def update_submission(self, pingid: str, data: dict):
         """Docs: https://docs.pingintel.com/ping-vision/update-submission/update-submission-details"""
         url = self.api_url + f"/api/v1/submission/{pingid}"
 
         response = self.patch(url, json=data)
         raise_for_status(response)
-        response_data = response.json()
+        response_data = self.decode_json(response)
         return response_data
 
     def list_submission_events(
@@ -270,9 +643,21 @@ class PingVisionAPIClient(APIClientBase):
         response = self.get(url, params=params)
         raise_for_status(response)
 
-        response_data = response.json()
+        response_data = self.decode_json(response, t.PingVisionSubmissionEventsResponse)
         return response_data
 
+    def stream_submission_events(self, **kwargs) -> SubmissionEventStream:
+        """Return a SubmissionEventStream that follows list_submission_events continuously.  See SubmissionEventStream
+        for the accepted keyword arguments."""
+        return SubmissionEventStream(self, **kwargs)
+
+    def submission_replica(self, path: str | pathlib.Path, **kwargs) -> "SubmissionReplica":
+        """Open (or create) a SQLite replica of submission activity at `path`.  See SubmissionReplica for the
+        accepted keyword arguments; call `.sync()` on it to bring it up to date."""
+        from .replica import SubmissionReplica
+
+        return SubmissionReplica(self, path, **kwargs)
+
     def list_teams(self, delegate_to_company=None, delegate_to_team=None) -> list[t.PingVisionTeamsResponse]:
         """Docs: https://docs.pingintel.com/ping-vision/user-memberships/list-user-teams"""
         url = self.api_url + "/api/v1/user/teams"
@@ -281,19 +666,12 @@ class PingVisionAPIClient(APIClientBase):
             params["delegate_to_company"] = delegate_to_company
         if delegate_to_team:
             params["delegate_to_team"] = delegate_to_team
-        response = self.get(url, params=params)
-        raise_for_status(response)
-
-        response_data = response.json()
-        return response_data
+        return self.get_json_cached(url, params=params, cache=self.metadata_cache)
 
     def list_team_members(self, team_uuid: str) -> list:
         """Docs: https://docs.pingintel.com/ping-vision/user-memberships/list-user-memberships"""
         url = self.api_url + "/api/v1/memberships"
-        response = self.get(url, params={"team_uuid": team_uuid})
-        raise_for_status(response)
-        response_data = response.json()
-        return response_data
+        return self.get_json_cached(url, params={"team_uuid": team_uuid}, cache=self.metadata_cache)
 
     def get_or_create_output_async_start(
         self,
@@ -310,12 +688,13 @@ class PingVisionAPIClient(APIClientBase):
 
         response = self.post(url, data=data)
         raise_for_status(response)
-        return response.json()
+        return self.decode_json(response)
 
     def get_or_create_output_async_check_progress(self, output_request_id: str):
         url = self.api_url + f"/api/v1/submission/get_or_create_output/{output_request_id}"
         response = self.get(url)
-        return response.json()
+        raise_for_status(response)
+        return self.decode_json(response)
 
     def get_or_create_output(
         self,
@@ -356,7 +735,10 @@ class PingVisionAPIClient(APIClientBase):
                     break
 
         self.logger.info(f"+ Finished with result {response_data.get('result',{}).get('status')}")
+        return self._output_data_from_response(response_data)
 
+    @staticmethod
+    def _output_data_from_response(response_data) -> t.OutputData:
         result = response_data.get("result", {})
         if not result:
             raise ValueError(f"Invalid response: {response_data}")
@@ -368,8 +750,60 @@ class PingVisionAPIClient(APIClientBase):
         )
         return output
 
+    def get_or_create_output_batch(
+        self,
+        pingids: Iterable[str],
+        output_formats: str | Iterable[str],
+        overwrite_existing: bool = False,
+        *,
+        concurrency: int = 8,
+        poll_seconds: float = 2.5,
+        timeout: timedelta | None = timedelta(minutes=5),
+        download_dir: str | pathlib.Path | None = None,
+    ) -> Iterator[t.OutputBatchResult]:
+        """Get or create outputs for every (pingid, output_format) pair at once, yielding each as soon as it is ready.
+
+        All output requests are started up front on `concurrency` threads and their `output_request_id`s are tracked
+        together by one shared Poller, so the batch takes about as long as the slowest output rather than the sum.
+        `timeout` applies to each output individually.
+
+        :param download_dir: If set, each finished output is also streamed to `download_dir/<pingid>/` as soon as it
+            is ready, on the same `concurrency` threads.
+        :return: Iterator of results in completion order.  Failures are reported in the result, not raised.
+        """
+        if isinstance(output_formats, str):
+            output_formats = [output_formats]
+        output_formats = list(output_formats)
+        pairs = [(pingid, output_format) for pingid in pingids for output_format in output_formats]
+
+        def download(output: t.OutputData, directory: pathlib.Path) -> pathlib.Path:
+            local_path = directory / (output.get("scrubbed_filename") or pathlib.Path(output["url"]).name)
+            self.download_document(local_path, document_url=output["url"])
+            return local_path
+
+        return run_output_batch(
+            pairs,
+            "pingid",
+            start=lambda pingid, output_format: self.get_or_create_output_async_start(
+                pingid, output_format, overwrite_existing
+            ),
+            check_progress=self.get_or_create_output_async_check_progress,
+            output_from_response=self._output_data_from_response,
+            download=download,
+            download_dir=download_dir,
+            ensure_connection_pool_size=self.ensure_connection_pool_size,
+            concurrency=concurrency,
+            poll_seconds=poll_seconds,
+            timeout=timeout,
+        )
+
     def add_data_items(self, pingid: str, action: t.DATA_ITEM_ACTIONS, items: dict[str, str | int | float | bool]):
         """Docs: https://docs.pingintel.com/ping-vision/update-submission/store-additional-data-on-submission"""
         url = self.api_url + f"/api/v1/submission/{pingid}/add_data_items"
         response = self.post(url, json={"items": items, "action": action})
         raise_for_status(response)
+
+    def data_item_writer(self, **kwargs) -> DataItemWriter:
+        """Return a DataItemWriter that batches add_data_items calls over many submissions.  See DataItemWriter for
+        the accepted keyword arguments."""
+        return DataItemWriter(self, **kwargs)
@@ -0,0 +1,296 @@
+# Copyright 2021-2024 Ping Data Intelligence
+
+import datetime
+import json
+import logging
+import pathlib
+import sqlite3
+import threading
+from typing import TYPE_CHECKING, Iterable
+
+from ..batch import fan_out
+from ..structs import to_builtins
+from . import types as t
+
+if TYPE_CHECKING:
+    from .pingvision_api_client import PingVisionAPIClient
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    id TEXT PRIMARY KEY,
+    team_uuid TEXT,
+    division_uuid TEXT,
+    workflow_status_id INTEGER,
+    workflow_status_name TEXT,
+    claimed_by_id TEXT,
+    created_time TEXT,
+    modified_time TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS submissions_status ON submissions (workflow_status_name);
+CREATE INDEX IF NOT EXISTS submissions_team ON submissions (team_uuid, workflow_status_name);
+CREATE INDEX IF NOT EXISTS submissions_claimed_by ON submissions (claimed_by_id);
+CREATE INDEX IF NOT EXISTS submissions_created ON submissions (created_time);
+CREATE INDEX IF NOT EXISTS submissions_modified ON submissions (modified_time);
+
+CREATE TABLE IF NOT EXISTS documents (
+    pingid TEXT NOT NULL REFERENCES submissions (id) ON DELETE CASCADE,
+    filename TEXT NOT NULL,
+    document_type TEXT,
+    url TEXT,
+    created_time TEXT,
+    is_archived INTEGER,
+    PRIMARY KEY (pingid, filename)
+);
+CREATE INDEX IF NOT EXISTS documents_type ON documents (document_type);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class SubmissionReplica:
+    """On-disk SQLite copy of the submission activity for one team or division.
+
+    The first sync() pages through list_submission_activity to load everything.  After that, sync() reads
+    list_submission_events from the saved cursor and re-fetches only the submissions those events touched, so
+    keeping the replica current costs a few requests.  Queries are then local:
+
+        replica = SubmissionReplica(client, "submissions.db", team=team_uuid)
+        replica.sync()
+        queue = replica.query(workflow_status_names=["Received", "Waiting for Scrubbing"], order_by="created_time DESC")
+
+    Each row is stored whole (as JSON) alongside indexed columns for status, team, claimed_by and dates, and each
+    document's metadata goes in the `documents` table.
+    """
+
+    def __init__(
+        self,
+        client: "PingVisionAPIClient",
+        path: str | pathlib.Path,
+        *,
+        team: str | None = None,
+        division: str | None = None,
+        page_size: int = 200,
+        concurrency: int = 8,
+    ):
+        if not any([team, division]):
+            raise ValueError("One of team or division must be provided.")
+        self.client = client
+        self.path = pathlib.Path(path)
+        self.team = team
+        self.division = division
+        self.page_size = page_size
+        self.concurrency = concurrency
+
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA foreign_keys=ON")
+        self.db.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.db.close()
+
+    @property
+    def activity_filters(self) -> dict:
+        filters = {}
+        if self.team:
+            filters["team_uuid"] = self.team
+        if self.division:
+            filters["division_uuid"] = self.division
+        return filters
+
+    def sync(self) -> int:
+        """Bring the replica up to date.  Returns the number of submissions written."""
+        if self._get_state("events_start") is None:
+            return self._full_sync()
+        return self._incremental_sync()
+
+    def _full_sync(self) -> int:
+        # events from this moment on are replayed by the next incremental sync, so nothing changed during the full
+        # scan is missed.
+        events_start = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%d%H%M%S")
+        logger.info(f"Loading all submission activity into {self.path}.")
+        written = 0
+        batch = []
+        for row in self.client.iter_submission_activity(
+            page_size=self.page_size,
+            checkpoint_path=self.path.with_name(self.path.name + ".activity-cursor"),
+            **self.activity_filters,
+        ):
+            batch.append(row)
+            if len(batch) >= self.page_size:
+                written += self.upsert(batch)
+                batch = []
+        written += self.upsert(batch)
+        self._set_state("events_start", events_start)
+        logger.info(f"Loaded {written} submissions.")
+        return written
+
+    def _incremental_sync(self) -> int:
+        params: t.PingVisionSubmissionEventsRequest = {
+            "team": self.team,
+            "division": self.division,
+            "page_size": self.page_size,
+        }
+        cursor_id = self._get_state("events_cursor")
+        if cursor_id:
+            params["cursor_id"] = cursor_id
+        else:
+            params["start"] = datetime.datetime.strptime(self._get_state("events_start"), "%Y%m%d%H%M%S")
+
+        changed_pingids = set()
+        while True:
+            response_data = self.client.list_submission_events(**params)
+            events = response_data.get("results", [])
+            changed_pingids.update(event["pingid"] for event in events if event.get("pingid"))
+            next_cursor_id = response_data.get("cursor_id")
+            if not next_cursor_id or next_cursor_id == cursor_id:
+                break
+            params.pop("start", None)
+            params["cursor_id"] = cursor_id = next_cursor_id
+            if len(events) < self.page_size:
+                break
+
+        written = 0
+        if changed_pingids:
+            logger.info(f"Refreshing {len(changed_pingids)} changed submissions.")
+            written = self.refresh(changed_pingids)
+        if cursor_id:
+            self._set_state("events_cursor", cursor_id)
+        return written
+
+    def refresh(self, pingids: Iterable[str]) -> int:
+        """Re-fetch specific submissions (concurrently) and store them."""
+
+        def fetch(pingid):
+            return self.client.list_submission_activity(pingid=pingid, **self.activity_filters)["results"]
+
+        self.client.ensure_connection_pool_size(self.concurrency)
+        results, errors = fan_out(
+            fetch, {pingid: (pingid,) for pingid in pingids}, self.concurrency, name="replica_refresh"
+        )
+        if errors:
+            raise RuntimeError(f"Failed to refresh {len(errors)} submissions, e.g. {next(iter(errors.items()))}")
+
+        # a submission that no longer matches the filters (e.g. moved to another team) drops out of the replica.
+        gone = [(pingid,) for pingid, rows in results.items() if not rows]
+        if gone:
+            with self._lock, self.db:
+                self.db.executemany("DELETE FROM submissions WHERE id = ?", gone)
+        return self.upsert(row for rows in results.values() for row in rows)
+
+    def upsert(self, rows: Iterable[t.PingVisionListActivityDetailResponse]) -> int:
+        """Store activity rows, replacing any earlier copy of the same submission and its documents."""
+        count = 0
+        with self._lock, self.db:
+            for row in rows:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO submissions "
+                    "(id, team_uuid, division_uuid, workflow_status_id, workflow_status_name, claimed_by_id, "
+                    "created_time, modified_time, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        row["id"],
+                        row.get("team_uuid"),
+                        row.get("division_uuid"),
+                        row.get("workflow_status_id"),
+                        row.get("workflow_status_name"),
+                        str(row["claimed_by_id"]) if row.get("claimed_by_id") is not None else None,
+                        row.get("created_time"),
+                        row.get("modified_time"),
+                        json.dumps(row, default=to_builtins),
+                    ),
+                )
+                self.db.execute("DELETE FROM documents WHERE pingid = ?", (row["id"],))
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO documents "
+                    "(pingid, filename, document_type, url, created_time, is_archived) VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            row["id"],
+                            document["filename"],
+                            document.get("document_type"),
+                            document.get("url"),
+                            document.get("created_time"),
+                            document.get("is_archived"),
+                        )
+                        for document in row.get("documents") or []
+                    ],
+                )
+                count += 1
+        return count
+
+    def query(
+        self,
+        workflow_status_names: list[str] | None = None,
+        team_uuid: str | None = None,
+        claimed_by_id: str | int | None = None,
+        unclaimed: bool = False,
+        created_after: str | None = None,
+        created_before: str | None = None,
+        order_by: str = "created_time DESC",
+        limit: int | None = None,
+    ) -> list[t.PingVisionListActivityDetailResponse]:
+        """Return stored activity rows matching every given filter.  Dates are ISO 8601 strings, compared as
+        stored by the API."""
+        clauses = []
+        params = []
+        if workflow_status_names:
+            clauses.append(f"workflow_status_name IN ({', '.join('?' * len(workflow_status_names))})")
+            params.extend(workflow_status_names)
+        if team_uuid:
+            clauses.append("team_uuid = ?")
+            params.append(team_uuid)
+        if claimed_by_id is not None:
+            clauses.append("claimed_by_id = ?")
+            params.append(str(claimed_by_id))
+        if unclaimed:
+            clauses.append("claimed_by_id IS NULL")
+        if created_after:
+            clauses.append("created_time >= ?")
+            params.append(created_after)
+        if created_before:
+            clauses.append("created_time < ?")
+            params.append(created_before)
+        order_parts = order_by.split()
+        if (
+            not 1 <= len(order_parts) <= 2
+            or order_parts[0] not in ("created_time", "modified_time", "workflow_status_name", "id")
+            or order_parts[1:] not in ([], ["ASC"], ["DESC"], ["asc"], ["desc"])
+        ):
+            raise ValueError(f"Cannot order by {order_by!r}")
+
+        sql = "SELECT data FROM submissions"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {order_by}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return [json.loads(row["data"]) for row in self.db.execute(sql, params)]
+
+    def documents(self, pingid: str) -> list[dict]:
+        with self._lock:
+            return [dict(row) for row in self.db.execute("SELECT * FROM documents WHERE pingid = ?", (pingid,))]
+
+    def _get_state(self, key: str) -> str | None:
+        with self._lock:
+            row = self.db.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def _set_state(self, key: str, value: str):
+        with self._lock, self.db:
+            self.db.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, value))
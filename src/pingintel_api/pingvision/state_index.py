@@ -0,0 +1,195 @@
+# Copyright 2021-2024 Ping Data Intelligence
+
+import logging
+import queue
+import threading
+from collections import defaultdict
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, TypedDict
+
+from . import types as t
+
+if TYPE_CHECKING:
+    from .event_stream import SubmissionEventStream
+
+logger = logging.getLogger(__name__)
+
+
+class SubmissionState(TypedDict):
+    pingid: str
+    status_uuid: str | None
+    team_uuid: str | None
+    division_uuid: str | None
+    claimed_by_id: str | int | None
+    last_event_time: str | None
+
+
+class SubmissionStateIndex:
+    """In-memory view of each submission's current status, kept current from submission events.
+
+    Lookups by pingid, status or team are dict lookups, and `wait_for(pingid, status_uuid)` returns a Future that
+    resolves when the matching status-change event arrives, so workers no longer poll get_submission_detail.  The
+    Future is a concurrent.futures.Future: block on `.result(timeout)`, or `await asyncio.wrap_future(...)` from
+    async code.
+
+        with client.stream_submission_events(division=division_uuid) as stream:
+            index = SubmissionStateIndex()
+            index.follow(stream)
+            index.wait_for(pingid, cleared_status_uuid).result(timeout=600)
+    """
+
+    def __init__(self):
+        self._states: dict[str, SubmissionState] = {}
+        self._by_status: dict[str | None, set[str]] = defaultdict(set)
+        self._by_team: dict[str | None, set[str]] = defaultdict(set)
+        self._waiters: dict[tuple[str, str], list[Future]] = defaultdict(list)
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def __len__(self):
+        return len(self._states)
+
+    def __contains__(self, pingid):
+        return pingid in self._states
+
+    def get(self, pingid: str) -> SubmissionState | None:
+        with self._lock:
+            state = self._states.get(pingid)
+            return SubmissionState(**state) if state else None
+
+    def get_status(self, pingid: str) -> str | None:
+        state = self._states.get(pingid)
+        return state["status_uuid"] if state else None
+
+    def pingids_with_status(self, status_uuid: str) -> set[str]:
+        with self._lock:
+            return set(self._by_status.get(status_uuid, ()))
+
+    def pingids_for_team(self, team_uuid: str) -> set[str]:
+        with self._lock:
+            return set(self._by_team.get(team_uuid, ()))
+
+    def seed(
+        self,
+        pingid: str,
+        status_uuid: str | None = None,
+        team_uuid: str | None = None,
+        division_uuid: str | None = None,
+        claimed_by_id: str | int | None = None,
+    ):
+        """Record a submission's state from another source (e.g. list_submission_activity) before events arrive."""
+        with self._lock:
+            state = self._state_for(pingid)
+            if team_uuid is not None:
+                self._set_team(state, team_uuid)
+            if division_uuid is not None:
+                state["division_uuid"] = division_uuid
+            if claimed_by_id is not None:
+                state["claimed_by_id"] = claimed_by_id
+            if status_uuid is not None:
+                resolved = self._set_status(state, status_uuid)
+            else:
+                resolved = []
+            snapshot = SubmissionState(**state)
+        self._resolve(resolved, snapshot)
+
+    def apply(self, event: t.PingVisionSubmissionEventResponse):
+        """Update the index from one submission event."""
+        pingid = event.get("pingid")
+        if not pingid:
+            return
+        resolved = []
+        with self._lock:
+            state = self._state_for(pingid)
+            if event.get("team_uuid"):
+                self._set_team(state, event["team_uuid"])
+            if event.get("division_uuid"):
+                state["division_uuid"] = event["division_uuid"]
+            state["last_event_time"] = event.get("created_time")
+
+            event_type = event.get("event_type")
+            if event_type == t.SUBMISSION_EVENT_LOG_TYPE.SUBMISSION_STATUS_CHANGE:
+                resolved = self._set_status(state, event.get("new_value"))
+            elif event_type == t.SUBMISSION_EVENT_LOG_TYPE.CLAIMED_BY_CHANGE:
+                state["claimed_by_id"] = event.get("new_value")
+            snapshot = SubmissionState(**state)
+        self._resolve(resolved, snapshot)
+
+    def wait_for(self, pingid: str, status_uuid: str) -> Future:
+        """Return a Future that resolves with the submission's state once it reaches `status_uuid`.  Resolves
+        immediately if it already has."""
+        future = Future()
+        with self._lock:
+            state = self._states.get(pingid)
+            if state and state["status_uuid"] == status_uuid:
+                future.set_result(SubmissionState(**state))
+            else:
+                self._waiters[(pingid, status_uuid)].append(future)
+        return future
+
+    def follow(self, stream: "SubmissionEventStream") -> threading.Thread:
+        """Subscribe to `stream` and apply its events from a background thread until close() is called."""
+        events = stream.subscribe()
+
+        def consume():
+            while not self._stopped.is_set():
+                try:
+                    event = events.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                try:
+                    self.apply(event)
+                except Exception as e:
+                    logger.warning(f"Error applying submission event {event.get('uuid')}: {e}")
+                events.task_done()
+            stream.unsubscribe(events)
+
+        thread = threading.Thread(target=consume, name="SubmissionStateIndex", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+        return thread
+
+    def close(self):
+        """Stop following streams and cancel any outstanding wait_for() futures."""
+        self._stopped.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        with self._lock:
+            waiters, self._waiters = self._waiters, defaultdict(list)
+        for futures in waiters.values():
+            for future in futures:
+                future.cancel()
+
+    @staticmethod
+    def _resolve(futures: list[Future], snapshot: SubmissionState):
+        for future in futures:
+            if not future.cancelled():
+                future.set_result(snapshot)
+
+    def _state_for(self, pingid: str) -> SubmissionState:
+        state = self._states.get(pingid)
+        if state is None:
+            state = self._states[pingid] = {
+                "pingid": pingid,
+                "status_uuid": None,
+                "team_uuid": None,
+                "division_uuid": None,
+                "claimed_by_id": None,
+                "last_event_time": None,
+            }
+            self._by_status[None].add(pingid)
+            self._by_team[None].add(pingid)
+        return state
+
+    def _set_team(self, state: SubmissionState, team_uuid: str):
+        self._by_team[state["team_uuid"]].discard(state["pingid"])
+        state["team_uuid"] = team_uuid
+        self._by_team[team_uuid].add(state["pingid"])
+
+    def _set_status(self, state: SubmissionState, status_uuid) -> list[Future]:
+        self._by_status[state["status_uuid"]].discard(state["pingid"])
+        state["status_uuid"] = status_uuid
+        self._by_status[status_uuid].add(state["pingid"])
+        return self._waiters.pop((state["pingid"], status_uuid), [])
@@ -91,6 +91,30 @@ class PingVisionCreateSubmissionResponse(TypedDict):
     url: str
 
 
+class PingVisionCreateSubmissionBatchManifestEntry(TypedDict):
+    """One line of the create_submissions_batch JSONL manifest."""
+
+    path: str
+    filepaths: list[str]
+    id: str | None
+    url: NotRequired[str | None]
+    state: Literal["started", "done", "error"]
+    workflow_status_name: NotRequired[str | None]
+    error: NotRequired[str]
+    elapsed_seconds: NotRequired[float]
+
+
+class PingVisionCreateSubmissionBatchSummary(TypedDict):
+    total: int
+    succeeded: int
+    failed: int
+    errored: int
+    skipped: int
+    elapsed_seconds: float
+    per_minute: float
+    manifest_path: str
+
+
 # move to pingintel types when done
 class PingVisionHistoryAPIResponseItem(TypedDict):
     uid: str
@@ -166,6 +190,16 @@ class PingVisionSubmissionBulkUpdateChangeItem(TypedDict):
     parameters: dict[Literal["claimed_by_id", "workflow_status_id"], int]
 
 
+class PingVisionSubmissionBulkUpdateReport(TypedDict):
+    """Merged result of bulk_update_submissions_chunked: the last response for every pingid."""
+
+    results: list[PingVisionSubmissionBulkUpdateItemResponse]
+    succeeded: list[str]
+    failed: dict[str, str]
+    requests: int
+    retried: int
+
+
 class SUBMISSION_EVENT_LOG_TYPE(str, enum.Enum):
     NEW_SUBMISSION = "NEW"
     SUBMISSION_STATUS_CHANGE = "SSC"
@@ -224,8 +258,32 @@ class DATA_ITEM_ACTIONS(str, enum.Enum):
     REPLACE = "replace"
 
 
+class DataItemWriteSummary(TypedDict):
+    total: int
+    succeeded: int
+    failed: int
+    errored: int
+    skipped: int
+    elapsed_seconds: float
+    per_minute: float
+    items_added: int
+    items_written: int
+    retries: int
+    errors: dict[str, str]
+
+
 class OutputData(TypedDict):
     label: str
     scrubbed_filename: str
     output_format: str
     url: str
+
+
+class OutputBatchResult(TypedDict):
+    pingid: str
+    output_format: str
+    output_request_id: str | None
+    success: bool
+    output: OutputData | None
+    local_path: str | None
+    error: str | None
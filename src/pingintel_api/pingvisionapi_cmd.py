@@ -8,11 +8,14 @@ import pprint
 import time
 from timeit import default_timer as timer
 
+from typing import TYPE_CHECKING
+
 import click
 
-from pingintel_api import PingVisionAPIClient
-from pingintel_api.api_client_base import AuthTokenNotFound
-from pingintel_api.utils import set_verbosity
+from pingintel_api.utils import make_client, set_verbosity
+
+if TYPE_CHECKING:
+    from pingintel_api.pingvision.pingvision_api_client import PingVisionAPIClient
 
 logger = logging.getLogger(__name__)
 
@@ -63,12 +66,16 @@ def cli(ctx, environment, api_url, auth_token, verbose):
     set_verbosity(verbose)
 
 
-def get_client(ctx) -> PingVisionAPIClient:
+def get_client(ctx) -> "PingVisionAPIClient":
+    # imported here rather than at the top so `--help` doesn't have to load requests and the client.
+    from pingintel_api.api_client_base import AuthTokenNotFound
+    from pingintel_api.pingvision.pingvision_api_client import PingVisionAPIClient
+
     environment = ctx.obj["environment"]
     auth_token = ctx.obj["auth_token"]
     api_url = ctx.obj["api_url"]
     try:
-        client = PingVisionAPIClient(environment=environment, auth_token=auth_token, api_url=api_url)
+        client = make_client(ctx, PingVisionAPIClient, environment=environment, auth_token=auth_token, api_url=api_url)
     except AuthTokenNotFound as e:
         click.echo(e)
         raise click.Abort()
@@ -132,6 +139,87 @@ def create(ctx, filename, poll_until_ready, team, insured_name, delegate_to_comp
             time.sleep(1.0)
 
 
+@cli.command()
+@click.pass_context
+@click.argument("path", nargs=-1, required=True, type=click.Path(exists=True, path_type=pathlib.Path))
+@click.option(
+    "-j",
+    "--concurrency",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help="Maximum number of uploads in flight at once.",
+)
+@click.option(
+    "--manifest",
+    type=click.Path(dir_okay=False, path_type=pathlib.Path),
+    default="create-batch-manifest.jsonl",
+    show_default=True,
+    help="JSONL manifest of results. Re-run with the same manifest to resume.",
+)
+@click.option(
+    "--split-directories",
+    is_flag=True,
+    default=False,
+    help="Submit each entry of a DIRECTORY PATH separately, instead of the whole directory as one submission.",
+)
+@click.option(
+    "--poll-until-ready/--no-poll-until-ready",
+    is_flag=True,
+    default=True,
+    help="(default) Wait until every submission is ready before recording it as done.",
+)
+@click.option("--insured-name")
+@click.option(
+    "--team",
+    "--team-uuid",
+    help="Team UUID to use for the submissions. Optional unless you can access more than one team.",
+)
+@click.option(
+    "--delegate-to-company",
+    help="Delegate to another organization. Provide the company uuid, short_name, or id of the desired delegatee team.  Requires the `delegate` permission. If set but `delegate_to_team` is not set, the API will return an error if the company has multiple teams.",
+)
+@click.option(
+    "--delegate-to",
+    "--delegate-to-team",
+    metavar="TEAM_UUID",
+    help="Delegate to another organization. Provide the 'uuid' of the desired delegatee team.  Requires the `delegate` permission. If set, `delegate_to_company` is required. Can be team uuid, or id",
+)
+def create_batch(
+    ctx,
+    path,
+    concurrency,
+    manifest,
+    split_directories,
+    poll_until_ready,
+    insured_name,
+    team,
+    delegate_to_company,
+    delegate_to,
+):
+    """Create many submissions at once.  Each FILE PATH becomes one submission, and so does each DIRECTORY PATH
+    (all the files in it, e.g. an .eml and its attachments).  With --split-directories, every file inside a
+    DIRECTORY PATH becomes its own submission instead, and every subdirectory one submission of all the files in
+    it."""
+    client = get_client(ctx)
+    summary = client.create_submissions_batch(
+        [str(p) for p in path],
+        concurrency,
+        manifest_path=manifest,
+        split_directories=split_directories,
+        poll_until_ready=poll_until_ready,
+        insured_name=insured_name,
+        team_uuid=team,
+        delegate_to_company=delegate_to_company,
+        delegate_to_team=delegate_to,
+    )
+    click.echo(
+        f"Created {summary['total']} submissions in {summary['elapsed_seconds']:.1f}s ({summary['per_minute']:.1f}/min): "
+        f"{summary['succeeded']} succeeded, {summary['errored']} errored, {summary['skipped']} skipped."
+    )
+    click.echo(f"Manifest: {summary['manifest_path']}")
+
+
 @cli.command()
 @click.pass_context
 @click.argument("pingid", type=str)
@@ -177,6 +265,11 @@ def list_teams(ctx, pretty, include_statuses, filter_str, delegate_to_company, d
         ]
 
     if pretty:
+        statuses_by_division = {}
+        if include_statuses:
+            # many teams share a division, so fetch each division's statuses once, in parallel.
+            statuses_by_division = client.list_submission_statuses_for_divisions(team["division_uuid"] for team in ret)
+
         print(f"{'Company':<50}{'Division':<60}{'Team':<60}")
         for team in ret:
             company = f"{team['company_short_name']} ({team['company_uuid']})"
@@ -185,7 +278,7 @@ def list_teams(ctx, pretty, include_statuses, filter_str, delegate_to_company, d
             print(f"{company:<50}{division:<60}{team_name:<60}")
 
             if include_statuses:
-                statuses = team.get("statuses", [])
+                statuses = statuses_by_division.get(team["division_uuid"], [])
                 print("  Statuses:")
                 for status in statuses:
                     print(f"    {status.get('name', ''):<30}{status.get('uuid', ''):<36}")
@@ -208,11 +301,34 @@ def list_teams(ctx, pretty, include_statuses, filter_str, delegate_to_company, d
     default="desc",
     show_default=True,
 )
+@click.option("--all", "all_pages", is_flag=True, default=False, help="Follow the cursor and list every page.")
+@click.option(
+    "--checkpoint",
+    type=click.Path(dir_okay=False, path_type=pathlib.Path),
+    help="With --all, save progress here and resume from it on the next run.",
+)
 # @click.option("--organization__short_name")
-def activity(ctx, pretty, id, cursor_id, prev_cursor_id, page_size, fields, search, sort_order):
+def activity(ctx, pretty, id, cursor_id, prev_cursor_id, page_size, fields, search, sort_order, all_pages, checkpoint):
     """List submission activity."""
     client = get_client(ctx)
 
+    if all_pages:
+        if pretty:
+            print(f"{'Activity ID':<36}{'Status':<30}{'Created':<20}")
+        for activity in client.iter_submission_activity(
+            page_size=page_size,
+            fields=fields,
+            checkpoint_path=checkpoint,
+            pingid=id,
+            search=search,
+            sort_order=sort_order,
+        ):
+            if pretty:
+                _print_activity(activity)
+            else:
+                pprint.pprint(activity)
+        return
+
     results = client.list_submission_activity(
         page_size=page_size,
         pingid=id,
@@ -225,20 +341,22 @@ def activity(ctx, pretty, id, cursor_id, prev_cursor_id, page_size, fields, sear
     if pretty:
         print(f"{'Activity ID':<36}{'Status':<30}{'Created':<20}")
         for activity in results["results"]:
-            created_time_isoformatted = activity["created_time"]
-            created_time = time.strftime(
-                "%Y-%m-%d %H:%M",
-                time.strptime(created_time_isoformatted, "%Y-%m-%dT%H:%M:%S.%fZ"),
-            )
-            print(
-                f"{activity['id'] or '*null*':<36}{activity['workflow_status_name'] or '*null*':<30}{created_time:<20}"
-            )
-            for doc in activity["documents"]:
-                print(f"  {doc['filename']:<40} {doc['url']}")
+            _print_activity(activity)
     else:
         pprint.pprint(results)
 
 
+def _print_activity(activity):
+    created_time_isoformatted = activity["created_time"]
+    created_time = time.strftime(
+        "%Y-%m-%d %H:%M",
+        time.strptime(created_time_isoformatted, "%Y-%m-%dT%H:%M:%S.%fZ"),
+    )
+    print(f"{activity['id'] or '*null*':<36}{activity['workflow_status_name'] or '*null*':<30}{created_time:<20}")
+    for doc in activity["documents"]:
+        print(f"  {doc['filename']:<40} {doc['url']}")
+
+
 @cli.command()
 @click.pass_context
 @click.argument("document_url")
@@ -0,0 +1,287 @@
+# Copyright 2021-2024 Ping Data Intelligence
+
+import logging
+import pathlib
+import queue
+import threading
+import time
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from datetime import timedelta
+from functools import partial
+from typing import Any, Callable, Hashable, Iterable, Iterator
+
+from .utils import is_transient_error
+
+logger = logging.getLogger(__name__)
+
+
+class Poller:
+    """Tracks many outstanding async requests from a single background thread.
+
+    Every `poll_seconds`, `check(key)` is called for each watched key (spread over `max_workers` threads).  As soon
+    as `is_done(response)` is true for a key, the Future returned by `watch(key)` resolves with that response.  This
+    replaces one sleep loop per request with one shared loop, so thousands of pending requests cost a handful of
+    threads.
+
+    If `check` raises a transient error (see utils.is_transient_error) the key is simply checked again next time,
+    until `timeout`; any other exception from `check` or `is_done` fails that key's Future alone.
+
+        with Poller(client.update_sov_async_check_progress, is_done=...) as poller:
+            future = poller.watch(sudid)
+            response = future.result()
+    """
+
+    def __init__(
+        self,
+        check: Callable[[Any], Any],
+        is_done: Callable[[Any], bool],
+        poll_seconds: float = 2.5,
+        timeout: timedelta | None = None,
+        max_workers: int = 4,
+        name: str = "poller",
+    ):
+        self.check = check
+        self.is_done = is_done
+        self.poll_seconds = poll_seconds
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.name = name
+
+        self._pending: dict[Hashable, tuple[Future, float]] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}_check")
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread.is_alive() and not self._stopped.is_set()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._pending)
+
+    def watch(self, key: Hashable, initial_response=None) -> Future:
+        """Start tracking `key`.  If `initial_response` is already done, the returned Future is resolved
+        immediately without polling.  Watching a key that is already pending returns the existing Future."""
+        if initial_response is not None and self.is_done(initial_response):
+            future = Future()
+            future.set_result(initial_response)
+            return future
+
+        with self._lock:
+            if self._stopped.is_set():
+                raise RuntimeError(f"{self.name} is closed.")
+            if key in self._pending:
+                return self._pending[key][0]
+            future = Future()
+            self._pending[key] = (future, time.monotonic())
+        return future
+
+    def close(self):
+        """Stop polling.  Futures that have not resolved yet are cancelled."""
+        self._stopped.set()
+        self._wakeup.set()
+        self._thread.join()
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for future, _ in pending.values():
+            future.cancel()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            tick_start = time.monotonic()
+            with self._lock:
+                keys = list(self._pending)
+            if keys:
+                logger.debug(f"{self.name}: checking {len(keys)} pending requests.")
+                try:
+                    for key, outcome in zip(keys, self._executor.map(self._check_one, keys)):
+                        self._resolve(key, outcome)
+                except Exception:
+                    # keep polling the other keys; this thread dying would leave every Future unresolved.
+                    logger.exception(f"{self.name}: error while polling.")
+
+            elapsed = time.monotonic() - tick_start
+            self._wakeup.wait(max(0.0, self.poll_seconds - elapsed))
+            self._wakeup.clear()
+
+    def _check_one(self, key) -> tuple[bool, Any]:
+        try:
+            return True, self.check(key)
+        except Exception as e:
+            return False, e
+
+    def _resolve(self, key, outcome: tuple[bool, Any]):
+        ok, response = outcome
+        with self._lock:
+            if key not in self._pending:
+                return
+            future, started_at = self._pending[key]
+            try:
+                done = self.is_done(response) if ok else not is_transient_error(response)
+            except Exception as e:
+                ok, response, done = False, e, True
+
+            if not done:
+                if not (self.timeout and time.monotonic() - started_at > self.timeout.total_seconds()):
+                    if not ok:
+                        logger.info(f"{self.name}: checking {key} failed ({response}), will retry.")
+                    return
+                last_error = "" if ok else f" (last error: {response})"
+                ok, response = False, TimeoutError(f"Timeout waiting for {key}{last_error}")
+            del self._pending[key]
+
+        if ok:
+            future.set_result(response)
+        else:
+            logger.warning(f"{self.name}: {key} failed: {response}")
+            future.set_exception(response)
+
+
+def run_polled_pipeline(
+    items: Iterable,
+    start: Callable[[Any], tuple[Hashable, Any]],
+    poller: Poller,
+    finish: Callable[[Any, Hashable, Any], Any],
+    error_result: Callable[[Any, Hashable | None, Exception], Any],
+    concurrency: int = 8,
+    name: str = "pipeline",
+) -> Iterator:
+    """Run a start -> poll -> finish pipeline over `items`, yielding one result per item in completion order.
+
+    `start(item)` runs on a pool of `concurrency` threads and returns `(key, initial_response)`; the key is handed
+    to `poller`, and once it is done `finish(item, key, response)` runs on the same pool.  Any exception along the
+    way is turned into `error_result(item, key, exception)`, so one bad item never stops the rest.  If `poller`
+    stops before every item is done, RuntimeError is raised rather than waiting forever.
+    """
+    items = list(items)
+    results = queue.Queue()
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=name)
+
+    def on_started(item, future):
+        key = None
+        try:
+            key, initial_response = future.result()
+            poller.watch(key, initial_response).add_done_callback(partial(on_polled, item, key))
+        except Exception as e:
+            results.put(error_result(item, key, e))
+
+    def on_polled(item, key, future):
+        try:
+            response = future.result()
+            executor.submit(finish, item, key, response).add_done_callback(partial(on_finished, item, key))
+        except (Exception, CancelledError) as e:
+            results.put(error_result(item, key, e))
+
+    def on_finished(item, key, future):
+        try:
+            results.put(future.result())
+        except Exception as e:
+            results.put(error_result(item, key, e))
+
+    try:
+        for item in items:
+            executor.submit(start, item).add_done_callback(partial(on_started, item))
+        for _ in range(len(items)):
+            while True:
+                try:
+                    result = results.get(timeout=max(poller.poll_seconds, 1.0))
+                    break
+                except queue.Empty:
+                    if not poller.is_running:
+                        raise RuntimeError(f"{poller.name} stopped before every request finished.")
+            yield result
+    finally:
+        # if the caller stopped iterating early, don't start any more work.
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def run_output_batch(
+    pairs: Iterable[tuple[str, str]],
+    id_field: str,
+    *,
+    start: Callable[[str, str], dict],
+    check_progress: Callable[[str], dict],
+    output_from_response: Callable[[dict], dict],
+    download: Callable[[dict, pathlib.Path], str | pathlib.Path],
+    download_dir: str | pathlib.Path | None,
+    ensure_connection_pool_size: Callable[[int], None],
+    concurrency: int = 8,
+    poll_seconds: float = 2.5,
+    timeout: timedelta | None = None,
+) -> Iterator[dict]:
+    """Engine behind the get_or_create_output_batch methods of the PingVision and SOV Fixer clients.
+
+    `start(id, output_format)` starts one output request and returns its response; the requests are then polled
+    together with `check_progress(output_request_id)`, and `output_from_response` extracts the output from the
+    final response.  If `download_dir` is set, `download(output, directory)` saves each finished output into
+    `download_dir/<id>/` and returns its path.  Yields one result per pair, keyed by `id_field`, in completion
+    order."""
+
+    def is_done(response_data):
+        return response_data["request"]["status"] not in ("PENDING", "IN_PROGRESS")
+
+    def start_pair(pair):
+        start_response = start(*pair)
+        return start_response["request"]["id"], start_response
+
+    def finish(pair, output_request_id, response_data) -> dict:
+        id, output_format = pair
+        request_status = response_data["request"]["status"]
+        output = output_from_response(response_data)
+        logger.info(f"+ {output_format} output of {id} finished with status {request_status}")
+        local_path = None
+        if request_status == "COMPLETE" and download_dir is not None:
+            directory = pathlib.Path(download_dir) / id
+            directory.mkdir(parents=True, exist_ok=True)
+            local_path = str(download(output, directory))
+        return {
+            id_field: id,
+            "output_format": output_format,
+            "output_request_id": output_request_id,
+            "success": request_status == "COMPLETE",
+            "output": output,
+            "local_path": local_path,
+            "error": None,
+        }
+
+    def error_result(pair, output_request_id, e) -> dict:
+        id, output_format = pair
+        logger.warning(f"* {output_format} output of {id} failed: {e}")
+        return {
+            id_field: id,
+            "output_format": output_format,
+            "output_request_id": output_request_id,
+            "success": False,
+            "output": None,
+            "local_path": None,
+            "error": str(e),
+        }
+
+    with Poller(
+        check_progress,
+        is_done,
+        poll_seconds=poll_seconds,
+        timeout=timeout,
+        name="get_or_create_output_batch_poller",
+    ) as poller:
+        ensure_connection_pool_size(concurrency + poller.max_workers)
+        yield from run_polled_pipeline(
+            pairs,
+            start_pair,
+            poller,
+            finish,
+            error_result,
+            concurrency=concurrency,
+            name="get_or_create_output_batch",
+        )
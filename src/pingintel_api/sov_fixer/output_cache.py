@@ -0,0 +1,208 @@
+# Copyright 2021-2024 Ping Data Intelligence
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import shutil
+import tempfile
+import threading
+import time
+from typing import Iterable, TypedDict
+
+from ..utils import pretty_filesize
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = "~/.cache/pingintel/sovfixer_outputs"
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+
+class OutputCacheEntry(TypedDict):
+    digest: str
+    size: int
+    last_access: float
+    url: str | None
+    etag: str | None
+    last_modified: str | None
+
+
+class OutputCache:
+    """Size-bounded, content-addressed on-disk cache of downloaded SOV Fixer outputs.
+
+    Files are stored once under `blobs/` by their sha256.  Each (sovid/sudid, revision, output_format,
+    scrubbed_filename) key has its own small file under `index/` pointing at its blob, along with the server
+    metadata (url, ETag, Last-Modified) it was downloaded with; its mtime records when it was last used.  Keeping
+    one file per key means several processes can share the cache directory without overwriting each other's
+    entries.  When the total size exceeds `max_bytes`, the least recently used keys are evicted (never the one
+    just stored), and blobs no key refers to any more are deleted.  A single output larger than `max_bytes` is
+    not cached at all.
+
+    Use it through SOVFixerAPIClient.get_output_cached().
+    """
+
+    def __init__(self, directory: str | pathlib.Path = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = pathlib.Path(directory).expanduser()
+        self.max_bytes = max_bytes
+        self.blob_dir = self.directory / "blobs"
+        self.index_dir = self.directory / "index"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.index_dir.mkdir(exist_ok=True)
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def make_key(sovid_or_sud: str, revision: int, output_format: str, scrubbed_filename: str | None) -> str:
+        return f"{sovid_or_sud}|{revision}|{output_format}|{scrubbed_filename or ''}"
+
+    def blob_path(self, digest: str) -> pathlib.Path:
+        return self.blob_dir / digest[:2] / digest
+
+    def entry_path(self, key: str) -> pathlib.Path:
+        return self.index_dir / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]}.json"
+
+    @property
+    def entries(self) -> dict[str, OutputCacheEntry]:
+        """Every entry currently in the cache, read from disk."""
+        entries = {}
+        for path in self.index_dir.glob("*.json"):
+            loaded = self._read_entry(path)
+            if loaded:
+                entries[loaded[0]] = loaded[1]
+        return entries
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(entry["size"] for entry in self._entries_by_digest(self.entries).values())
+
+    def get(self, key: str) -> OutputCacheEntry | None:
+        """Return the entry for `key` if its blob is still on disk, marking it as recently used."""
+        path = self.entry_path(key)
+        loaded = self._read_entry(path)
+        if loaded is None or loaded[0] != key:
+            return None
+        entry = loaded[1]
+        if not self.blob_path(entry["digest"]).exists():
+            path.unlink(missing_ok=True)
+            return None
+        with contextlib.suppress(FileNotFoundError):
+            os.utime(path)
+        entry["last_access"] = time.time()
+        return entry
+
+    def find(self, sovid_or_sud: str, revision: int, output_format: str) -> tuple[str, OutputCacheEntry] | None:
+        """Find an entry for a specific revision without knowing its scrubbed_filename."""
+        prefix = self.make_key(sovid_or_sud, revision, output_format, None)
+        for key in self.entries:
+            if key.startswith(prefix):
+                entry = self.get(key)
+                if entry:
+                    return key, entry
+        return None
+
+    def put(
+        self,
+        key: str,
+        chunks: Iterable[bytes],
+        url: str | None = None,
+        etag: str | None = None,
+        last_modified: str | None = None,
+        output_path: str | pathlib.Path | None = None,
+    ) -> OutputCacheEntry | None:
+        """Stream `chunks` into the cache under `key` (and to `output_path`, if given), then evict down to
+        `max_bytes`.  Returns the new entry, or None if the output is too large to cache."""
+        hasher = hashlib.sha256()
+        size = 0
+        with tempfile.NamedTemporaryFile(dir=self.directory, delete=False, prefix=".download-") as fd:
+            try:
+                for chunk in chunks:
+                    hasher.update(chunk)
+                    fd.write(chunk)
+                    size += len(chunk)
+            except BaseException:
+                fd.close()
+                os.unlink(fd.name)
+                raise
+
+        if size > self.max_bytes:
+            logger.info(f"Not caching {key}: {pretty_filesize(size)} is larger than the whole cache.")
+            if output_path is not None:
+                shutil.move(fd.name, output_path)
+            else:
+                os.unlink(fd.name)
+            return None
+
+        digest = hasher.hexdigest()
+        blob_path = self.blob_path(digest)
+        blob_path.parent.mkdir(exist_ok=True)
+        os.replace(fd.name, blob_path)
+        if output_path is not None:
+            shutil.copyfile(blob_path, output_path)
+
+        entry: OutputCacheEntry = {
+            "digest": digest,
+            "size": size,
+            "last_access": time.time(),
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+        }
+        with self._lock:
+            self._write_entry(key, entry)
+            self._evict(keep=key)
+        logger.debug(f"Cached {key} as {digest} ({pretty_filesize(size)}).")
+        return entry
+
+    def copy_to(self, entry: OutputCacheEntry, output_path: str | pathlib.Path) -> str:
+        shutil.copyfile(self.blob_path(entry["digest"]), output_path)
+        return str(output_path)
+
+    @staticmethod
+    def _entries_by_digest(entries: dict[str, OutputCacheEntry]) -> dict[str, OutputCacheEntry]:
+        return {entry["digest"]: entry for entry in entries.values()}
+
+    def _evict(self, keep: str):
+        entries = self.entries
+        total = sum(entry["size"] for entry in self._entries_by_digest(entries).values())
+        if total <= self.max_bytes:
+            return
+        for key, entry in sorted(entries.items(), key=lambda item: item[1]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            del entries[key]
+            self.entry_path(key).unlink(missing_ok=True)
+            if not any(other["digest"] == entry["digest"] for other in entries.values()):
+                total -= entry["size"]
+                self.blob_path(entry["digest"]).unlink(missing_ok=True)
+            logger.debug(f"Evicted {key} from output cache.")
+        logger.info(f"Output cache is now {pretty_filesize(total)}.")
+
+    def _read_entry(self, path: pathlib.Path) -> tuple[str, OutputCacheEntry] | None:
+        try:
+            with open(path, "r", encoding="utf-8") as fd:
+                data = json.load(fd)
+            last_access = os.stat(path).st_mtime
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable output cache entry {path}: {e}")
+            return None
+        key = data.pop("key", None)
+        if not isinstance(key, str):
+            logger.warning(f"Ignoring malformed output cache entry {path}.")
+            return None
+        data["last_access"] = last_access
+        return key, data
+
+    def _write_entry(self, key: str, entry: OutputCacheEntry):
+        path = self.entry_path(key)
+        # unique temp name, so processes writing the same key don't trip over each other.
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=self.index_dir, delete=False, prefix=".entry-", suffix=".tmp"
+        ) as fd:
+            json.dump({"key": key, **{name: value for name, value in entry.items() if name != "last_access"}}, fd)
+        os.replace(fd.name, path)
+        os.utime(path, (entry["last_access"], entry["last_access"]))
@@ -6,15 +6,20 @@ import os
 import pathlib
 import pprint
 import time
-from typing import IO, Collection, Literal
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from timeit import default_timer as timer
+from typing import IO, Collection, Iterable, Iterator, Literal, Mapping
 from datetime import timedelta, datetime
 from uuid import UUID
 import click
 
 from pingintel_api.api_client_base import APIClientBase
 
+from ..batch import BatchManifest, BatchStats, fan_out
+from ..poller import Poller, run_output_batch, run_polled_pipeline
 from ..utils import is_fileobj, raise_for_status
 from . import types as t
+from .output_cache import OutputCache
 
 
 class SOVFixerAPIClient(APIClientBase):
@@ -95,7 +100,7 @@ class SOVFixerAPIClient(APIClientBase):
 
         raise_for_status(response)
 
-        response_data = response.json()
+        response_data = self.decode_json(response)
         sov_id = response_data["id"]
         message = response_data["message"]
         status_url = self.api_url + f"/api/v1/sov/{sov_id}"
@@ -115,10 +120,37 @@ class SOVFixerAPIClient(APIClientBase):
         # pprint.pprint(response.json())
         raise_for_status(response)
 
-        response_data: t.FixSOVResponse = response.json()
+        response_data: t.FixSOVResponse = self.decode_json(response, t.FixSOVResponse)
         # request_status = response_data["request"]["status"]
         return response_data
 
+    def fix_sov_async_wait(
+        self, sovid_or_start_ret, poll_seconds: float = 2.5, timeout: timedelta | None = None
+    ) -> t.FixSOVResponse:
+        """Poll fix_sov_async_check_progress until the request leaves the incomplete statuses, and return the
+        final progress response.  Raises TimeoutError if that takes longer than `timeout` (None waits forever)."""
+        start_time = time.time()
+        while 1:
+            if timeout and time.time() - start_time > timeout.total_seconds():
+                sovid = sovid_or_start_ret["id"] if isinstance(sovid_or_start_ret, dict) else sovid_or_start_ret
+                raise TimeoutError(f"Timeout waiting for SOV Fixer request {sovid}")
+            response_data = self.fix_sov_async_check_progress(sovid_or_start_ret)
+            # raise_for_status(response_data)
+            # pprint.pprint(response_data)
+
+            request_status = response_data["request"]["status"]
+            pct_complete = response_data["request"]["pct_complete"]
+            last_status = response_data["request"]["last_health_status"]
+
+            if request_status == "PENDING":
+                self.logger.info("  - Has not yet been queued for processing.")
+                time.sleep(poll_seconds)
+            elif request_status in t.INCOMPLETE_STATUSES:
+                self.logger.info(f"  - Still in progress ({pct_complete}% complete): {last_status}")
+                time.sleep(poll_seconds)
+            else:
+                return response_data
+
     def fix_sov_download(
         self,
         output_ret: t.FixSOVResponseResultOutput | t.OutputData,
@@ -135,15 +167,7 @@ class SOVFixerAPIClient(APIClientBase):
             If True, the file will be written to disk.  If False, the file will be downloaded but not written to disk.  This is mostly for testing.
         """
 
-        output_url = output_ret["url"]
-
-        # if output_url does not have the base_url then add it.
-        if not output_url.startswith("http"):
-            assert output_url.startswith("/"), f"Invalid output URL: {output_url}"
-            output_url = self.api_url + output_url
-
-        if self.environment and self.environment == "local2" and "api-local.sovfixer.com" in output_url:
-            output_url = output_url.replace("api-local.sovfixer.com", "localhost:8000")
+        output_url = self._output_url(output_ret["url"])
 
         output_description = output_ret.get("description", output_ret.get("label"))
         output_filename = output_ret.get("filename", output_ret.get("scrubbed_filename"))
@@ -157,6 +181,17 @@ class SOVFixerAPIClient(APIClientBase):
             output_description=output_description,
         )
 
+    def _output_url(self, output_url: str) -> str:
+        """The absolute URL to download an output from, given the "url" of an output in an API response."""
+        # if output_url does not have the base_url then add it.
+        if not output_url.startswith("http"):
+            assert output_url.startswith("/"), f"Invalid output URL: {output_url}"
+            output_url = self.api_url + output_url
+
+        if self.environment and self.environment == "local2" and "api-local.sovfixer.com" in output_url:
+            output_url = output_url.replace("api-local.sovfixer.com", "localhost:8000")
+        return output_url
+
     def download_file(
         self,
         download_url,
@@ -227,6 +262,7 @@ class SOVFixerAPIClient(APIClientBase):
         noinput=True,
         allow_ping_data_api=True,
         workflow=None,
+        timeout: timedelta | None = None,
     ) -> t.FixSOVProcessResponse:
         sov_fixer_client = self
         start_response = sov_fixer_client.fix_sov_async_start(
@@ -243,24 +279,7 @@ class SOVFixerAPIClient(APIClientBase):
             workflow=workflow,
         )
 
-        while 1:
-            response_data = sov_fixer_client.fix_sov_async_check_progress(start_response)
-            # raise_for_status(response_data)
-            # pprint.pprint(response_data)
-
-            request_status = response_data["request"]["status"]
-            pct_complete = response_data["request"]["pct_complete"]
-            last_status = response_data["request"]["last_health_status"]
-
-            POLL_SECS = 2.5
-            if request_status == "PENDING":
-                self.logger.info("  - Has not yet been queued for processing.")
-                time.sleep(POLL_SECS)
-            elif request_status in t.INCOMPLETE_STATUSES:
-                self.logger.info(f"  - Still in progress ({pct_complete}% complete): {last_status}")
-                time.sleep(POLL_SECS)
-            else:
-                break
+        response_data = sov_fixer_client.fix_sov_async_wait(start_response, timeout=timeout)
 
         result_status = response_data["result"]["status"]
         result_message = response_data["result"]["message"]
@@ -309,6 +328,135 @@ class SOVFixerAPIClient(APIClientBase):
                 "local_outputs": local_outputs,
             }
 
+    def fix_sov_batch(
+        self,
+        paths: Iterable[str | pathlib.Path],
+        concurrency: int = 8,
+        *,
+        output_dir: str | pathlib.Path | None = None,
+        manifest_path: str | pathlib.Path | None = None,
+        actually_write: bool = True,
+        poll_seconds: float = 2.5,
+        document_type: str = "SOV",
+        output_formats=None,
+        integrations=None,
+        client_ref=None,
+        extra_data=None,
+        delegate_to_team: UUID | str | int | None = None,
+        allow_ping_data_api=True,
+        workflow=None,
+        timeout: timedelta | None = None,
+    ) -> t.FixSOVBatchSummary:
+        """Process many SOVs as independent SOV Fixer requests, at most `concurrency` in flight at a time.
+
+        Each file is uploaded, polled and its outputs downloaded to `output_dir/<sovid>/`.  Progress is appended
+        to the JSONL manifest at `manifest_path`; re-running with the same manifest skips files that already
+        finished and resumes polling files that were uploaded but not yet complete, instead of uploading them again.
+
+        :param paths: The files to process.  Each one becomes its own request.
+        :param concurrency: Maximum number of SOVs being uploaded, polled or downloaded at once.
+        :param output_dir: Where to write outputs.  Defaults to the current directory.
+        :param manifest_path: JSONL file recording the result of each file.  If None, nothing is persisted.
+        :param timeout: How long to wait for each request to finish processing; a file that times out is recorded
+            as errored and resumed by the next run.  None waits forever.
+        :return: Counts and throughput for the run.
+        """
+        paths = [str(path) for path in paths]
+        output_dir = pathlib.Path(output_dir or ".")
+        manifest = BatchManifest(manifest_path, key_field="path")
+        stats = BatchStats(len(paths), label="SOVs")
+        start_kwargs = dict(
+            document_type=document_type,
+            output_formats=output_formats,
+            integrations=integrations,
+            client_ref=client_ref,
+            extra_data=extra_data,
+            delegate_to_team=delegate_to_team,
+            allow_ping_data_api=allow_ping_data_api,
+            workflow=workflow,
+        )
+
+        self.ensure_connection_pool_size(concurrency)
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="fix_sov_batch") as executor:
+            futures = []
+            for path in paths:
+                if manifest.is_done(path):
+                    stats.record("skipped")
+                    continue
+                futures.append(
+                    executor.submit(
+                        self._fix_sov_batch_one,
+                        path,
+                        manifest,
+                        output_dir,
+                        actually_write,
+                        poll_seconds,
+                        timeout,
+                        start_kwargs,
+                    )
+                )
+            for future in as_completed(futures):
+                stats.record(future.result())
+
+        summary: t.FixSOVBatchSummary = {**stats.summary(), "manifest_path": str(manifest_path or "")}
+        self.logger.info(f"+ Finished batch: {summary}")
+        return summary
+
+    def _fix_sov_batch_one(
+        self, path, manifest, output_dir, actually_write, poll_seconds, timeout, start_kwargs
+    ) -> str:
+        start_time = timer()
+        previous_entry = manifest.get(path)
+        sovid = previous_entry.get("id") if previous_entry else None
+        try:
+            if sovid:
+                self.logger.info(f"Resuming {path} as {sovid}.")
+            else:
+                start_response = self.fix_sov_async_start(path, **start_kwargs)
+                sovid = start_response["id"]
+                manifest.write({"path": path, "id": sovid, "state": "started"})
+
+            response_data = self.fix_sov_async_wait(sovid, poll_seconds=poll_seconds, timeout=timeout)
+            result = response_data.get("result", {})
+            result_status = result.get("status")
+
+            local_outputs = []
+            if result_status == "SUCCESS":
+                sov_output_dir = output_dir / sovid
+                if actually_write:
+                    sov_output_dir.mkdir(parents=True, exist_ok=True)
+                for output in result.get("outputs", []):
+                    output_path = sov_output_dir / output["filename"]
+                    self.fix_sov_download(output, output_path=output_path, actually_write=actually_write)
+                    local_outputs.append(str(output_path))
+            else:
+                self.logger.warning(f"* Parsing {path} ({sovid}) failed: {result.get('message')}")
+        except Exception as e:
+            self.logger.warning(f"* Error processing {path}: {e}")
+            manifest.write(
+                {
+                    "path": path,
+                    "id": sovid,
+                    "state": "error",
+                    "error": str(e),
+                    "elapsed_seconds": round(timer() - start_time, 3),
+                }
+            )
+            return "errored"
+
+        entry: t.FixSOVBatchManifestEntry = {
+            "path": path,
+            "id": sovid,
+            "state": "done",
+            "success": result_status == "SUCCESS",
+            "result_status": result_status,
+            "result_message": result.get("message"),
+            "local_outputs": local_outputs,
+            "elapsed_seconds": round(timer() - start_time, 3),
+        }
+        manifest.write(entry)
+        return "succeeded" if entry["success"] else "failed"
+
     def list_history(
         self,
         cursor_id=None,
@@ -331,7 +479,7 @@ class SOVFixerAPIClient(APIClientBase):
         response = self.get(url, params=parameters)
         raise_for_status(response)
 
-        json = response.json()
+        json = self.decode_json(response)
         for activity in json.get("results", []):
             activity["completed_time"] = datetime.strptime(activity["completed_time"], "%Y-%m-%dT%H:%M:%S.%fZ")
         return json
@@ -404,7 +552,7 @@ class SOVFixerAPIClient(APIClientBase):
         url = self.api_url + "/api/v1/sov/activity"
         response = self.get(url, params=parameters)
         raise_for_status(response)
-        return response.json()
+        return self.decode_json(response)
 
     def update_sov_async_init(
         self,
@@ -440,7 +588,7 @@ class SOVFixerAPIClient(APIClientBase):
 
         raise_for_status(response)
 
-        response_data = response.json()
+        response_data = self.decode_json(response)
         return response_data
 
     def update_sov_async_add_locations(
@@ -475,7 +623,7 @@ class SOVFixerAPIClient(APIClientBase):
 
         raise_for_status(response)
 
-        response_data = response.json()
+        response_data = self.decode_json(response)
         return response_data
 
     def update_sov_async_start(
@@ -514,7 +662,7 @@ class SOVFixerAPIClient(APIClientBase):
 
         raise_for_status(response)
 
-        response_data = response.json()
+        response_data = self.decode_json(response)
         return response_data
 
     def update_sov_async_check_progress(self, sudid) -> t.SOVUpdateResponse:
@@ -524,7 +672,7 @@ class SOVFixerAPIClient(APIClientBase):
         # pprint.pprint(response.json())
         raise_for_status(response)
 
-        response_data = response.json()
+        response_data = self.decode_json(response, t.SOVUpdateResponse)
         return response_data
 
     def update_sov(
@@ -617,6 +765,114 @@ class SOVFixerAPIClient(APIClientBase):
             self.logger.warning(f"* SOV Update failed!  Raw API output:\n{response_data}")
             raise RuntimeError("SOV Update failed.")
 
+    def update_sov_batch(
+        self,
+        updates: Iterable[t.SOVUpdateBatchItem],
+        concurrency: int = 8,
+        *,
+        poll_seconds: float = 2.5,
+        timeout: timedelta | None = None,
+        actually_write: bool = False,
+        output_dir: str | pathlib.Path | None = None,
+        delegate_to_team: UUID | str | int | None = None,
+    ) -> Iterator[t.SOVUpdateBatchResult]:
+        """Run many SOV updates as a pipeline, yielding each result as soon as it finishes.
+
+        The init/add_locations/start calls and output downloads of different updates overlap on a pool of
+        `concurrency` threads, and every started SUD is tracked by one shared Poller instead of a sleep loop per
+        update, so the whole batch takes roughly as long as its slowest update.
+
+        :param updates: One dict per update.  `sovid` and `location_filenames` are required; the remaining keys are
+            passed to update_sov_async_init / update_sov_async_start as in update_sov.
+        :param actually_write: If True, download outputs of successful updates into `output_dir/<sudid>/`.
+        :return: Iterator of results in completion order.  Failures are reported in the result, not raised.
+        """
+        output_dir = pathlib.Path(output_dir or ".")
+
+        def is_done(response_data):
+            return response_data["request"]["status"] not in ("PENDING", "IN_PROGRESS")
+
+        def start(item):
+            return self._update_sov_batch_start(item, delegate_to_team), None
+
+        def finish(item, sudid, response_data):
+            return self._update_sov_batch_finish(item, sudid, response_data, actually_write, output_dir)
+
+        def error_result(item, sudid, e) -> t.SOVUpdateBatchResult:
+            self.logger.warning(f"* SOV Update of {item['sovid']} failed: {e}")
+            return {
+                "sovid": item["sovid"],
+                "sudid": sudid,
+                "success": False,
+                "result_status": None,
+                "result_message": None,
+                "local_outputs": [],
+                "error": str(e),
+            }
+
+        with Poller(
+            self.update_sov_async_check_progress,
+            is_done,
+            poll_seconds=poll_seconds,
+            timeout=timeout,
+            name="update_sov_batch_poller",
+        ) as poller:
+            self.ensure_connection_pool_size(concurrency + poller.max_workers)
+            yield from run_polled_pipeline(
+                updates, start, poller, finish, error_result, concurrency=concurrency, name="update_sov_batch"
+            )
+
+    def _update_sov_batch_start(self, item: t.SOVUpdateBatchItem, delegate_to_team) -> str:
+        delegate_to_team = item.get("delegate_to_team", delegate_to_team)
+        init_response = self.update_sov_async_init(
+            item["sovid"],
+            client_ref=item.get("client_ref"),
+            update_type=item.get("update_type"),
+            callback_url=item.get("callback_url"),
+            delegate_to_team=delegate_to_team,
+        )
+        sudid = init_response["id"]
+        for location_filename in item["location_filenames"]:
+            self.update_sov_async_add_locations(sudid, location_filename, delegate_to_team=delegate_to_team)
+        self.update_sov_async_start(
+            sudid,
+            extra_data=item.get("extra_data"),
+            policy_terms=item.get("policy_terms"),
+            outputter_name=item.get("outputter_name"),
+            output_formats=item.get("output_formats"),
+            metadata=item.get("metadata"),
+            integrations=item.get("integrations"),
+            delegate_to_team=delegate_to_team,
+        )
+        self.logger.info(f"+ Started update {sudid} of {item['sovid']}.")
+        return sudid
+
+    def _update_sov_batch_finish(
+        self, item: t.SOVUpdateBatchItem, sudid: str, response_data: t.SOVUpdateResponse, actually_write, output_dir
+    ) -> t.SOVUpdateBatchResult:
+        result = response_data.get("result", {})
+        result_status = result.get("status")
+        self.logger.info(f"+ Update {sudid} of {item['sovid']} finished with result {result_status}")
+
+        local_outputs = []
+        if result_status == "SUCCESS" and actually_write:
+            sud_output_dir = output_dir / sudid
+            sud_output_dir.mkdir(parents=True, exist_ok=True)
+            for output in result.get("outputs", []):
+                output_path = sud_output_dir / output["filename"]
+                self.fix_sov_download(output, output_path=output_path, actually_write=True)
+                local_outputs.append(str(output_path))
+
+        return {
+            "sovid": item["sovid"],
+            "sudid": sudid,
+            "success": result_status == "SUCCESS",
+            "result_status": result_status,
+            "result_message": result.get("message"),
+            "local_outputs": local_outputs,
+            "error": None,
+        }
+
     def get_or_create_output_async_start(
         self,
         sovid_or_sud: str,
@@ -641,13 +897,13 @@ class SOVFixerAPIClient(APIClientBase):
 
         response = self.post(url, data=data)
         raise_for_status(response)
-        return response.json()
+        return self.decode_json(response)
 
     def get_or_create_output_async_check_progress(self, output_request_id: str):
         url = self.api_url + f"/api/v1/sov/get_or_create_output/{output_request_id}"
         response = self.get(url)
         raise_for_status(response)
-        return response.json()
+        return self.decode_json(response)
 
     def get_or_create_output(
         self,
@@ -695,6 +951,86 @@ class SOVFixerAPIClient(APIClientBase):
 
         self.logger.info(f"+ Finished with result {response_data.get('result',{}).get('status')}")
 
+        return self._output_data_from_response(response_data)
+
+    def get_output_cached(
+        self,
+        sovid_or_sud: str,
+        output_format: str,
+        revision: int = -1,
+        output_path: str | pathlib.Path | None = None,
+        *,
+        cache: OutputCache | None = None,
+        validate: bool = True,
+        overwrite_existing: bool = False,
+        timeout: timedelta | None = timedelta(minutes=5),
+        delegate_to_team: UUID | str | int | None = None,
+    ) -> str:
+        """get_or_create_output + fix_sov_download, served from a local OutputCache when possible.
+
+        With `validate` (the default), the server is still asked for the output's metadata; a cached copy is used if
+        its url matches and, when the server sent an ETag or Last-Modified, a conditional GET returns 304.  With
+        `validate=False` and an explicit `revision`, a cached copy is returned without any API call.
+
+        :param output_path: Where to write the file.  Defaults to the output's scrubbed_filename.
+        :param cache: The cache to use.  Defaults to an OutputCache in ~/.cache/pingintel.
+        :return: The path written.
+        """
+        if cache is None:
+            cache = OutputCache()
+
+        if not validate and revision >= 0 and not overwrite_existing:
+            found = cache.find(sovid_or_sud, revision, output_format)
+            if found:
+                key, entry = found
+                self.logger.info(f"+ Serving {key} from output cache.")
+                scrubbed_filename = key.split("|", 3)[3]
+                return cache.copy_to(entry, output_path or scrubbed_filename)
+
+        output = self.get_or_create_output(
+            sovid_or_sud,
+            output_format,
+            revision,
+            overwrite_existing=overwrite_existing,
+            timeout=timeout,
+            delegate_to_team=delegate_to_team,
+        )
+        if output_path is None:
+            output_path = output["scrubbed_filename"]
+        key = OutputCache.make_key(sovid_or_sud, revision, output_format, output["scrubbed_filename"])
+        entry = None if overwrite_existing else cache.get(key)
+        if entry and entry["url"] != output["url"]:
+            entry = None
+
+        output_url = self._output_url(output["url"])
+        headers = {}
+        if entry:
+            if not (entry["etag"] or entry["last_modified"]):
+                self.logger.info(f"+ Serving {key} from output cache.")
+                return cache.copy_to(entry, output_path)
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        with self.get(output_url, stream=True, headers=headers) as response:
+            if entry and response.status_code == 304:
+                self.logger.info(f"+ Output cache entry {key} is still current.")
+                return cache.copy_to(entry, output_path)
+            raise_for_status(response)
+            self.logger.info(f"  - Streaming {output['label']} output into cache...")
+            cache.put(
+                key,
+                response.iter_content(chunk_size=1024 * 1024),
+                url=output["url"],
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+                output_path=output_path,
+            )
+        return str(output_path)
+
+    @staticmethod
+    def _output_data_from_response(response_data) -> t.OutputData:
         result = response_data.get("result", {})
         if not result:
             raise ValueError(f"Invalid response: {response_data}")
@@ -706,6 +1042,63 @@ class SOVFixerAPIClient(APIClientBase):
         )
         return output
 
+    def get_or_create_output_batch(
+        self,
+        sovids_or_suds: Iterable[str],
+        output_formats: str | Iterable[str],
+        revision: int = -1,
+        overwrite_existing: bool = False,
+        *,
+        concurrency: int = 8,
+        poll_seconds: float = 2.5,
+        timeout: timedelta | None = timedelta(minutes=5),
+        delegate_to_team: UUID | str | int | None = None,
+        download_dir: str | pathlib.Path | None = None,
+        get_or_create_output_async_start_kwargs=None,
+    ) -> Iterator[t.OutputBatchResult]:
+        """Get or create outputs for every (sovid, output_format) pair at once, yielding each as soon as it is ready.
+
+        All output requests are started up front on `concurrency` threads and their `output_request_id`s are tracked
+        together by one shared Poller, so the batch takes about as long as the slowest output rather than the sum.
+        `timeout` applies to each output individually.
+
+        :param download_dir: If set, each finished output is also downloaded to `download_dir/<sovid>/`.
+        :return: Iterator of results in completion order.  Failures are reported in the result, not raised.
+        """
+        if isinstance(output_formats, str):
+            output_formats = [output_formats]
+        output_formats = list(output_formats)
+        pairs = [(sovid, output_format) for sovid in sovids_or_suds for output_format in output_formats]
+
+        def start(sovid_or_sud: str, output_format: str):
+            return self.get_or_create_output_async_start(
+                sovid_or_sud,
+                output_format,
+                revision,
+                overwrite_existing,
+                delegate_to_team,
+                **(get_or_create_output_async_start_kwargs or {}),
+            )
+
+        def download(output: t.OutputData, directory: pathlib.Path):
+            return self.fix_sov_download(
+                output, output_path=directory / output["scrubbed_filename"], actually_write=True
+            )
+
+        return run_output_batch(
+            pairs,
+            "sovid_or_sud",
+            start=start,
+            check_progress=self.get_or_create_output_async_check_progress,
+            output_from_response=self._output_data_from_response,
+            download=download,
+            download_dir=download_dir,
+            ensure_connection_pool_size=self.ensure_connection_pool_size,
+            concurrency=concurrency,
+            poll_seconds=poll_seconds,
+            timeout=timeout,
+        )
+
     def add_building(self, sovid: str, building_data):
         url = self.api_url + f"/api/v1/sov/{sovid}/add_building"
         data = {}
@@ -719,7 +1112,7 @@ class SOVFixerAPIClient(APIClientBase):
 
         raise_for_status(response)
 
-        response_data = response.json()
+        response_data = self.decode_json(response)
         return response_data
 
     def fetch_sov_output(self, sov_id: str, filename: str, output_path: str | None = None) -> bytes:
@@ -750,7 +1143,7 @@ class SOVFixerAPIClient(APIClientBase):
         url = self.api_url + f"/api/v1/sov/history/{id}"
         response = self.get(url)
         raise_for_status(response)
-        return response.json()
+        return self.decode_json(response, t.SOVHistoryResponse)
 
     def get_building(self, item_key: str) -> dict:
         """
@@ -762,7 +1155,43 @@ class SOVFixerAPIClient(APIClientBase):
         url = self.api_url + f"/api/v1/building/{item_key}"
         response = self.get(url)
         raise_for_status(response)
-        return response.json()
+        return self.decode_json(response)
+
+    def get_buildings(self, item_keys: Iterable[str], concurrency: int = 8) -> t.BuildingsBatchResponse:
+        """
+        Retrieve many buildings, up to `concurrency` requests at a time over a shared connection pool.
+
+        :param item_keys: Building identifiers, as for get_building.
+        :return: Dict with "results" (item_key -> building data) and "errors" (item_key -> error message) for any
+            buildings that could not be fetched.
+        """
+        calls = {item_key: (item_key,) for item_key in item_keys}
+        self.ensure_connection_pool_size(concurrency)
+        results, errors = fan_out(self.get_building, calls, concurrency=concurrency, name="get_buildings")
+        self.logger.info(f"+ Fetched {len(results)} buildings, {len(errors)} failed.")
+        return {"results": results, "errors": errors}
+
+    def add_buildings(
+        self,
+        sovid: str,
+        buildings: Mapping[str, dict] | Iterable[dict],
+        concurrency: int = 8,
+    ) -> t.BuildingsBatchResponse:
+        """
+        Add many buildings to a SOV, up to `concurrency` requests at a time.
+
+        :param sovid: The SOV ID.
+        :param buildings: Building data keyed by a caller-chosen key (e.g. the item_key), or a plain list, in which
+            case results are keyed by list position.
+        :return: Dict with "results" (key -> add_building response) and "errors" (key -> error message).
+        """
+        if not isinstance(buildings, Mapping):
+            buildings = {str(idx): building_data for idx, building_data in enumerate(buildings)}
+        calls = {key: (sovid, building_data) for key, building_data in buildings.items()}
+        self.ensure_connection_pool_size(concurrency)
+        results, errors = fan_out(self.add_building, calls, concurrency=concurrency, name="add_buildings")
+        self.logger.info(f"+ Added {len(results)} buildings to {sovid}, {len(errors)} failed.")
+        return {"results": results, "errors": errors}
 
     def list_output_formats(
         self,
@@ -783,7 +1212,7 @@ class SOVFixerAPIClient(APIClientBase):
             params["team_uuid"] = team_uuid
         response = self.get(url, params=params)
         raise_for_status(response)
-        return response.json()
+        return self.decode_json(response)
 
     def get_public_shareable_url(self, sovid: str) -> t.GetPublicShareableUrlResponse:
         """
@@ -795,7 +1224,7 @@ class SOVFixerAPIClient(APIClientBase):
         url = self.api_url + f"/api/v1/pli/policy/{sovid}/get_public_shareable_url"
         response = self.get(url)
         raise_for_status(response)
-        return response.json()
+        return self.decode_json(response, t.GetPublicShareableUrlResponse)
 
     def create_submission(
         self,
@@ -824,4 +1253,4 @@ class SOVFixerAPIClient(APIClientBase):
             data["filename"] = filename
         response = self.post(url, data=data)
         raise_for_status(response)
-        return response.json()
+        return self.decode_json(response)
@@ -34,11 +34,11 @@ class SOV_RESULT_STATUS(enum.StrEnum):
 class FixSOVResponseRequest(TypedDict):
     status: SOV_STATUS | str
     requested_at: str
-    progress_started_at: str
+    progress_started_at: str | None
     completed_at: str | None
-    last_health_check_time: str
-    last_health_status: str
-    pct_complete: int
+    last_health_check_time: str | None
+    last_health_status: str | None
+    pct_complete: int | None
 
 
 class FixSOVResponseResultInput(TypedDict):
@@ -78,6 +78,31 @@ class FixSOVProcessResponse(TypedDict):
     local_outputs: list[str] | None
 
 
+class FixSOVBatchManifestEntry(TypedDict):
+    """One line of the fix_sov_batch JSONL manifest."""
+
+    path: str
+    id: str | None
+    state: Literal["started", "done", "error"]
+    success: NotRequired[bool]
+    result_status: NotRequired[SOV_RESULT_STATUS | str | None]
+    result_message: NotRequired[str | None]
+    local_outputs: NotRequired[list[str]]
+    error: NotRequired[str]
+    elapsed_seconds: NotRequired[float]
+
+
+class FixSOVBatchSummary(TypedDict):
+    total: int
+    succeeded: int
+    failed: int
+    errored: int
+    skipped: int
+    elapsed_seconds: float
+    per_minute: float
+    manifest_path: str
+
+
 class SOVUpdateInitiateRequest(TypedDict):
     client_ref: NotRequired[str | None]
     update_type: NotRequired[str | None]
@@ -116,6 +141,33 @@ class SOVUpdateResponse(TypedDict):
     result: NotRequired[SOVUpdateResponseResult]
 
 
+class SOVUpdateBatchItem(TypedDict):
+    """One update for update_sov_batch."""
+
+    sovid: str
+    location_filenames: list[str]
+    client_ref: NotRequired[str | None]
+    update_type: NotRequired[str | None]
+    callback_url: NotRequired[str | None]
+    extra_data: NotRequired[dict[str, Any] | None]
+    policy_terms: NotRequired[Any]
+    outputter_name: NotRequired[str | None]
+    output_formats: NotRequired[list[str] | None]
+    metadata: NotRequired[dict[str, Any] | None]
+    integrations: NotRequired[list[str] | None]
+    delegate_to_team: NotRequired[str | int | None]
+
+
+class SOVUpdateBatchResult(TypedDict):
+    sovid: str
+    sudid: str | None
+    success: bool
+    result_status: str | None
+    result_message: str | None
+    local_outputs: list[str]
+    error: str | None
+
+
 class SOVUpdateAsyncAPIInitResponse(TypedDict):
     id: str
     message: str
@@ -140,6 +192,16 @@ class OutputData(TypedDict):
     url: str
 
 
+class OutputBatchResult(TypedDict):
+    sovid_or_sud: str
+    output_format: str
+    output_request_id: str | None
+    success: bool
+    output: OutputData | None
+    local_path: str | None
+    error: str | None
+
+
 class UpdateData(TypedDict):
     sovid: int
     sudid: int
@@ -255,6 +317,11 @@ class GetPublicShareableUrlResponse(TypedDict):
     url: str
 
 
+class BuildingsBatchResponse(TypedDict):
+    results: dict[str, dict]
+    errors: dict[str, str]
+
+
 class OutputFormatItem(TypedDict):
     output_format: str
     label: str
@@ -2,20 +2,22 @@
 
 # Copyright 2021-2024 Ping Data Intelligence
 
-from datetime import datetime
+from datetime import datetime, timedelta
 import json
 import logging
 import pathlib
 import pprint
 import time
 from timeit import default_timer as timer
-from typing import Literal
+from typing import TYPE_CHECKING, Literal
 
 import click
 
-from pingintel_api import SOVFixerAPIClient
-from pingintel_api.api_client_base import AuthTokenNotFound
-from pingintel_api.utils import set_verbosity
+from pingintel_api.sov_fixer.output_cache import OutputCache
+from pingintel_api.utils import make_client, set_verbosity
+
+if TYPE_CHECKING:
+    from pingintel_api.sov_fixer.sov_fixer_api_client import SOVFixerAPIClient
 
 logger = logging.getLogger(__name__)
 
@@ -67,12 +69,16 @@ def cli(ctx, environment, api_url, auth_token, verbose):
     set_verbosity(verbose)
 
 
-def get_client(ctx) -> SOVFixerAPIClient:
+def get_client(ctx) -> "SOVFixerAPIClient":
+    # imported here rather than at the top so `--help` doesn't have to load requests and the client.
+    from pingintel_api.api_client_base import AuthTokenNotFound
+    from pingintel_api.sov_fixer.sov_fixer_api_client import SOVFixerAPIClient
+
     environment = ctx.obj["environment"]
     auth_token = ctx.obj["auth_token"]
     api_url = ctx.obj["api_url"]
     try:
-        client = SOVFixerAPIClient(environment=environment, auth_token=auth_token, api_url=api_url)
+        client = make_client(ctx, SOVFixerAPIClient, environment=environment, auth_token=auth_token, api_url=api_url)
     except AuthTokenNotFound as e:
         click.echo(e)
         raise click.Abort()
@@ -237,6 +243,144 @@ def fix(
             click.echo(f"  Wrote: {output}")
 
 
+@cli.command()
+@click.pass_context
+@click.argument("path", nargs=-1, required=True, type=click.Path(exists=True, path_type=pathlib.Path))
+@click.option(
+    "-j",
+    "--concurrency",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help="Maximum number of SOVs in flight at once.",
+)
+@click.option(
+    "--output-dir",
+    type=click.Path(file_okay=False, path_type=pathlib.Path),
+    default=".",
+    help="Directory to write outputs to, one subdirectory per SOV ID.",
+)
+@click.option(
+    "--manifest",
+    type=click.Path(dir_okay=False, path_type=pathlib.Path),
+    help="JSONL manifest of results. Re-run with the same manifest to resume. Defaults to OUTPUT_DIR/fix-batch-manifest.jsonl.",
+)
+@click.option(
+    "-d",
+    "--document-type",
+    type=click.Choice(["SOV", "PREM_BDX", "CLAIM_BDX", "SOV_BDX", "ACORD", "LOSS_RUN"], case_sensitive=False),
+    default="SOV",
+    help="Identify document type of every file.  Defaults to SOV.",
+)
+@click.option(
+    "-I",
+    "--integrations",
+    multiple=True,
+    metavar="INTEGRATION_ABBR",
+    help="Request one or more integrations.",
+)
+@click.option(
+    "-o",
+    "--output-format",
+    multiple=True,
+    metavar="OUTPUT_FORMAT",
+    help="Select one or more output formats.",
+)
+@click.option(
+    "--client-ref", help="Arbitrary text, representing a client reference number or other identifier.", metavar="TEXT"
+)
+@click.option(
+    "-E",
+    "--extra_data",
+    help="Extra data to include in each request, in the form key=value. Can be specified multiple times.",
+    metavar="KEY=VALUE",
+    multiple=True,
+    callback=_attributes_to_dict,
+)
+@click.option(
+    "--write/--no-write",
+    is_flag=True,
+    default=True,
+    help="(default) Actually write the output. If disabled, download but do not persist the result to disk.",
+)
+@click.option(
+    "-W",
+    "--workflow",
+    help="If set, specifies the workflow to use for processing. Defaults to the organization's default workflow.",
+)
+@click.option(
+    "-D",
+    "--delegate-to-team",
+    metavar="Team UUID",
+    help="Delegate to another team. Provide the 'uuid' of the desired delegatee.  Requires the `delegate` permission.",
+)
+@click.option(
+    "--no-ping-data-api",
+    is_flag=True,
+    default=False,
+    help="If set, do not allow ping data api calls.",
+)
+@click.option(
+    "--timeout",
+    type=float,
+    default=None,
+    help="Optional. Maximum time in seconds to wait for each file to finish processing.",
+)
+def fix_batch(
+    ctx,
+    path,
+    concurrency,
+    output_dir,
+    manifest,
+    document_type,
+    integrations,
+    output_format,
+    client_ref,
+    extra_data,
+    write,
+    workflow,
+    delegate_to_team,
+    no_ping_data_api,
+    timeout,
+):
+    """Extract many files as independent requests.  PATH may be files or directories (every file directly inside
+    a directory is submitted)."""
+    filenames = []
+    for p in path:
+        if p.is_dir():
+            filenames.extend(sorted(str(f) for f in p.iterdir() if f.is_file() and not f.name.startswith(".")))
+        else:
+            filenames.append(str(p))
+
+    if manifest is None:
+        manifest = output_dir / "fix-batch-manifest.jsonl"
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    client = get_client(ctx)
+    summary = client.fix_sov_batch(
+        filenames,
+        concurrency,
+        output_dir=output_dir,
+        manifest_path=manifest,
+        actually_write=write,
+        document_type=document_type,
+        output_formats=output_format,
+        integrations=integrations,
+        client_ref=client_ref,
+        extra_data=extra_data,
+        delegate_to_team=delegate_to_team,
+        allow_ping_data_api=not no_ping_data_api,
+        workflow=workflow,
+        timeout=timedelta(seconds=timeout) if timeout else None,
+    )
+    click.echo(
+        f"Processed {summary['total']} files in {summary['elapsed_seconds']:.1f}s ({summary['per_minute']:.1f} SOVs/min): "
+        f"{summary['succeeded']} succeeded, {summary['failed']} failed, {summary['errored']} errored, "
+        f"{summary['skipped']} skipped."
+    )
+    click.echo(f"Manifest: {summary['manifest_path']}")
+
+
 @cli.command()
 @click.pass_context
 @click.argument("sovid")
@@ -395,9 +539,26 @@ def activity(
     metavar="Team UUID",
     help="Delegate to another team. Provide the 'uuid' of the desired delegatee.  Requires the `delegate` permission.",
 )
-def get_output(ctx, sovid_or_sudid, output_format, write, revision, overwrite_existing, delegate_to_team):
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False, path_type=pathlib.Path),
+    help="Serve repeat requests for the same SOV revision and format from this local cache directory.",
+)
+def get_output(ctx, sovid_or_sudid, output_format, write, revision, overwrite_existing, delegate_to_team, cache_dir):
     """Fetch or generate an output from a previous extraction."""
     client = get_client(ctx)
+    if cache_dir and write:
+        ret = client.get_output_cached(
+            sovid_or_sudid,
+            output_format,
+            revision,
+            cache=OutputCache(cache_dir),
+            overwrite_existing=overwrite_existing,
+            delegate_to_team=delegate_to_team,
+        )
+        click.echo(f"Downloaded: {ret}")
+        return
+
     output_data = client.get_or_create_output(
         sovid_or_sudid,
         output_format,
@@ -0,0 +1,367 @@
+# Copyright 2021-2024 Ping Data Intelligence
+
+import collections.abc
+import datetime
+import enum
+import keyword
+import threading
+import types
+import typing
+from typing import Any, Callable, Literal, Self, Union
+
+# names a field can't have as a slot, since the struct needs them for its dict-style interface.
+RESERVED_NAMES = frozenset(["get", "items", "keys", "values", "to_dict", "_extra"])
+
+
+class SchemaMismatchError(ValueError):
+    """A response didn't match the TypedDict it was decoded as.  `path` locates the offending value, e.g.
+    `results[3].documents[0].id`."""
+
+    def __init__(self, message: str, path: str = ""):
+        self.message = message
+        self.path = path
+        super().__init__(f"{path}: {message}" if path else message)
+
+    def prefixed(self, part: str) -> "SchemaMismatchError":
+        path = part + self.path if self.path.startswith("[") or not self.path else f"{part}.{self.path}"
+        return SchemaMismatchError(self.message, path)
+
+
+class Struct:
+    """Base class of the slotted classes generated by struct_type().
+
+    Attribute access (`submission.workflow_status_name`) is the fast path, but structs also behave like the
+    dicts they replace -- `s["id"]`, `s.get("claimed_by")`, `"result" in s`, `dict(s)`, keys()/items() -- so code
+    written against the TypedDicts keeps working.  NotRequired fields that were absent from the response are
+    absent from the struct too.  Fields the TypedDict doesn't declare are kept in `_extra` (unless decoding with
+    strict=True, which rejects them).
+    """
+
+    __slots__ = ("_extra",)
+    __typeddict__: type
+    __fields__: tuple[str, ...] = ()
+
+    def __init__(self, **fields):
+        self._extra = None
+        for name, value in fields.items():
+            self[name] = value
+
+    def __getattr__(self, name):
+        # only called when the slot is empty or the name isn't a slot.
+        extra = object.__getattribute__(self, "_extra")
+        if extra is not None and name in extra:
+            return extra[name]
+        raise AttributeError(f"{type(self).__name__!r} has no field {name!r}")
+
+    def __getitem__(self, key: str):
+        if key in self.__slots__ and key != "_extra":
+            try:
+                return object.__getattribute__(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value):
+        if key in self.__slots__ and key != "_extra":
+            object.__setattr__(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __contains__(self, key: str):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> list[str]:
+        keys = [name for name in self.__slots__ if hasattr(self, name)]
+        if self._extra:
+            keys.extend(self._extra)
+        return keys
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def values(self) -> list:
+        return [self[key] for key in self.keys()]
+
+    def items(self) -> list[tuple[str, Any]]:
+        return [(key, self[key]) for key in self.keys()]
+
+    def __eq__(self, other):
+        if isinstance(other, Struct):
+            return type(self) is type(other) and self.items() == other.items()
+        return NotImplemented
+
+    def __repr__(self):
+        fields = ", ".join(f"{key}={value!r}" for key, value in self.items())
+        return f"{type(self).__name__}({fields})"
+
+    def to_dict(self) -> dict:
+        """Plain dicts and lists all the way down (enum and datetime values are kept as they are)."""
+        return {key: _to_plain(value) for key, value in self.items()}
+
+
+def _to_plain(value):
+    if isinstance(value, Struct):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_to_plain(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _to_plain(item) for key, item in value.items()}
+    return value
+
+
+def to_builtins(value):
+    """`default=` hook for json.dumps that serializes structs (and the datetimes they may contain)."""
+    if isinstance(value, Struct):
+        return value.to_dict()
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+_lock = threading.RLock()
+_struct_types: dict[type, type[Struct]] = {}
+_converters: dict[tuple, Callable] = {}
+
+
+def is_typeddict(tp) -> bool:
+    return isinstance(tp, type) and issubclass(tp, dict) and hasattr(tp, "__required_keys__")
+
+
+def struct_type(typeddict: type) -> type[Struct]:
+    """The slotted Struct class generated for `typeddict` (created once, then cached)."""
+    with _lock:
+        struct_cls = _struct_types.get(typeddict)
+        if struct_cls is None:
+            fields = tuple(typeddict.__annotations__)
+            slots = tuple(name for name in fields if name.isidentifier() and not keyword.iskeyword(name))
+            slots = tuple(name for name in slots if name not in RESERVED_NAMES and not name.startswith("__"))
+            struct_cls = type(
+                typeddict.__name__,
+                (Struct,),
+                {
+                    "__slots__": slots,
+                    "__fields__": fields,
+                    "__typeddict__": typeddict,
+                    "__module__": typeddict.__module__,
+                    "__qualname__": f"{typeddict.__qualname__}Struct",
+                },
+            )
+            _struct_types[typeddict] = struct_cls
+        return struct_cls
+
+
+def to_struct(data, tp, strict: bool = False):
+    """Convert decoded JSON `data` into `tp` -- a TypedDict (giving a Struct) or any annotation built from them
+    (`list[SomeTypedDict]`, `SomeTypedDict | None`, ...) -- validating it on the way.
+
+    Values are checked against the annotations: required fields must be present, str/int/float/bool/None,
+    Literal and enum values must match (enum fields are converted to the enum), datetime fields are parsed from
+    ISO 8601 strings, and nested TypedDicts become Structs.  Any mismatch raises SchemaMismatchError.  Fields
+    the TypedDict doesn't declare are kept, unless `strict`, in which case they are a mismatch too.
+    """
+    return _converter(tp, strict)(data)
+
+
+def _converter(tp, strict: bool, owner: type | None = None) -> Callable:
+    if tp is Self and owner is not None:
+        tp = owner
+    key = (tp, strict, None if is_typeddict(tp) else owner)
+    with _lock:
+        converter = _converters.get(key)
+        if converter is None:
+            if is_typeddict(tp):
+                # register a trampoline first, so recursive TypedDicts resolve to the converter being built.
+                built = []
+                _converters[key] = lambda value: built[0](value)
+                converter = _typeddict_converter(tp, strict)
+                built.append(converter)
+            else:
+                converter = _build_converter(tp, strict, owner)
+            _converters[key] = converter
+        return converter
+
+
+def _build_converter(tp, strict: bool, owner: type | None) -> Callable:
+    if tp is Any or tp is object or isinstance(tp, (typing.TypeVar, str, typing.ForwardRef)):
+        return lambda value: value
+    if tp is None or tp is type(None):
+        return _check(lambda value: value is None, "null")
+    if tp is bool:
+        return _check(lambda value: isinstance(value, bool), "a boolean")
+    if tp is int:
+        return _check(lambda value: isinstance(value, int) and not isinstance(value, bool), "an integer")
+    if tp is float:
+        return _check(lambda value: isinstance(value, (int, float)) and not isinstance(value, bool), "a number")
+    if tp is str:
+        return _check(lambda value: isinstance(value, str), "a string")
+    if tp in (datetime.datetime, datetime.date):
+        return _datetime_converter(tp)
+    if isinstance(tp, type) and issubclass(tp, enum.Enum):
+        return _enum_converter(tp)
+
+    origin = typing.get_origin(tp)
+    args = typing.get_args(tp)
+    if origin is Literal:
+        allowed = set(args)
+        return _check(lambda value: value in allowed, f"one of {sorted(map(repr, allowed))}")
+    if origin in (Union, types.UnionType):
+        nullable = type(None) in args
+        converters = [_converter(arg, strict, owner) for arg in args if arg is not type(None)]
+        return _union_converter(converters, nullable, tp)
+    if origin in (list, tuple, collections.abc.Sequence) or tp in (list, tuple):
+        # JSON arrays come back as lists; tuples are checked against their first item type.
+        return _list_converter(_converter(args[0] if args else Any, strict, owner))
+    if origin is dict or tp is dict:
+        value_converter = _converter(args[1], strict, owner) if len(args) == 2 else None
+        return _dict_converter(value_converter)
+    # anything else we don't know how to check.
+    return lambda value: value
+
+
+def _check(test: Callable[[Any], bool], expected: str) -> Callable:
+    def convert(value):
+        if not test(value):
+            raise SchemaMismatchError(f"expected {expected}, got {value!r}")
+        return value
+
+    return convert
+
+
+def _datetime_converter(tp) -> Callable:
+    def convert(value):
+        if isinstance(value, tp):
+            return value
+        if isinstance(value, str):
+            try:
+                return tp.fromisoformat(value)
+            except ValueError:
+                pass
+        raise SchemaMismatchError(f"expected an ISO 8601 {tp.__name__}, got {value!r}")
+
+    return convert
+
+
+def _enum_converter(tp) -> Callable:
+    def convert(value):
+        try:
+            return tp(value)
+        except ValueError:
+            raise SchemaMismatchError(f"expected a {tp.__name__} value, got {value!r}") from None
+
+    return convert
+
+
+def _union_converter(converters: list[Callable], nullable: bool, tp) -> Callable:
+    if len(converters) == 1:
+        (converter,) = converters
+
+        def convert_optional(value):
+            if value is None and nullable:
+                return None
+            return converter(value)
+
+        return convert_optional
+
+    def convert(value):
+        if value is None and nullable:
+            return None
+        for converter in converters:
+            try:
+                return converter(value)
+            except SchemaMismatchError:
+                continue
+        raise SchemaMismatchError(f"expected {tp}, got {value!r}")
+
+    return convert
+
+
+def _list_converter(item_converter: Callable) -> Callable:
+    def convert(value):
+        if not isinstance(value, list):
+            raise SchemaMismatchError(f"expected a list, got {value!r}")
+        result = []
+        for i, item in enumerate(value):
+            try:
+                result.append(item_converter(item))
+            except SchemaMismatchError as e:
+                raise e.prefixed(f"[{i}]") from None
+        return result
+
+    return convert
+
+
+def _dict_converter(value_converter: Callable | None) -> Callable:
+    def convert(value):
+        if not isinstance(value, dict):
+            raise SchemaMismatchError(f"expected an object, got {value!r}")
+        if value_converter is None:
+            return value
+        result = {}
+        for key, item in value.items():
+            try:
+                result[key] = value_converter(item)
+            except SchemaMismatchError as e:
+                raise e.prefixed(f"[{key!r}]") from None
+        return result
+
+    return convert
+
+
+def _typeddict_converter(typeddict: type, strict: bool) -> Callable:
+    struct_cls = struct_type(typeddict)
+    try:
+        hints = typing.get_type_hints(typeddict)
+    except Exception:
+        # unresolvable forward references; check presence but not types.
+        hints = dict.fromkeys(typeddict.__annotations__, Any)
+    field_converters = {name: _converter(hint, strict, typeddict) for name, hint in hints.items()}
+    required = frozenset(typeddict.__required_keys__)
+    slots = frozenset(struct_cls.__slots__)
+    new = object.__new__
+    set_slot = object.__setattr__
+
+    def convert(value):
+        if not isinstance(value, dict):
+            raise SchemaMismatchError(f"expected a {typeddict.__name__} object, got {value!r}")
+        missing = required.difference(value)
+        if missing:
+            raise SchemaMismatchError(f"{typeddict.__name__} is missing {', '.join(sorted(missing))}")
+        obj = new(struct_cls)
+        extra = None
+        for key, item in value.items():
+            field_converter = field_converters.get(key)
+            if field_converter is None:
+                if strict:
+                    raise SchemaMismatchError(f"unexpected field in {typeddict.__name__}", key)
+            else:
+                try:
+                    item = field_converter(item)
+                except SchemaMismatchError as e:
+                    raise e.prefixed(key) from None
+            if key in slots:
+                set_slot(obj, key, item)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = item
+        set_slot(obj, "_extra", extra)
+        return obj
+
+    return convert
@@ -1,24 +1,40 @@
+import hashlib
 import time, logging
 from timeit import default_timer as timer
-from typing import Literal
+from typing import TYPE_CHECKING, Literal
 
 import click
-import requests
-from requests.exceptions import HTTPError
+
+if TYPE_CHECKING:
+    import requests
 
 logger = logging.getLogger(__name__)
 
 
-def raise_for_status(response: requests.Response):
+def raise_for_status(response: "requests.Response"):
     if response.ok:
         return
 
+    # requests is only imported when needed, so the command line tools start quickly.
+    from requests.exceptions import HTTPError
+
     error_msg = response.text
     logger.error(f"{response.status_code} {response.reason}: {error_msg}")
 
     raise HTTPError(error_msg, response=response)
 
 
+def is_transient_error(e: BaseException) -> bool:
+    """True for failures that may go away if retried: connection errors, timeouts, and 429/5xx responses.  Other
+    errors (4xx validation errors, bad responses, bugs) will fail the same way again."""
+    from requests.exceptions import ConnectionError, HTTPError, Timeout
+
+    if isinstance(e, HTTPError):
+        status_code = e.response.status_code if e.response is not None else None
+        return status_code is not None and (status_code == 429 or status_code >= 500)
+    return isinstance(e, (ConnectionError, Timeout))
+
+
 def is_fileobj(source):
     return hasattr(source, "read")
 
@@ -62,6 +78,15 @@ def set_verbosity(verbose: Literal[-1, 0, 1, 2, 3]):
             logging.getLogger(logname).setLevel(logging.WARNING)
 
 
+def make_client(ctx: click.Context, client_cls, **kwargs):
+    """`client_cls(**kwargs)` for a command line tool -- or, when the command is being run by pingintel-daemon, the
+    warm client it kept from an earlier command that resolved to the same api url and auth token."""
+    clients = (ctx.obj or {}).get("clients")
+    if clients is None:
+        return client_cls(**kwargs)
+    return clients.get(client_cls, **kwargs)
+
+
 def censor(s, max=6):
     if not s:
         return s
@@ -69,6 +94,11 @@ def censor(s, max=6):
     return s[:max] + "*" * (len(s) - max)
 
 
+def token_fingerprint(auth_token: str) -> str:
+    """A short, non-reversible identifier for an auth token, for keeping cached data of different users apart."""
+    return hashlib.sha256(auth_token.encode("utf-8")).hexdigest()[:16]
+
+
 def pretty_filesize(size_bytes):
     for unit in ["", "Ki", "Mi", "Gi", "Ti", "Pi", "Ei", "Zi"]:
         if abs(size_bytes) < 1024.0:
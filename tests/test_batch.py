@@ -0,0 +1,35 @@
+from pingintel_api.batch import BatchManifest, BatchStats, fan_out
+
+
+def test_manifest_last_entry_wins_and_survives_reopen(tmp_path):
+    path = tmp_path / "manifest.jsonl"
+    manifest = BatchManifest(path)
+    manifest.write({"path": "a", "state": "started"})
+    manifest.write({"path": "a", "state": "done"})
+    manifest.write({"path": "b", "state": "started"})
+    with open(path, "a") as fd:
+        fd.write('{"path": "c", "sta')
+
+    reopened = BatchManifest(path)
+    assert reopened.is_done("a")
+    assert not reopened.is_done("b")
+    assert reopened.get("c") is None
+
+
+def test_fan_out_isolates_failures():
+    def fn(x):
+        if x == 2:
+            raise ValueError("bad")
+        return x * 10
+
+    results, errors = fan_out(fn, {i: (i,) for i in range(4)}, concurrency=2)
+    assert results == {0: 0, 1: 10, 3: 30}
+    assert errors == {2: "bad"}
+
+
+def test_stats_summary_counts_outcomes():
+    stats = BatchStats(3)
+    for outcome in ("succeeded", "errored", "skipped"):
+        stats.record(outcome)
+    summary = stats.summary()
+    assert (summary["succeeded"], summary["errored"], summary["skipped"], summary["total"]) == (1, 1, 1, 3)
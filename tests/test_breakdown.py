@@ -0,0 +1,77 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from pingintel_api.pingmaps.breakdown import LocationBreakdown
+
+LOCATIONS = [
+    {"fema_flood_zone": "AE", "wind_tier": "1", "const__bldg_year_built": 1950, "tiv": 100.0},
+    {"fema_flood_zone": "AE", "wind_tier": "2", "const__bldg_year_built": 2015, "tiv": 50.0},
+    {"fema_flood_zone": "X", "wind_tier": "1", "const__bldg_year_built": None, "tiv": "25"},
+    {"fema_flood_zone": None, "wind_tier": "1", "const__bldg_year_built": 1800, "tiv": None},
+]
+
+
+@pytest.fixture
+def breakdown():
+    return LocationBreakdown(LOCATIONS)
+
+
+def test_breakdown_by_value_largest_tiv_first(breakdown):
+    assert breakdown.breakdown("fema_flood_zone") == [
+        {"value": "AE", "count": 2, "tiv": 150.0},
+        {"value": "X", "count": 1, "tiv": 25.0},
+        {"value": None, "count": 1, "tiv": 0.0},
+    ]
+
+
+def test_breakdown_of_numeric_field_uses_bands(breakdown):
+    rows = {row["value"]: (row["count"], row["tiv"]) for row in breakdown.breakdown("const__bldg_year_built")}
+    assert rows == {"1940-1970": (1, 100.0), ">=2010": (1, 50.0), None: (1, 25.0), "<1900": (1, 0.0)}
+
+
+def test_filters_and_totals(breakdown):
+    assert breakdown.breakdowns(["fema_flood_zone"], wind_tier="1") == {
+        "fema_flood_zone": [
+            {"value": "AE", "count": 1, "tiv": 100.0},
+            {"value": "X", "count": 1, "tiv": 25.0},
+            {"value": None, "count": 1, "tiv": 0.0},
+        ]
+    }
+    assert breakdown.totals() == {"value": None, "count": 4, "tiv": 175.0}
+    assert breakdown.totals(wind_tier="2") == {"value": None, "count": 1, "tiv": 50.0}
+
+
+def test_accepts_get_policy_breakdown_kwargs(breakdown):
+    request = {
+        "sovid": "s-1",
+        "lat1": 29.0,
+        "lat2": 30.0,
+        "limit": 1000,
+        "fields": ["const__bldg_year_built"],
+        "const__bldg_year_built__bins": "1900,2000",
+        "fema_flood_zone": "AE",
+    }
+    assert breakdown.breakdowns(request.pop("fields"), **request) == {
+        "const__bldg_year_built": [
+            {"value": "1900-2000", "count": 1, "tiv": 100.0},
+            {"value": ">=2000", "count": 1, "tiv": 50.0},
+        ]
+    }
+    assert breakdown.totals(**request)["count"] == 2
+
+
+def test_equality_filters_match_across_types():
+    breakdown = LocationBreakdown(
+        [
+            {"occupancy__code_air": 301, "wind_tier": "1", "tiv": 1.0},
+            {"occupancy__code_air": "301", "wind_tier": 2, "tiv": 2.0},
+            {"occupancy__code_air": 302, "wind_tier": None, "tiv": 4.0},
+        ]
+    )
+    assert breakdown.totals(occupancy__code_air="301")["tiv"] == 3.0
+    assert breakdown.totals(occupancy__code_air=301)["tiv"] == 3.0
+    assert breakdown.totals(wind_tier=1)["tiv"] == 1.0
+    assert breakdown.totals(wind_tier="2")["tiv"] == 2.0
+    with pytest.raises(ValueError):
+        breakdown.totals(not_a_filter="x")
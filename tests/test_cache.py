@@ -0,0 +1,109 @@
+import json
+import threading
+import time
+from unittest import mock
+
+from pingintel_api.cache import SingleFlight, TTLCache
+
+
+def test_get_fresh_and_stale():
+    cache = TTLCache(ttl=60)
+    cache.set("a", {"x": 1}, etag='"v1"')
+    assert cache.get("a") == {"x": 1}
+    cache.entries["a"]["expires_at"] = time.time() - 1
+    assert cache.get("a") is None
+    assert cache.get_entry("a")["etag"] == '"v1"'  # kept for revalidation
+    cache.touch("a")
+    assert cache.get("a") == {"x": 1}
+
+
+def test_evicts_stale_then_least_recently_used():
+    cache = TTLCache(ttl=60, max_entries=3)
+    for key in "abc":
+        cache.set(key, key)
+    cache.entries["b"]["expires_at"] = time.time() - 1
+    cache.get_entry("a")  # a is now more recently used than c
+    cache.set("d", "d")
+    assert list(cache.entries) == ["c", "a", "d"]
+    cache.set("e", "e")
+    assert list(cache.entries) == ["a", "d", "e"]
+
+
+def test_persistence_is_batched(tmp_path):
+    path = tmp_path / "cache.json"
+    cache = TTLCache(ttl=60, path=path, save_interval=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.touch("a")
+    assert list(json.loads(path.read_text())) == ["a"]
+    cache.flush()
+    assert set(json.loads(path.read_text())) == {"a", "b"}
+    assert TTLCache(ttl=60, path=path).get("b") == 2
+
+
+def test_single_flight_coalesces():
+    calls = []
+    release = threading.Event()
+    single_flight = SingleFlight()
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(single_flight.do("k", fetch))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert results == ["value"] * 5
+    assert len(calls) == 1
+
+
+def test_get_json_cached_returns_copies():
+    from pingintel_api import PingMapsAPIClient
+
+    client = PingMapsAPIClient(api_url="https://x", auth_token="t")
+    client.use_cache()
+    response = mock.Mock(status_code=200, ok=True, content=b'{"teams": [1, 2]}', headers={})
+    with mock.patch.object(client.session, "get", return_value=response) as get:
+        first = client.get_settings()
+        first["teams"].append(3)
+        second = client.get_settings()
+    assert second == {"teams": [1, 2]}
+    assert get.call_count == 1
+
+
+def test_get_json_cached_keeps_users_apart(tmp_path):
+    from pingintel_api import PingVisionAPIClient
+
+    path = tmp_path / "metadata.json"
+    responses = {"Token alice": b'{"teams": ["a"]}', "Token bob": b'{"teams": ["b"]}'}
+    for token in ("alice", "bob"):
+        client = PingVisionAPIClient(api_url="https://x", auth_token=token)
+        cache = client.use_metadata_cache(path=path)
+        response = mock.Mock(status_code=200, ok=True, content=responses[f"Token {token}"], headers={})
+        with mock.patch.object(client.session, "get", return_value=response):
+            assert client.get_json_cached("https://x/api/v1/teams", cache=cache) == {"teams": [token[0]]}
+        cache.flush()
+    assert len(json.loads(path.read_text())) == 2
+    assert not any("alice" in key or "bob" in key for key in json.loads(path.read_text()))
+
+
+def test_pingmaps_cache_files_are_per_user(tmp_path):
+    from pingintel_api import PingMapsAPIClient
+
+    for token in ("alice", "bob"):
+        client = PingMapsAPIClient(api_url="https://x", auth_token=token)
+        client.use_cache(cache_dir=tmp_path)
+        response = mock.Mock(status_code=200, ok=True, content=json.dumps({"user": token}).encode(), headers={})
+        with mock.patch.object(client.session, "get", return_value=response):
+            assert client.get_settings() == {"user": token}
+        client.settings_cache.flush()
+
+    settings_files = sorted(tmp_path.glob("settings-*.json"))
+    assert len(settings_files) == 2
+    assert not any("alice" in path.name or "bob" in path.name for path in settings_files)
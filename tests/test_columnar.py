@@ -0,0 +1,60 @@
+import pytest
+
+from pingintel_api.columnar import ColumnarRecords
+
+RECORDS = [
+    {"id": 1, "value": 1.5, "flag": True, "zone": "AE"},
+    {"id": 2, "value": None, "flag": None, "zone": "X"},
+    {"id": None, "value": 3.0, "flag": False, "zone": "AE", "late": "yes"},
+]
+
+
+def test_round_trip():
+    records = ColumnarRecords.from_records(RECORDS)
+    assert len(records) == 3
+    assert records.columns == ["id", "value", "flag", "zone", "late"]
+    assert records[0] == {**RECORDS[0], "late": None}
+    assert records[-1] == RECORDS[2]
+    assert records[1]["value"] is None
+    assert records.column("zone") == ["AE", "X", "AE"]
+    assert records.column("late") == [None, None, "yes"]
+
+
+def test_mixed_values_fall_back_to_object():
+    records = ColumnarRecords.from_records([{"a": 1}, {"a": 2.5}, {"a": "three"}])
+    assert records.column("a") == [1.0, 2.5, "three"]
+
+
+def test_only_known_columns():
+    records = ColumnarRecords.from_records(RECORDS, columns=["id", "zone"])
+    assert records.columns == ["id", "zone"]
+
+
+def test_numpy_export_freezes_unless_copied():
+    np = pytest.importorskip("numpy")
+    records = ColumnarRecords.from_records([{"x": 1.0}, {"x": 2.0}])
+    copied = records.to_numpy("x", copy=True)
+    records.append({"x": 3.0})
+    assert copied.tolist() == [1.0, 2.0]
+
+    view = records.to_numpy("x")
+    assert records.frozen
+    with pytest.raises(BufferError):
+        records.append({"x": 4.0})
+    assert np.shares_memory(view, records.to_numpy("x"))
+    assert len(records) == 3
+
+
+def test_to_pandas():
+    pd = pytest.importorskip("pandas")
+    df = ColumnarRecords.from_records(RECORDS).to_pandas(copy=True)
+    assert isinstance(df["zone"].dtype, pd.CategoricalDtype)
+    assert str(df["id"].dtype) == "Int64"
+    assert df["id"].isna().tolist() == [False, False, True]
+
+
+def test_to_arrow():
+    pytest.importorskip("pyarrow")
+    table = ColumnarRecords.from_records(RECORDS).to_arrow()
+    assert table.column("zone").to_pylist() == ["AE", "X", "AE"]
+    assert table.column("id").to_pylist() == [1, 2, None]
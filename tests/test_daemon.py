@@ -0,0 +1,32 @@
+import os
+from unittest import mock
+
+from pingintel_api.daemon import ClientRegistry, _caller_environ
+from pingintel_api.json_codec import get_json_codec
+
+
+class FakeClient:
+    def __init__(self, api_url, auth_token=None):
+        self.api_url = api_url
+        self.auth_token = auth_token or os.environ["FAKE_AUTH_TOKEN"]
+        self.json_codec = get_json_codec()
+        self.session = mock.Mock()
+
+
+def test_registry_keys_on_resolved_token():
+    registry = ClientRegistry()
+    with _caller_environ({"FAKE_AUTH_TOKEN": "one"}):
+        first = registry.get(FakeClient, api_url="https://x")
+        again = registry.get(FakeClient, api_url="https://x")
+    with _caller_environ({"FAKE_AUTH_TOKEN": "two"}):
+        other = registry.get(FakeClient, api_url="https://x")
+    assert again is first
+    assert other is not first and other.auth_token == "two"
+    assert registry.get(FakeClient, api_url="https://x", auth_token="one") is first
+
+
+def test_caller_environ_is_restored():
+    before = dict(os.environ)
+    with _caller_environ({"ONLY_THIS": "1"}):
+        assert dict(os.environ) == {"ONLY_THIS": "1"}
+    assert dict(os.environ) == before
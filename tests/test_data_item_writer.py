@@ -0,0 +1,76 @@
+import requests
+
+from pingintel_api.pingvision import types as t
+from pingintel_api.pingvision.data_item_writer import DataItemWriter
+
+
+def http_error(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.HTTPError(f"{status_code} error", response=response)
+
+
+class FakeClient:
+    def __init__(self, failures=None):
+        self.failures = dict(failures or {})
+        self.calls = []
+
+    def ensure_connection_pool_size(self, size):
+        pass
+
+    def add_data_items(self, pingid, action, items):
+        self.calls.append((pingid, action, dict(items)))
+        if self.failures.get(pingid):
+            raise self.failures[pingid].pop(0)
+
+
+def test_add_merges_per_submission_and_flushes_on_exit():
+    client = FakeClient()
+    with DataItemWriter(client) as writer:
+        writer.add("p1", {"a": 1, "b": 2})
+        writer.add("p1", {"b": 3})
+        writer.add("p2", {"a": 4})
+        assert client.calls == []
+    assert sorted(client.calls) == [
+        ("p1", t.DATA_ITEM_ACTIONS.UPSERT, {"a": 1, "b": 3}),
+        ("p2", t.DATA_ITEM_ACTIONS.UPSERT, {"a": 4}),
+    ]
+    summary = writer.summary()
+    assert (summary["succeeded"], summary["items_added"], summary["items_written"]) == (2, 4, 3)
+
+
+def test_replace_keeps_only_last_add():
+    client = FakeClient()
+    with DataItemWriter(client, action=t.DATA_ITEM_ACTIONS.REPLACE) as writer:
+        writer.add("p1", {"a": 1})
+        writer.add("p1", {"b": 2})
+    assert client.calls == [("p1", t.DATA_ITEM_ACTIONS.REPLACE, {"b": 2})]
+
+
+def test_flushes_when_buffer_is_full():
+    client = FakeClient()
+    writer = DataItemWriter(client, max_buffered=2)
+    writer.add("p1", {"a": 1})
+    writer.add("p2", {"a": 1})
+    assert len(client.calls) == 2 and len(writer) == 0
+
+
+def test_retries_transient_errors_only():
+    client = FakeClient({"p1": [http_error(503)], "p2": [http_error(400)]})
+    with DataItemWriter(client, backoff_seconds=0) as writer:
+        writer.add("p1", {"a": 1})
+        writer.add("p2", {"a": 1})
+    summary = writer.summary()
+    assert summary["retries"] == 1
+    assert summary["succeeded"] == 1
+    assert list(summary["errors"]) == ["p2"]
+
+
+def test_retry_classification_matches_is_transient_error():
+    client = FakeClient({"p1": [http_error(501)], "p2": [http_error(408)], "p3": [requests.ConnectionError("reset")]})
+    with DataItemWriter(client, backoff_seconds=0) as writer:
+        for pingid in ("p1", "p2", "p3"):
+            writer.add(pingid, {"a": 1})
+    summary = writer.summary()
+    assert summary["retries"] == 2
+    assert list(summary["errors"]) == ["p2"]
@@ -0,0 +1,48 @@
+import json
+
+from pingintel_api.pingvision.event_stream import SubmissionEventStream
+
+
+class FakeClient:
+    def __init__(self, pages):
+        self.pages = pages
+        self.requests = []
+
+    def list_submission_events(self, **params):
+        self.requests.append(params)
+        index = int(params.get("cursor_id") or 0)
+        if index >= len(self.pages):
+            return {"results": [], "cursor_id": str(index)}
+        return {"results": self.pages[index], "cursor_id": str(index + 1)}
+
+
+def test_checkpoint_waits_for_acknowledgement(tmp_path):
+    path = tmp_path / "events.cursor"
+    client = FakeClient([[{"uuid": "a"}, {"uuid": "b"}], [{"uuid": "c"}]])
+    stream = SubmissionEventStream(client, division="d", checkpoint_path=path, page_size=2)
+    events = stream.subscribe()
+
+    assert stream.poll_once() == 3
+    assert not path.exists()  # delivered, but nothing processed yet
+
+    events.get()
+    events.task_done()
+    assert stream.checkpoint() is None
+    events.get()
+    events.task_done()
+    assert stream.checkpoint() == "1"
+    assert json.loads(path.read_text())["cursor_id"] == "1"
+
+    events.get()
+    events.task_done()
+    assert stream.checkpoint() == "2"
+
+    resumed = SubmissionEventStream(client, division="d", checkpoint_path=path, page_size=2)
+    assert resumed.cursor_id == "2"
+
+
+def test_checkpoint_for_other_filters_is_ignored(tmp_path):
+    path = tmp_path / "events.cursor"
+    path.write_text(json.dumps({"cursor_id": "5", "filters": {"pingid": None, "division": "d", "team": None}}))
+    assert SubmissionEventStream(FakeClient([]), division="d", checkpoint_path=path).cursor_id == "5"
+    assert SubmissionEventStream(FakeClient([]), team="t", checkpoint_path=path).cursor_id is None
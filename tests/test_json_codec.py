@@ -0,0 +1,23 @@
+import json
+
+import pytest
+
+from pingintel_api.json_codec import CODECS, get_json_codec
+
+
+@pytest.mark.parametrize("name", [name for name, (_, is_available) in CODECS.items() if is_available()])
+def test_codecs_round_trip_and_raise_json_errors(name):
+    codec = get_json_codec(name)
+    data = {"a": [1, 2.5, None, True], "b": "ünïcode"}
+    assert codec.loads(codec.dumps(data)) == data
+    assert codec.loads(json.dumps(data)) == data
+    with pytest.raises(json.JSONDecodeError):
+        codec.loads(b"{not json")
+
+
+def test_codec_from_environment(monkeypatch):
+    monkeypatch.setenv("PINGINTEL_JSON_CODEC", "json")
+    assert get_json_codec().name == "json"
+    monkeypatch.setenv("PINGINTEL_JSON_CODEC", "nope")
+    with pytest.raises(ValueError):
+        get_json_codec()
@@ -0,0 +1,34 @@
+import json
+
+import pytest
+
+from pingintel_api.json_stream import JSONArrayStream
+
+
+def chunked(text, size):
+    data = text.encode("utf-8")
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 1000])
+def test_items_and_envelope_match_json_loads(size):
+    document = {"cursor_id": 12, "results": [{"id": 1, "name": "ä"}, 123456, [1.5e3], None], "has_remaining": True}
+    stream = JSONArrayStream(chunked(json.dumps(document), size))
+    assert list(stream) == document["results"]
+    assert stream.envelope == {"cursor_id": 12, "has_remaining": True}
+
+
+def test_top_level_array():
+    assert list(JSONArrayStream(chunked("[1, 22, 333]", 2), key=None)) == [1, 22, 333]
+
+
+def test_truncated_document_raises():
+    with pytest.raises(json.JSONDecodeError):
+        list(JSONArrayStream(chunked('{"results": [1, 2', 4)))
+
+
+def test_can_only_iterate_once():
+    stream = JSONArrayStream(["[]"], key=None)
+    list(stream)
+    with pytest.raises(RuntimeError):
+        list(stream)
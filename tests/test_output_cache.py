@@ -0,0 +1,58 @@
+import os
+import time
+
+from pingintel_api.sov_fixer.output_cache import OutputCache
+
+
+def put(cache, key, data, **kwargs):
+    return cache.put(key, [data[: len(data) // 2], data[len(data) // 2 :]], url=f"https://x/{key}", **kwargs)
+
+
+def test_put_get_and_dedupe(tmp_path):
+    cache = OutputCache(tmp_path, max_bytes=1000)
+    entry = put(cache, "a|1|XLSX|a.xlsx", b"hello world")
+    assert entry["size"] == 11
+    put(cache, "b|1|XLSX|b.xlsx", b"hello world")
+    assert cache.total_bytes == 11  # same content, one blob
+    assert cache.get("a|1|XLSX|a.xlsx")["digest"] == entry["digest"]
+    assert cache.find("a", 1, "XLSX")[0] == "a|1|XLSX|a.xlsx"
+    assert cache.get("missing") is None
+    out = tmp_path / "out.xlsx"
+    cache.copy_to(entry, out)
+    assert out.read_bytes() == b"hello world"
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = OutputCache(tmp_path, max_bytes=25)
+    put(cache, "a", b"a" * 10)
+    put(cache, "b", b"b" * 10)
+    past = time.time() - 100
+    os.utime(cache.entry_path("b"), (past, past))
+    put(cache, "c", b"c" * 10)
+    assert set(cache.entries) == {"a", "c"}
+    assert cache.total_bytes == 20
+
+
+def test_oversized_output_is_not_cached_but_written(tmp_path):
+    cache = OutputCache(tmp_path, max_bytes=5)
+    put(cache, "small", b"abc")
+    out = tmp_path / "big.bin"
+    assert put(cache, "big", b"x" * 10, output_path=out) is None
+    assert out.read_bytes() == b"x" * 10
+    assert set(cache.entries) == {"small"}
+
+
+def test_new_entry_survives_eviction(tmp_path):
+    cache = OutputCache(tmp_path, max_bytes=10)
+    put(cache, "old", b"o" * 6)
+    entry = put(cache, "new", b"n" * 8)
+    assert set(cache.entries) == {"new"}
+    cache.copy_to(entry, tmp_path / "new.bin")
+
+
+def test_two_instances_share_the_directory(tmp_path):
+    first, second = OutputCache(tmp_path), OutputCache(tmp_path)
+    put(first, "a", b"aaa")
+    put(second, "b", b"bbb")
+    first.get("a")
+    assert set(first.entries) == set(second.entries) == {"a", "b"}
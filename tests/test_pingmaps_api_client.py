@@ -0,0 +1,52 @@
+import threading
+
+from pingintel_api import PingMapsAPIClient
+
+
+class FakeLocations:
+    """get_policy_locations over a fixed set of points: bounds are inclusive, so points on a tile edge come back
+    from both neighbors, and at most `limit` rows are returned."""
+
+    def __init__(self, points):
+        self.points = points
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def __call__(self, sovid, lat1, lat2, lng1, lng2, limit, **filters):
+        with self._lock:
+            self.requests.append((lat1, lat2, lng1, lng2, filters))
+        inside = [p for p in self.points if lat1 <= p["latitude"] <= lat2 and lng1 <= p["longitude"] <= lng2]
+        return {"results": inside[:limit]}
+
+
+def make_client(monkeypatch, points):
+    client = PingMapsAPIClient(api_url="https://x", auth_token="t")
+    fake = FakeLocations(points)
+    monkeypatch.setattr(client, "get_policy_locations", fake)
+    return client, fake
+
+
+def test_dense_tiles_split_and_shared_edges_are_deduplicated(monkeypatch):
+    points = [{"id": i, "latitude": 10.0 + i, "longitude": 20.0 + i} for i in range(6)]
+    points += [{"id": "edge", "latitude": 0.0, "longitude": 0.0}, {"id": "far", "latitude": -45.0, "longitude": -90.0}]
+    client, fake = make_client(monkeypatch, points)
+
+    response = client.get_policy_locations_tiled("s-1", limit=4, concurrency=2, wind_tier="1")
+    ids = [location["id"] for location in response["results"]]
+    assert sorted(map(str, ids)) == sorted(str(p["id"]) for p in points)
+    assert len(ids) == len(set(ids))
+    assert response["tiles_fetched"] == len(fake.requests) > 1
+    assert response["truncated_tiles"] == []
+    assert all(filters == {"wind_tier": "1"} for *_, filters in fake.requests)
+
+
+def test_tiles_still_full_at_max_depth_are_reported(monkeypatch):
+    points = [{"id": i, "latitude": 30.0, "longitude": 40.0} for i in range(5)]
+    client, fake = make_client(monkeypatch, points)
+
+    response = client.get_policy_locations_tiled("s-1", limit=4, max_depth=2)
+    assert len(response["truncated_tiles"]) == 1
+    lat1, lat2, lng1, lng2 = response["truncated_tiles"][0]
+    assert (lat2 - lat1, lng2 - lng1) == (45.0, 90.0)
+    assert len(response["results"]) == 4
+    assert response["tiles_fetched"] == 1 + 4 + 4
@@ -0,0 +1,193 @@
+import itertools
+import json
+import pathlib
+import time
+
+import pytest
+import requests
+
+from pingintel_api import PingVisionAPIClient
+from pingintel_api.batch import BatchManifest
+from pingintel_api.json_stream import JSONArrayStream
+
+
+def http_error(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.HTTPError(f"{status_code} error", response=response)
+
+
+@pytest.fixture
+def client():
+    return PingVisionAPIClient(api_url="https://x", auth_token="t")
+
+
+def test_bulk_update_retries_transient_chunk_failures(client, monkeypatch):
+    calls = []
+
+    def bulk_update_submission(pingids, changes):
+        calls.append(list(pingids))
+        if len(calls) == 1:
+            raise http_error(503)
+        return [{"id": pingid} for pingid in pingids]
+
+    monkeypatch.setattr(client, "bulk_update_submission", bulk_update_submission)
+    report = client.bulk_update_submissions_chunked(["a", "b"], [], max_requests_per_second=None)
+    assert calls == [["a", "b"], ["a", "b"]]
+    assert report["succeeded"] == ["a", "b"]
+    assert report["failed"] == {}
+
+
+@pytest.mark.parametrize("error", [http_error(400), http_error(404)])
+def test_bulk_update_does_not_retry_rejected_chunks(client, monkeypatch, error):
+    calls = []
+
+    def bulk_update_submission(pingids, changes):
+        calls.append(list(pingids))
+        raise error
+
+    monkeypatch.setattr(client, "bulk_update_submission", bulk_update_submission)
+    report = client.bulk_update_submissions_chunked(["a", "b"], [], max_requests_per_second=None)
+    assert len(calls) == 1
+    assert set(report["failed"]) == {"a", "b"}
+
+
+def test_bulk_update_retries_missing_items_but_not_item_errors(client, monkeypatch):
+    calls = []
+
+    def bulk_update_submission(pingids, changes):
+        calls.append(list(pingids))
+        returned = [{"id": "a", "error": "Invalid status"}] if len(calls) == 1 else []
+        return returned + [{"id": pingid} for pingid in pingids if pingid == "c" and len(calls) > 1]
+
+    monkeypatch.setattr(client, "bulk_update_submission", bulk_update_submission)
+    report = client.bulk_update_submissions_chunked(["a", "c"], [], max_requests_per_second=None)
+    assert calls == [["a", "c"], ["c"]]
+    assert report["succeeded"] == ["c"]
+    assert report["failed"] == {"a": "Invalid status"}
+
+
+def test_create_submissions_batch_resumes_from_manifest_and_polls_until_ready(client, monkeypatch, tmp_path):
+    manifest_path = tmp_path / "manifest.jsonl"
+    previous = BatchManifest(manifest_path)
+    previous.write({"path": "done.pdf", "id": "p-done", "state": "done"})
+    previous.write({"path": "started.pdf", "id": "p-started", "state": "started"})
+
+    created = []
+    polls = {}
+
+    def create_submission(filepaths, **kwargs):
+        created.append((filepaths, kwargs))
+        return {"id": "p-new", "url": "https://x/p-new"}
+
+    def list_submission_activity(pingid):
+        polls[pingid] = polls.get(pingid, 0) + 1
+        status = "Completed" if polls[pingid] > 1 else "Processing"
+        return {"results": [{"id": pingid, "workflow_status_name": status}]}
+
+    monkeypatch.setattr(client, "create_submission", create_submission)
+    monkeypatch.setattr(client, "list_submission_activity", list_submission_activity)
+    summary = client.create_submissions_batch(
+        ["done.pdf", "started.pdf", "new.pdf"], 2, manifest_path=manifest_path, poll_seconds=0.01, team_uuid="t1"
+    )
+
+    assert created == [(["new.pdf"], {"team_uuid": "t1"})]
+    assert set(polls) == {"p-started", "p-new"} and min(polls.values()) >= 2
+    assert (summary["succeeded"], summary["skipped"], summary["errored"]) == (2, 1, 0)
+    entries = BatchManifest(manifest_path).entries
+    assert {key: (entry["id"], entry["state"]) for key, entry in entries.items()} == {
+        "done.pdf": ("p-done", "done"),
+        "started.pdf": ("p-started", "done"),
+        "new.pdf": ("p-new", "done"),
+    }
+    assert entries["new.pdf"]["workflow_status_name"] == "Completed"
+
+
+@pytest.mark.parametrize("split_directories", [False, True])
+def test_create_submissions_batch_directories(client, monkeypatch, tmp_path, split_directories):
+    for name in ("a.pdf", "b.pdf", "email/message.eml", "email/attachment.xlsx", ".hidden"):
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        (tmp_path / name).write_text("x")
+    created = []
+
+    def create_submission(filepaths, **kwargs):
+        created.append([pathlib.Path(path).relative_to(tmp_path).as_posix() for path in filepaths])
+        return {"id": f"p{len(created)}"}
+
+    monkeypatch.setattr(client, "create_submission", create_submission)
+    summary = client.create_submissions_batch(
+        [tmp_path], 1, split_directories=split_directories, poll_until_ready=False
+    )
+
+    if split_directories:
+        assert sorted(created) == [["a.pdf"], ["b.pdf"], ["email/attachment.xlsx", "email/message.eml"]]
+    else:
+        assert created == [["a.pdf", "b.pdf"]]
+    assert summary["succeeded"] == len(created)
+
+
+ACTIVITY_PAGES = {
+    None: {"results": [{"id": 1}, {"id": 2}], "cursor_id": "c1", "has_remaining": True},
+    "c1": {"results": [{"id": 3}, {"id": 4}], "cursor_id": "c2", "has_remaining": True},
+    "c2": {"results": [{"id": 5}], "cursor_id": "c3", "has_remaining": False},
+}
+
+
+@pytest.fixture
+def activity_pages(client, monkeypatch):
+    requested = []
+
+    def list_submission_activity(cursor_id=None, page_size=None, fields=None, **filters):
+        requested.append(cursor_id)
+        return ACTIVITY_PAGES[cursor_id]
+
+    def get_json_stream(url, params=None):
+        requested.append(params.get("cursor_id"))
+        return JSONArrayStream([json.dumps(ACTIVITY_PAGES[params.get("cursor_id")])])
+
+    monkeypatch.setattr(client, "list_submission_activity", list_submission_activity)
+    monkeypatch.setattr(client, "get_json_stream", get_json_stream)
+    return requested
+
+
+def ids(rows):
+    return [row["id"] for row in rows]
+
+
+@pytest.mark.parametrize("stream_pages", [False, True])
+def test_iter_submission_activity_follows_cursors(client, activity_pages, stream_pages):
+    assert ids(client.iter_submission_activity(stream_pages=stream_pages, team_uuid="t1")) == [1, 2, 3, 4, 5]
+    assert activity_pages == [None, "c1", "c2"]
+
+
+def test_iter_submission_activity_prefetches_the_next_page(client, activity_pages):
+    rows = client.iter_submission_activity()
+    assert next(rows)["id"] == 1
+    deadline = time.monotonic() + 5
+    while len(activity_pages) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert activity_pages == [None, "c1"]
+    rows.close()
+
+
+@pytest.mark.parametrize("stream_pages", [False, True])
+def test_iter_submission_activity_resumes_from_checkpoint(client, activity_pages, tmp_path, stream_pages):
+    checkpoint_path = tmp_path / "activity.json"
+    rows = client.iter_submission_activity(checkpoint_path=checkpoint_path, stream_pages=stream_pages, team_uuid="t1")
+    assert ids(itertools.islice(rows, 3)) == [1, 2, 3]
+    rows.close()
+    assert json.loads(checkpoint_path.read_text())["cursor_id"] == "c1"
+
+    # the page that was being consumed is yielded again.
+    activity_pages.clear()
+    rows = client.iter_submission_activity(checkpoint_path=checkpoint_path, stream_pages=stream_pages, team_uuid="t1")
+    assert ids(rows) == [3, 4, 5]
+    assert None not in activity_pages
+    assert not checkpoint_path.exists()
+
+
+def test_iter_submission_activity_ignores_checkpoint_for_other_filters(client, activity_pages, tmp_path):
+    checkpoint_path = tmp_path / "activity.json"
+    checkpoint_path.write_text(json.dumps({"cursor_id": "c1", "filters": {"team_uuid": "t1", "fields": None}}))
+    assert ids(client.iter_submission_activity(checkpoint_path=checkpoint_path, team_uuid="t2")) == [1, 2, 3, 4, 5]
+    assert activity_pages[0] is None
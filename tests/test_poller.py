@@ -0,0 +1,148 @@
+import threading
+from datetime import timedelta
+
+import pytest
+import requests
+
+from pingintel_api.poller import Poller, run_output_batch, run_polled_pipeline
+
+
+def http_error(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.HTTPError(f"{status_code} error", response=response)
+
+
+def test_watch_resolves_when_done():
+    calls = {"a": 0}
+
+    def check(key):
+        calls[key] += 1
+        return {"status": "COMPLETE" if calls[key] >= 3 else "PENDING"}
+
+    with Poller(check, lambda r: r["status"] == "COMPLETE", poll_seconds=0.01) as poller:
+        assert poller.watch("a").result(timeout=5) == {"status": "COMPLETE"}
+    assert calls["a"] == 3
+
+
+def test_watch_already_done_initial_response():
+    with Poller(lambda key: pytest.fail("should not poll"), lambda r: r == "done", poll_seconds=0.01) as poller:
+        assert poller.watch("a", initial_response="done").result(timeout=1) == "done"
+
+
+def test_is_done_error_fails_only_that_key():
+    def is_done(response):
+        return response["status"] == "COMPLETE"  # KeyError on the error body
+
+    def check(key):
+        return {"detail": "server error"} if key == "bad" else {"status": "COMPLETE"}
+
+    with Poller(check, is_done, poll_seconds=0.01) as poller:
+        bad, good = poller.watch("bad"), poller.watch("good")
+        with pytest.raises(KeyError):
+            bad.result(timeout=5)
+        assert good.result(timeout=5) == {"status": "COMPLETE"}
+        assert poller.is_running
+
+
+def test_transient_check_errors_are_retried():
+    errors = [http_error(503), requests.ConnectionError("reset")]
+
+    def check(key):
+        if errors:
+            raise errors.pop(0)
+        return "done"
+
+    with Poller(check, lambda r: r == "done", poll_seconds=0.01) as poller:
+        assert poller.watch("a").result(timeout=5) == "done"
+
+
+def test_client_error_fails_immediately():
+    calls = []
+
+    def check(key):
+        calls.append(key)
+        raise http_error(404)
+
+    with Poller(check, lambda r: True, poll_seconds=0.01) as poller:
+        with pytest.raises(requests.HTTPError):
+            poller.watch("a").result(timeout=5)
+    assert calls == ["a"]
+
+
+def test_timeout():
+    with Poller(lambda key: "pending", lambda r: False, poll_seconds=0.01, timeout=timedelta(seconds=0.05)) as poller:
+        with pytest.raises(TimeoutError):
+            poller.watch("a").result(timeout=5)
+
+
+def test_pipeline_reports_errors_instead_of_hanging():
+    def start(item):
+        return item, None
+
+    def check(key):
+        return {"detail": "oops"} if key == 2 else {"status": "COMPLETE"}
+
+    with Poller(check, lambda r: r["status"] == "COMPLETE", poll_seconds=0.01) as poller:
+        results = list(
+            run_polled_pipeline(
+                range(4),
+                start,
+                poller,
+                finish=lambda item, key, response: (item, "ok"),
+                error_result=lambda item, key, e: (item, type(e).__name__),
+            )
+        )
+    assert sorted(results) == [(0, "ok"), (1, "ok"), (2, "KeyError"), (3, "ok")]
+
+
+def test_pipeline_raises_if_poller_thread_dies():
+    poller = Poller(lambda key: "pending", lambda r: False, poll_seconds=0.01)
+    polling_thread = poller._thread
+    poller._thread = threading.Thread(target=lambda: None)  # stands in for a polling thread that died
+    poller._thread.start()
+    poller._thread.join()
+    try:
+        with pytest.raises(RuntimeError):
+            list(run_polled_pipeline([1], lambda item: (item, None), poller, lambda *a: a, lambda *a: a))
+    finally:
+        poller._thread = polling_thread
+        poller.close()
+
+
+def test_run_output_batch_downloads_and_isolates_failures(tmp_path):
+    progress = {}
+
+    def start(id, output_format):
+        if id == "bad":
+            raise http_error(404)
+        progress[f"{id}-{output_format}"] = 0
+        return {"request": {"id": f"{id}-{output_format}", "status": "PENDING"}}
+
+    def check_progress(output_request_id):
+        progress[output_request_id] += 1
+        status = "COMPLETE" if progress[output_request_id] > 1 else "IN_PROGRESS"
+        return {"request": {"id": output_request_id, "status": status}, "result": {"url": f"/{output_request_id}"}}
+
+    def download(output, directory):
+        path = directory / output["url"].strip("/")
+        path.write_text("data")
+        return path
+
+    pool_sizes = []
+    results = run_output_batch(
+        [("s1", "xlsx"), ("bad", "xlsx")],
+        "sovid",
+        start=start,
+        check_progress=check_progress,
+        output_from_response=lambda response_data: response_data["result"],
+        download=download,
+        download_dir=tmp_path,
+        ensure_connection_pool_size=pool_sizes.append,
+        concurrency=2,
+        poll_seconds=0.01,
+    )
+    results = {result["sovid"]: result for result in results}
+    assert results["s1"]["success"] and (tmp_path / "s1" / "s1-xlsx").read_text() == "data"
+    assert results["bad"]["success"] is False and "404" in results["bad"]["error"]
+    assert pool_sizes == [6]
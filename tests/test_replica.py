@@ -0,0 +1,77 @@
+import pytest
+
+from pingintel_api.pingvision.replica import SubmissionReplica
+
+
+def row(pingid, status, created_time, team_uuid="team-1", claimed_by_id=None, documents=()):
+    return {
+        "id": pingid,
+        "team_uuid": team_uuid,
+        "workflow_status_name": status,
+        "claimed_by_id": claimed_by_id,
+        "created_time": created_time,
+        "documents": [{"filename": filename, "document_type": "SOV"} for filename in documents],
+    }
+
+
+class FakeClient:
+    def __init__(self, rows):
+        self.rows = {r["id"]: r for r in rows}
+        self.events = []
+        self.event_requests = []
+
+    def ensure_connection_pool_size(self, size):
+        pass
+
+    def iter_submission_activity(self, page_size, checkpoint_path, team_uuid=None, division_uuid=None):
+        yield from [r for r in self.rows.values() if r["team_uuid"] == team_uuid]
+
+    def list_submission_activity(self, pingid, team_uuid=None, division_uuid=None):
+        r = self.rows.get(pingid)
+        return {"results": [r] if r and r["team_uuid"] == team_uuid else []}
+
+    def list_submission_events(self, **params):
+        self.event_requests.append(params)
+        return {"results": self.events, "cursor_id": "c1" if self.events else None}
+
+
+@pytest.fixture
+def client():
+    return FakeClient(
+        [
+            row("p1", "Received", "2024-01-01", documents=["a.xlsx", "b.pdf"]),
+            row("p2", "Cleared", "2024-01-02", claimed_by_id=7),
+            row("p3", "Received", "2024-01-03", team_uuid="team-2"),
+        ]
+    )
+
+
+def test_full_sync_and_query(client, tmp_path):
+    with SubmissionReplica(client, tmp_path / "replica.db", team="team-1") as replica:
+        assert replica.sync() == 2
+        assert [r["id"] for r in replica.query()] == ["p2", "p1"]
+        assert [r["id"] for r in replica.query(workflow_status_names=["Received"])] == ["p1"]
+        assert [r["id"] for r in replica.query(claimed_by_id=7)] == ["p2"]
+        assert [r["id"] for r in replica.query(unclaimed=True, order_by="created_time ASC")] == ["p1"]
+        assert sorted(d["filename"] for d in replica.documents("p1")) == ["a.xlsx", "b.pdf"]
+        with pytest.raises(ValueError):
+            replica.query(order_by="data; DROP TABLE submissions")
+
+
+def test_incremental_sync_refreshes_changed_submissions(client, tmp_path):
+    path = tmp_path / "replica.db"
+    with SubmissionReplica(client, path, team="team-1") as replica:
+        replica.sync()
+
+    client.rows["p1"] = row("p1", "Cleared", "2024-01-01", documents=["a.xlsx"])
+    client.rows["p2"]["team_uuid"] = "team-2"
+    client.events = [{"pingid": "p1"}, {"pingid": "p2"}]
+    with SubmissionReplica(client, path, team="team-1") as replica:
+        assert replica.sync() == 1
+        assert [r["id"] for r in replica.query(workflow_status_names=["Cleared"])] == ["p1"]
+        assert [d["filename"] for d in replica.documents("p1")] == ["a.xlsx"]
+        assert [r["id"] for r in replica.query()] == ["p1"]
+
+        client.events = []
+        replica.sync()
+        assert client.event_requests[-1]["cursor_id"] == "c1"
@@ -0,0 +1,165 @@
+import json
+import pathlib
+import threading
+from datetime import timedelta
+
+import pytest
+import requests
+
+from pingintel_api import SOVFixerAPIClient
+
+
+def in_progress(sovid):
+    return {"request": {"status": "IN_PROGRESS", "pct_complete": None, "last_health_status": None}}
+
+
+def test_fix_sov_async_wait_times_out(monkeypatch):
+    client = SOVFixerAPIClient(api_url="https://x", auth_token="t")
+    monkeypatch.setattr(client, "fix_sov_async_check_progress", in_progress)
+    with pytest.raises(TimeoutError, match="s-1"):
+        client.fix_sov_async_wait({"id": "s-1"}, poll_seconds=0.01, timeout=timedelta(seconds=0.05))
+
+
+def test_fix_sov_batch_records_timeout_as_error(monkeypatch, tmp_path):
+    client = SOVFixerAPIClient(api_url="https://x", auth_token="t")
+    monkeypatch.setattr(client, "fix_sov_async_start", lambda path, **kwargs: {"id": "s-1"})
+    monkeypatch.setattr(client, "fix_sov_async_check_progress", in_progress)
+    summary = client.fix_sov_batch(
+        ["a.xlsx"], 1, output_dir=tmp_path, poll_seconds=0.01, timeout=timedelta(seconds=0.05)
+    )
+    assert summary["errored"] == 1
+
+
+def test_get_output_cached_downloads_from_the_same_host_as_fix_sov_download(monkeypatch, tmp_path):
+    from unittest import mock
+
+    from pingintel_api.sov_fixer.output_cache import OutputCache
+
+    client = SOVFixerAPIClient(api_url="http://api-local.sovfixer.com", auth_token="t")
+    client.environment = "local2"
+    output = {"url": "/api/v1/sov/s-1/output/x.xlsx", "scrubbed_filename": "x.xlsx", "label": "Excel"}
+    monkeypatch.setattr(client, "get_or_create_output", lambda *args, **kwargs: output)
+    response = mock.MagicMock(status_code=200, ok=True, headers={})
+    response.__enter__.return_value = response
+    response.iter_content.return_value = [b"data"]
+    with mock.patch.object(client.session, "get", return_value=response) as get:
+        client.get_output_cached("s-1", "xlsx", output_path=tmp_path / "x.xlsx", cache=OutputCache(tmp_path / "c"))
+    assert get.call_args.args[0] == "http://localhost:8000/api/v1/sov/s-1/output/x.xlsx"
+    assert client._output_url(output["url"]) == get.call_args.args[0]
+
+
+def json_response(status_code, data):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(data).encode("utf-8")
+    response._content_consumed = True
+    return response
+
+
+class FakeRoutes:
+    """Stands in for session.get/post, routing by URL path to `routes` and recording every call."""
+
+    def __init__(self, monkeypatch, client, routes):
+        self.routes = routes
+        self.calls = []
+        self._lock = threading.Lock()
+        monkeypatch.setattr(client.session, "get", self.get)
+        monkeypatch.setattr(client.session, "post", self.post)
+
+    def _call(self, method, url, **kwargs):
+        path = url.split("://x", 1)[1]
+        with self._lock:
+            self.calls.append((method, path, kwargs.get("data") or kwargs.get("json")))
+        return self.routes(method, path, kwargs)
+
+    def get(self, url, **kwargs):
+        return self._call("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self._call("POST", url, **kwargs)
+
+
+def test_get_or_create_output_batch(monkeypatch, tmp_path):
+    client = SOVFixerAPIClient(api_url="https://x", auth_token="t")
+    polls = {}
+
+    def routes(method, path, kwargs):
+        if method == "POST" and path.endswith("/get_or_create_output"):
+            sovid = path.split("/")[4]
+            if sovid == "s-missing":
+                return json_response(404, {"detail": "Not found"})
+            request_id = f"{sovid}-{kwargs['data']['output_format']}"
+            return json_response(200, {"request": {"id": request_id, "status": "PENDING"}})
+        if path.startswith("/api/v1/sov/get_or_create_output/"):
+            request_id = path.rsplit("/", 1)[1]
+            polls[request_id] = polls.get(request_id, 0) + 1
+            status = "COMPLETE" if polls[request_id] > 1 else "IN_PROGRESS"
+            result = {"url": f"/download/{request_id}", "scrubbed_filename": f"{request_id}.out", "label": "Out"}
+            return json_response(200, {"request": {"id": request_id, "status": status}, "result": result})
+        if path.startswith("/download/"):
+            return json_response(200, path)
+        raise AssertionError(f"Unexpected {method} {path}")
+
+    session = FakeRoutes(monkeypatch, client, routes)
+    results = list(
+        client.get_or_create_output_batch(
+            ["s-1", "s-2", "s-missing"], ["xlsx", "json"], concurrency=3, poll_seconds=0.01, download_dir=tmp_path
+        )
+    )
+
+    assert len(results) == 6
+    by_pair = {(result["sovid_or_sud"], result["output_format"]): result for result in results}
+    for sovid in ("s-1", "s-2"):
+        for output_format in ("xlsx", "json"):
+            result = by_pair[(sovid, output_format)]
+            assert result["success"] and result["error"] is None
+            assert result["local_path"] == str(tmp_path / sovid / f"{sovid}-{output_format}.out")
+            assert pathlib.Path(result["local_path"]).exists()
+    for output_format in ("xlsx", "json"):
+        failed = by_pair[("s-missing", output_format)]
+        assert failed["success"] is False and failed["output_request_id"] is None and failed["error"]
+    # every request was started exactly once, and polled until it completed.
+    starts = [call for call in session.calls if call[0] == "POST"]
+    assert len(starts) == 6
+    assert set(polls) == {"s-1-xlsx", "s-1-json", "s-2-xlsx", "s-2-json"}
+
+
+def test_get_buildings_reports_failures_per_item(monkeypatch):
+    client = SOVFixerAPIClient(api_url="https://x", auth_token="t")
+
+    def routes(method, path, kwargs):
+        item_key = path.rsplit("/", 1)[1]
+        if item_key == "missing":
+            return json_response(404, {"detail": "Not found"})
+        return json_response(200, {"item_key": item_key})
+
+    session = FakeRoutes(monkeypatch, client, routes)
+    item_keys = [f"b{i}" for i in range(20)] + ["missing"]
+    response = client.get_buildings(item_keys, concurrency=4)
+
+    assert response["results"] == {f"b{i}": {"item_key": f"b{i}"} for i in range(20)}
+    assert list(response["errors"]) == ["missing"]
+    assert sorted(path for _, path, _ in session.calls) == sorted(f"/api/v1/building/{key}" for key in item_keys)
+
+
+@pytest.mark.parametrize("as_mapping", [False, True])
+def test_add_buildings_reports_failures_per_item(monkeypatch, as_mapping):
+    client = SOVFixerAPIClient(api_url="https://x", auth_token="t")
+
+    def routes(method, path, kwargs):
+        building_data = json.loads(kwargs["data"])["building_data"]
+        if building_data.get("invalid"):
+            return json_response(400, {"detail": "Invalid building"})
+        return json_response(200, {"added": building_data["street"]})
+
+    session = FakeRoutes(monkeypatch, client, routes)
+    buildings = [{"street": "1 Main St"}, {"street": "2 Main St", "invalid": True}, {"street": "3 Main St"}]
+    if as_mapping:
+        buildings = {f"key-{i}": building for i, building in enumerate(buildings)}
+    response = client.add_buildings("s-1", buildings, concurrency=2)
+
+    prefix = "key-" if as_mapping else ""
+    assert response["results"] == {f"{prefix}0": {"added": "1 Main St"}, f"{prefix}2": {"added": "3 Main St"}}
+    assert list(response["errors"]) == [f"{prefix}1"]
+    assert {path for _, path, _ in session.calls} == {"/api/v1/sov/s-1/add_building"}
+    assert len(session.calls) == 3
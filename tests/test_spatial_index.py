@@ -0,0 +1,54 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from pingintel_api.pingmaps.spatial_index import LocationIndex
+
+LOCATIONS = [
+    {"id": "houston", "latitude": 29.76, "longitude": -95.37, "fema_flood_zone": "AE", "limits__total_limit": 5e6},
+    {"id": "galveston", "latitude": 29.30, "longitude": -94.80, "fema_flood_zone": "VE", "limits__total_limit": 1e6},
+    {"id": "dallas", "latitude": "32.78", "longitude": "-96.80", "fema_flood_zone": "X"},
+    {"id": "nowhere", "latitude": None, "longitude": -95.0},
+    {"id": "fiji", "latitude": -17.7, "longitude": 178.0},
+    {"id": "samoa", "latitude": -13.8, "longitude": -172.0},
+]
+
+
+def ids(locations):
+    return [location["id"] for location in locations]
+
+
+@pytest.fixture
+def index():
+    return LocationIndex(LOCATIONS)
+
+
+def test_locations_without_coordinates_are_dropped(index):
+    assert len(index) == 5
+    assert "nowhere" not in ids(index.locations)
+
+
+def test_bbox_with_filters(index):
+    assert sorted(ids(index.bbox(29.0, 30.0, -96.0, -94.0))) == ["galveston", "houston"]
+    assert ids(index.bbox(29.0, 30.0, -96.0, -94.0, fema_flood_zone="AE")) == ["houston"]
+    assert ids(index.bbox(29.0, 30.0, -96.0, -94.0, limits__total_limit__gte=2e6)) == ["houston"]
+
+
+def test_bbox_across_antimeridian(index):
+    assert sorted(ids(index.bbox(-20.0, -10.0, 170.0, -170.0))) == ["fiji", "samoa"]
+
+
+def test_within_radius_and_nearest_are_sorted_by_distance(index):
+    within = index.within_radius(29.76, -95.37, 100)
+    assert [location["id"] for _, location in within] == ["houston", "galveston"]
+    assert within[0][0] == pytest.approx(0.0, abs=1e-6)
+    assert 60 < within[1][0] < 90
+
+    nearest = index.nearest(29.76, -95.37, k=3)
+    assert [location["id"] for _, location in nearest] == ["houston", "galveston", "dallas"]
+    assert index.nearest(0, 0, k=0) == []
+
+
+def test_unknown_filter_raises(index):
+    with pytest.raises(ValueError):
+        index.bbox(-90, 90, -180, 180, not_a_filter="x")
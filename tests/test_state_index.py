@@ -0,0 +1,59 @@
+from pingintel_api.pingvision import types as t
+from pingintel_api.pingvision.event_stream import EventQueue
+from pingintel_api.pingvision.state_index import SubmissionStateIndex
+
+
+def status_change(pingid, status_uuid, team_uuid="team-1"):
+    return {
+        "pingid": pingid,
+        "event_type": t.SUBMISSION_EVENT_LOG_TYPE.SUBMISSION_STATUS_CHANGE,
+        "new_value": status_uuid,
+        "team_uuid": team_uuid,
+        "created_time": "2024-01-01T00:00:00Z",
+    }
+
+
+def test_apply_updates_lookups():
+    index = SubmissionStateIndex()
+    index.apply(status_change("p1", "new"))
+    index.apply(status_change("p2", "new", team_uuid="team-2"))
+    index.apply(status_change("p1", "cleared"))
+    assert index.get_status("p1") == "cleared"
+    assert index.pingids_with_status("new") == {"p2"}
+    assert index.pingids_for_team("team-1") == {"p1"}
+    assert index.get("p1")["last_event_time"] == "2024-01-01T00:00:00Z"
+    assert index.get("missing") is None
+
+
+def test_wait_for_resolves_on_matching_event_or_immediately():
+    index = SubmissionStateIndex()
+    index.seed("p1", status_uuid="new")
+    future = index.wait_for("p1", "cleared")
+    assert not future.done()
+    index.apply(status_change("p1", "cleared"))
+    assert future.result(timeout=1)["status_uuid"] == "cleared"
+    assert index.wait_for("p1", "cleared").done()
+
+
+def test_follow_consumes_stream_and_close_cancels_waiters():
+    class FakeStream:
+        def __init__(self):
+            self.events = EventQueue()
+            self.unsubscribed = False
+
+        def subscribe(self):
+            return self.events
+
+        def unsubscribe(self, events):
+            self.unsubscribed = True
+
+    stream = FakeStream()
+    index = SubmissionStateIndex()
+    index.follow(stream)
+    stream.events.put(status_change("p1", "cleared"))
+    assert index.wait_for("p1", "cleared").result(timeout=5)["pingid"] == "p1"
+    pending = index.wait_for("p1", "never")
+    index.close()
+    assert pending.cancelled()
+    assert stream.unsubscribed
+    assert stream.events.acknowledged == 1
@@ -0,0 +1,76 @@
+import enum
+import json
+from typing import Literal, NotRequired, TypedDict
+
+import pytest
+
+from pingintel_api.sov_fixer import types as sov_types
+from pingintel_api.structs import SchemaMismatchError, Struct, to_builtins, to_struct
+
+
+class Color(enum.StrEnum):
+    RED = "RED"
+    BLUE = "BLUE"
+
+
+class Child(TypedDict):
+    id: str
+    size: int | None
+
+
+class Parent(TypedDict):
+    name: str
+    color: Color
+    kind: Literal["a", "b"]
+    children: list[Child]
+    note: NotRequired[str]
+
+
+PARENT = {"name": "p", "color": "RED", "kind": "a", "children": [{"id": "c1", "size": 3}, {"id": "c2", "size": None}]}
+
+
+def test_to_struct_converts_and_behaves_like_a_dict():
+    parent = to_struct(PARENT, Parent)
+    assert isinstance(parent, Struct)
+    assert parent.name == "p" and parent["name"] == "p"
+    assert parent.color is Color.RED
+    assert parent.children[1].size is None
+    assert "note" not in parent and parent.get("note") is None
+    assert json.loads(json.dumps(parent, default=to_builtins)) == PARENT
+    assert parent.to_dict() == {**PARENT, "color": Color.RED}
+
+
+def test_mismatch_reports_path():
+    bad = {**PARENT, "children": [{"id": "c1", "size": "big"}]}
+    with pytest.raises(SchemaMismatchError) as exc_info:
+        to_struct(bad, Parent)
+    assert exc_info.value.path == "children[0].size"
+
+
+def test_missing_required_field():
+    with pytest.raises(SchemaMismatchError):
+        to_struct({key: value for key, value in PARENT.items() if key != "kind"}, Parent)
+
+
+def test_extra_fields_kept_unless_strict():
+    data = {**PARENT, "added_later": 1}
+    assert to_struct(data, Parent)["added_later"] == 1
+    with pytest.raises(SchemaMismatchError):
+        to_struct(data, Parent, strict=True)
+
+
+def test_pending_fix_sov_response():
+    pending = {
+        "request": {
+            "status": "PENDING",
+            "requested_at": "2024-01-01T00:00:00Z",
+            "progress_started_at": None,
+            "completed_at": None,
+            "last_health_check_time": None,
+            "last_health_status": None,
+            "pct_complete": None,
+        }
+    }
+    response = to_struct(pending, sov_types.FixSOVResponse)
+    assert response.request.status == "PENDING"
+    assert "result" not in response